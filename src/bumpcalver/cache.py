@@ -0,0 +1,230 @@
+"""
+Persistent caches for BumpCalver.
+
+This module keeps results that are expensive to recompute between runs, in
+files under `.bumpcalver/cache` in the project root. Entries are validated
+against the files they were computed from, so a stale entry is never used:
+it is recomputed instead. The caches are stored with `marshal`, which loads
+much faster than JSON or pickle and needs no import, and any cache file that
+cannot be read (e.g. one written by another Python version) is ignored.
+
+Classes:
+    VersionCache: A persistent cache of the versions read from files.
+
+Functions:
+    load_cache: Returns the data of a cache file.
+    save_cache: Writes the data of a cache file.
+    read_file_version: Reads the version of one file configuration, through a cache if given.
+
+Example:
+    To read the versions of the configured files, reusing earlier reads:
+        cache = VersionCache()
+        versions = [read_file_version(file_config, cache) for file_config in file_configs]
+        cache.save()
+"""
+
+import marshal
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from .file_utils import current_transaction
+from .handlers import get_version_handler
+
+# Directory of the cache files, relative to the project root
+DEFAULT_CACHE_DIR = os.path.join(".bumpcalver", "cache")
+
+# Maximum number of entries kept by `VersionCache`; the least recently used
+# entries are evicted first
+DEFAULT_VERSION_CACHE_SIZE = 4096
+
+# Layout version of the cache files written by this module
+_CACHE_FORMAT = 1
+
+# Files modified this recently are not cached: a second change within the
+# resolution of the file system's timestamps could keep the same signature
+_MIN_AGE_NS = 2_000_000_000
+
+_Key = Tuple[str, str, str, str]
+_Signature = Tuple[int, int, int]
+
+
+def load_cache(path: str) -> Optional[Any]:
+    """Returns the data of a cache file.
+
+    Args:
+        path (str): The cache file.
+
+    Returns:
+        Optional[Any]: The data, or None if the file is missing, unreadable or was
+            written by another Python version.
+    """
+    try:
+        with open(path, "rb") as file:
+            header, data = marshal.load(file)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if header != (_CACHE_FORMAT, marshal.version, tuple(sys.version_info[:2])):
+        return None
+    return data
+
+
+def save_cache(path: str, data: Any) -> None:
+    """Writes the data of a cache file.
+
+    The file is replaced atomically. Errors are ignored, as the cache is only
+    an optimization: file system errors, and data `marshal` cannot store.
+
+    Args:
+        path (str): The cache file.
+        data (Any): The data, made of built-in types only.
+    """
+    header = (_CACHE_FORMAT, marshal.version, tuple(sys.version_info[:2]))
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(temp_path, "wb") as file:
+            marshal.dump((header, data), file)
+        os.replace(temp_path, path)
+    except (OSError, ValueError):
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+
+
+def _signature(stat_result: os.stat_result) -> _Signature:
+    """Returns the values that change whenever a file is rewritten."""
+    return (stat_result.st_mtime_ns, stat_result.st_size, stat_result.st_ino)
+
+
+def _read_version(file_config: Dict[str, Any]) -> Optional[str]:
+    """Reads the version of a file configuration with its handler."""
+    handler = get_version_handler(file_config.get("file_type", ""))
+    read_options: Dict[str, Any] = {}
+    if file_config.get("directive"):
+        read_options["directive"] = file_config["directive"]
+    if "head_window" in file_config:
+        read_options["head_window"] = file_config["head_window"]
+    return handler.read_version(
+        file_config["path"], file_config.get("variable", ""), **read_options
+    )
+
+
+class VersionCache:
+    """A persistent cache of the versions read from files.
+
+    Entries are keyed by (path, file type, variable, directive) and validated
+    by the file's modification time (in nanoseconds), size and inode, so a
+    warm cache answers a read with a single `os.stat`. The cache is kept in
+    least-recently-used order and holds at most `max_entries` entries.
+
+    Reads made while a `FileTransaction` is active bypass the cache, since
+    the transaction may hold content that is not on disk yet.
+
+    Attributes:
+        path (str): The cache file.
+        max_entries (int): The maximum number of entries kept.
+        hits (int): The number of reads served from the cache.
+        misses (int): The number of reads that opened the file.
+    """
+
+    def __init__(
+        self,
+        path: str = os.path.join(DEFAULT_CACHE_DIR, "versions"),
+        max_entries: int = DEFAULT_VERSION_CACHE_SIZE,
+    ) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: Optional[Dict[_Key, Tuple[_Signature, str]]] = None
+        self._loaded: List[Tuple[_Key, Tuple[_Signature, str]]] = []
+
+    def _load(self) -> Dict[_Key, Tuple[_Signature, str]]:
+        """Returns the entries, loading them from the cache file on first use."""
+        if self._entries is None:
+            data = load_cache(self.path)
+            self._entries = dict(data) if isinstance(data, list) else {}
+            self._loaded = list(self._entries.items())
+        return self._entries
+
+    def read_version(self, file_config: Dict[str, Any]) -> Optional[str]:
+        """Reads the version of a file configuration, using the cache when valid.
+
+        Args:
+            file_config (Dict[str, Any]): The file configuration (see `update_version_in_files`).
+
+        Returns:
+            Optional[str]: The version string if found, otherwise None.
+        """
+        file_path = file_config["path"]
+        try:
+            stat_result = os.stat(file_path)
+        except OSError:
+            return _read_version(file_config)
+        if current_transaction() is not None:
+            return _read_version(file_config)
+
+        key = (
+            os.path.abspath(file_path),
+            file_config.get("file_type", ""),
+            file_config.get("variable", ""),
+            file_config.get("directive", ""),
+        )
+        signature = _signature(stat_result)
+        entries = self._load()
+        cached = entries.pop(key, None)
+        if cached is not None and cached[0] == signature:
+            # Re-inserting the entry marks it as the most recently used
+            entries[key] = cached
+            self.hits += 1
+            return cached[1]
+
+        self.misses += 1
+        version = _read_version(file_config)
+        if (
+            isinstance(version, str)
+            and time.time_ns() - stat_result.st_mtime_ns >= _MIN_AGE_NS
+        ):
+            entries[key] = (signature, version)
+            while len(entries) > self.max_entries:
+                del entries[next(iter(entries))]
+        return version
+
+    def save(self) -> None:
+        """Writes the cache file if any entry or the order of use changed."""
+        if self._entries is None:
+            return
+        items = list(self._entries.items())
+        if items != self._loaded:
+            save_cache(self.path, items)
+            self._loaded = items
+
+    def clear(self) -> None:
+        """Removes every entry and the cache file."""
+        self._entries = {}
+        self._loaded = []
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def read_file_version(
+    file_config: Dict[str, Any], cache: Optional[VersionCache] = None
+) -> Optional[str]:
+    """Reads the version of one file configuration, through a cache if given.
+
+    Args:
+        file_config (Dict[str, Any]): The file configuration (see `update_version_in_files`).
+        cache (Optional[VersionCache], optional): The cache to use. Defaults to None,
+            which always reads the file.
+
+    Returns:
+        Optional[str]: The version string if found, otherwise None.
+    """
+    if cache is not None:
+        return cache.read_version(file_config)
+    return _read_version(file_config)
@@ -0,0 +1,302 @@
+"""
+Calendar version values for BumpCalver.
+
+This module provides `CalVer`, an immutable value for a calendar version
+string, so that versions can be compared, sorted, hashed and rendered for
+PEP 440 without ad hoc string handling. Versions are parsed with the parser
+compiled from the version and date formats (see `compile_version_parser`),
+and each value keeps a precomputed sort key, so ordering large sets of tags
+only compares tuples of integers.
+
+Classes:
+    CalVer: An immutable calendar version.
+
+Functions:
+    sort_versions: Sorts version strings by calendar version order.
+
+Constants:
+    SUFFIX_PRECEDENCE: The order of the known version suffixes; custom suffixes
+        (e.g. "dev") sort before all of them.
+
+Example:
+    To find the latest of a repository's tags:
+        latest = max(CalVer.parse_many(tags))
+
+    To compare two versions:
+        CalVer.parse("2024.12.14-001.rc") < CalVer.parse("2024.12.14-001")  # True
+"""
+
+import re
+from operator import attrgetter
+from typing import Any, Iterable, List, Optional, Tuple
+
+from .utils import ParsedVersion, compile_version_parser
+
+# Version and date formats of versions parsed without explicit formats; the
+# defaults of the configuration
+_DEFAULT_VERSION_FORMAT = "{current_date}-{build_count:03}"
+_DEFAULT_DATE_FORMAT = "%Y.%m.%d"
+
+# Precedence of the version suffixes among versions of the same date and
+# build count. A version without a suffix ranks as a release. Any other
+# suffix (e.g. "dev", as given with --custom) ranks below every known suffix,
+# even "beta", and custom suffixes sort alphabetically among themselves.
+SUFFIX_PRECEDENCE = {"beta": 1, "rc": 2, "release": 3}
+_NO_SUFFIX_RANK = SUFFIX_PRECEDENCE["release"]
+_CUSTOM_SUFFIX_RANK = 0
+
+# PEP 440 pre-release segment of the known suffixes
+_PEP440_SUFFIXES = {"beta": "b0", "rc": "rc0", "release": ""}
+
+_DIGITS = re.compile(r"\d+")
+_LOCAL_SEPARATORS = re.compile(r"[^0-9A-Za-z]+")
+
+_SortKey = Tuple[int, int, int, int, int, int, int, int, str]
+
+_SORT_KEY = attrgetter("sort_key")
+
+
+class CalVer:
+    """An immutable calendar version.
+
+    Versions are equal when they have the same date, build count and suffix,
+    and are ordered by date, then build count, then suffix precedence
+    (custom suffixes < `beta` < `rc` < `release`; see `SUFFIX_PRECEDENCE`),
+    e.g. "2024.01.01-001.dev" < "2024.01.01-001.beta". Only versions parsed
+    with the same formats compare meaningfully.
+
+    Attributes:
+        text (str): The version string.
+        date (Optional[str]): The date part, as written in the version.
+        build_count (Optional[int]): The build count, if the version has one.
+        suffix (Optional[str]): The suffix (e.g., "beta"), if any.
+        sort_key (Tuple): The key versions are compared by.
+    """
+
+    __slots__ = ("text", "date", "build_count", "suffix", "sort_key")
+
+    text: str
+    date: Optional[str]
+    build_count: Optional[int]
+    suffix: Optional[str]
+    sort_key: _SortKey
+
+    def __init__(self, text: str, fields: ParsedVersion) -> None:
+        """Initializes a version from the fields parsed from its string.
+
+        Use `parse` or `parse_many` to build versions from strings.
+
+        Args:
+            text (str): The version string.
+            fields (ParsedVersion): Its fields, from a `VersionParser`.
+        """
+        suffix = fields.suffix
+        setter = object.__setattr__
+        setter(self, "text", text)
+        setter(self, "date", fields.date)
+        setter(self, "build_count", fields.build_count)
+        setter(self, "suffix", suffix)
+        setter(
+            self,
+            "sort_key",
+            (
+                fields.year or 0,
+                fields.quarter or 0,
+                fields.month or 0,
+                fields.week or 0,
+                fields.day or 0,
+                fields.day_of_year or 0,
+                fields.build_count or 0,
+                (
+                    _NO_SUFFIX_RANK
+                    if suffix is None
+                    else SUFFIX_PRECEDENCE.get(suffix, _CUSTOM_SUFFIX_RANK)
+                ),
+                suffix or "",
+            ),
+        )
+
+    @classmethod
+    def parse(
+        cls,
+        version: str,
+        version_format: str = _DEFAULT_VERSION_FORMAT,
+        date_format: str = _DEFAULT_DATE_FORMAT,
+    ) -> "CalVer":
+        """Parses a version string.
+
+        Args:
+            version (str): The version string.
+            version_format (str, optional): The version format. Defaults to
+                "{current_date}-{build_count:03}".
+            date_format (str, optional): The date format. Defaults to "%Y.%m.%d".
+
+        Returns:
+            CalVer: The version.
+
+        Raises:
+            ValueError: If the version does not match the formats.
+        """
+        fields = compile_version_parser(version_format, date_format).parse(version)
+        if fields is None:
+            raise ValueError(
+                f"Version '{version}' does not match the version format "
+                f"'{version_format}' and date format '{date_format}'"
+            )
+        return cls(version, fields)
+
+    @classmethod
+    def parse_many(
+        cls,
+        versions: Iterable[str],
+        version_format: str = _DEFAULT_VERSION_FORMAT,
+        date_format: str = _DEFAULT_DATE_FORMAT,
+    ) -> List["CalVer"]:
+        """Parses many version strings, e.g. the tags of a repository.
+
+        Strings that do not match the formats (such as other tags) are skipped.
+
+        Args:
+            versions (Iterable[str]): The version strings.
+            version_format (str, optional): The version format. Defaults to
+                "{current_date}-{build_count:03}".
+            date_format (str, optional): The date format. Defaults to "%Y.%m.%d".
+
+        Returns:
+            List[CalVer]: The versions, in the order of the strings.
+        """
+        versions = list(versions)
+        parsed = compile_version_parser(version_format, date_format).parse_many(
+            versions
+        )
+        return [
+            cls(version, fields)
+            for version, fields in zip(versions, parsed)
+            if fields is not None
+        ]
+
+    def pep440(self) -> str:
+        """Returns the version in canonical PEP 440 form.
+
+        The numbers of the date and the build count form the release segment.
+        `beta` and `rc` become pre-releases, `release` is dropped and custom
+        suffixes become a local version label.
+
+        Returns:
+            str: The PEP 440 version (e.g., "2024.12.14.1rc0").
+
+        Example:
+            CalVer.parse("2024.12.14-001.rc").pep440()  # "2024.12.14.1rc0"
+        """
+        release = [int(number) for number in _DIGITS.findall(self.date or "")]
+        if self.build_count is not None:
+            release.append(self.build_count)
+        rendered = ".".join(map(str, release)) or "0"
+        if self.suffix is None:
+            return rendered
+        if self.suffix in _PEP440_SUFFIXES:
+            return rendered + _PEP440_SUFFIXES[self.suffix]
+        local = _LOCAL_SEPARATORS.sub(".", self.suffix).strip(".").lower()
+        return f"{rendered}+{local}" if local else rendered
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        # Slots without a __dict__ or __setstate__ cannot be restored by default
+        return _restore, (
+            self.text,
+            self.date,
+            self.build_count,
+            self.suffix,
+            self.sort_key,
+        )
+
+    def __str__(self) -> str:
+        return self.text
+
+    def __repr__(self) -> str:
+        return f"CalVer({self.text!r})"
+
+    def __hash__(self) -> int:
+        return hash(self.sort_key)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, CalVer):
+            return NotImplemented
+        return self.sort_key == other.sort_key
+
+    def __ne__(self, other: object) -> bool:
+        if not isinstance(other, CalVer):
+            return NotImplemented
+        return self.sort_key != other.sort_key
+
+    def __lt__(self, other: "CalVer") -> bool:
+        if not isinstance(other, CalVer):
+            return NotImplemented
+        return self.sort_key < other.sort_key
+
+    def __le__(self, other: "CalVer") -> bool:
+        if not isinstance(other, CalVer):
+            return NotImplemented
+        return self.sort_key <= other.sort_key
+
+    def __gt__(self, other: "CalVer") -> bool:
+        if not isinstance(other, CalVer):
+            return NotImplemented
+        return self.sort_key > other.sort_key
+
+    def __ge__(self, other: "CalVer") -> bool:
+        if not isinstance(other, CalVer):
+            return NotImplemented
+        return self.sort_key >= other.sort_key
+
+
+def _restore(
+    text: str,
+    date: Optional[str],
+    build_count: Optional[int],
+    suffix: Optional[str],
+    sort_key: _SortKey,
+) -> CalVer:
+    """Rebuilds a pickled `CalVer` without parsing its string again."""
+    version = CalVer.__new__(CalVer)
+    setter = object.__setattr__
+    setter(version, "text", text)
+    setter(version, "date", date)
+    setter(version, "build_count", build_count)
+    setter(version, "suffix", suffix)
+    setter(version, "sort_key", sort_key)
+    return version
+
+
+def sort_versions(
+    versions: Iterable[str],
+    version_format: str = _DEFAULT_VERSION_FORMAT,
+    date_format: str = _DEFAULT_DATE_FORMAT,
+    reverse: bool = False,
+) -> List[str]:
+    """Sorts version strings by calendar version order.
+
+    Strings that do not match the formats are left out.
+
+    Args:
+        versions (Iterable[str]): The version strings.
+        version_format (str, optional): The version format. Defaults to
+            "{current_date}-{build_count:03}".
+        date_format (str, optional): The date format. Defaults to "%Y.%m.%d".
+        reverse (bool, optional): Whether to put the latest version first. Defaults to False.
+
+    Returns:
+        List[str]: The matching version strings, sorted.
+
+    Example:
+        sort_versions(["2024.12.14-010", "2024.12.14-001.rc", "2024.12.14-001"])
+        # ["2024.12.14-001.rc", "2024.12.14-001", "2024.12.14-010"]
+    """
+    parsed = CalVer.parse_many(versions, version_format, date_format)
+    parsed.sort(key=_SORT_KEY, reverse=reverse)
+    return [version.text for version in parsed]
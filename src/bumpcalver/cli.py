@@ -5,8 +5,16 @@ This module provides a command-line interface for BumpCalver, a tool for calenda
 It allows users to update version strings in their project's files based on the current date and build count.
 Additionally, it can create Git tags and commit changes automatically.
 
+The bump can also be split in two steps: `bumpcalver plan` computes every edit
+without writing anything and saves it to a plan file, and `bumpcalver apply`
+later splices the planned edits into the files without parsing them again.
+`bumpcalver check` prints the current version of every configured file.
+
 Functions:
     main: The main entry point for the CLI.
+    plan_command: Computes the edits of a bump and writes them to a plan file.
+    apply_command: Applies the edits of a plan file.
+    check_command: Prints the version of each file and checks that they agree.
 
 Example:
     To bump the version using the current date and build count:
@@ -20,48 +28,158 @@ Example:
 
     To bump the version, commit changes, and create a Git tag:
         $ bumpcalver --build --git-tag --auto-commit
+
+    To update the configured files using 8 parallel workers:
+        $ bumpcalver --build --jobs 8
+
+    To compute the edits of a bump (a dry run) and apply them later:
+        $ bumpcalver plan --build --output bump-plan.json
+        $ bumpcalver apply bump-plan.json
+
+    To check that every configured file holds the same version:
+        $ bumpcalver check
 """
 
 import os
 import sys
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 import click
 
+from .cache import VersionCache, read_file_version
 from .config import load_config
+from .file_utils import FileTransaction
 from .git_utils import create_git_tag
-from .handlers import update_version_in_files
-from .utils import default_timezone, get_build_version, get_current_datetime_version
-
-
-@click.command()
-@click.option("--beta", is_flag=True, help="Add -beta to version")
-@click.option("--rc", is_flag=True, help="Add -rc to version")
-@click.option("--release", is_flag=True, help="Add -release to version")
-@click.option("--custom", default=None, help="Add -<WhatEverYouWant> to version")
-@click.option("--build", is_flag=True, help="Use build count versioning")
-@click.option(
-    "--timezone",
-    help="Timezone for date calculations (default: value from config or America/New_York)",
+from .handlers import (
+    UpdatedFiles,
+    complete_interrupted_update,
+    get_version_handler,
+    update_version_in_files,
 )
-@click.option(
-    "--git-tag/--no-git-tag", default=None, help="Create a Git tag with the new version"
+from .plan import (
+    PlanRecorder,
+    apply_plan,
+    load_plan,
+    plan_version_update,
+    save_plan,
 )
-@click.option(
-    "--auto-commit/--no-auto-commit",
-    default=None,
-    help="Automatically commit changes when creating a Git tag",
+from .utils import (
+    DATE_VERSION_FORMAT,
+    Clock,
+    compile_version_format,
+    default_timezone,
+    get_build_version,
+    get_current_datetime_version,
 )
-def main(
-    beta: bool,
-    rc: bool,
-    build: bool,
-    release: bool,
-    custom: str,
+
+# Plan file written by `bumpcalver plan` and read by `bumpcalver apply` by default
+DEFAULT_PLAN_FILE = "bumpcalver-plan.json"
+
+
+def _version_options(function: Callable) -> Callable:
+    """Adds the options that select the new version and how files are updated."""
+    options = [
+        click.option("--beta", is_flag=True, help="Add -beta to version"),
+        click.option("--rc", is_flag=True, help="Add -rc to version"),
+        click.option("--release", is_flag=True, help="Add -release to version"),
+        click.option(
+            "--custom", default=None, help="Add -<WhatEverYouWant> to version"
+        ),
+        click.option("--build", is_flag=True, help="Use build count versioning"),
+        click.option(
+            "--timezone",
+            help="Timezone for date calculations (default: value from config or America/New_York)",
+        ),
+        click.option(
+            "--jobs",
+            type=click.IntRange(min=1),
+            default=None,
+            help="Number of parallel workers used to update files (default: value from config or 1)",
+        ),
+    ]
+    for option in reversed(options):
+        function = option(function)
+    return function
+
+
+def _git_options(function: Callable) -> Callable:
+    """Adds the options that control the Git tag and commit."""
+    function = click.option(
+        "--auto-commit/--no-auto-commit",
+        default=None,
+        help="Automatically commit changes when creating a Git tag",
+    )(function)
+    return click.option(
+        "--git-tag/--no-git-tag",
+        default=None,
+        help="Create a Git tag with the new version",
+    )(function)
+
+
+def _cache_option(function: Callable) -> Callable:
+    """Adds the option that turns off the caches in .bumpcalver/cache."""
+    return click.option(
+        "--no-cache",
+        is_flag=True,
+        help="Do not read or write the caches in .bumpcalver/cache",
+    )(function)
+
+
+def _load_settings(
     timezone: Optional[str],
     git_tag: Optional[bool],
     auto_commit: Optional[bool],
+    jobs: Optional[int],
+    no_cache: bool = False,
+) -> Dict[str, Any]:
+    """Loads the configuration and applies the command-line overrides.
+
+    Args:
+        timezone (Optional[str]): The timezone given on the command line.
+        git_tag (Optional[bool]): Whether to create a Git tag, if given on the command line.
+        auto_commit (Optional[bool]): Whether to commit the changes, if given on the command line.
+        jobs (Optional[int]): The number of parallel workers given on the command line.
+        no_cache (bool, optional): Whether to bypass the configuration cache. Defaults to False.
+
+    Returns:
+        Dict[str, Any]: The settings of the run, with file paths resolved against
+            the working directory.
+
+    Exits with status 1 if a setting of the configuration is invalid.
+    """
+    try:
+        config: Dict[str, Any] = load_config(use_cache=not no_cache)
+    except ValueError as e:
+        print(f"Error loading configuration: {e}")
+        sys.exit(1)
+    file_configs: List[Dict[str, Any]] = config.get("file_configs", [])
+    project_root: str = os.getcwd()
+    for file_config in file_configs:
+        file_config["path"] = os.path.join(project_root, file_config["path"])
+
+    return {
+        "version_format": config.get(
+            "version_format", "{current_date}-{build_count:03}"
+        ),
+        "date_format": config.get("date_format", "%Y.%m.%d"),
+        "file_configs": file_configs,
+        "timezone": timezone or config.get("timezone", default_timezone),
+        "git_tag": config.get("git_tag", False) if git_tag is None else git_tag,
+        "auto_commit": (
+            config.get("auto_commit", False) if auto_commit is None else auto_commit
+        ),
+        "jobs": config.get("jobs", 1) if jobs is None else jobs,
+    }
+
+
+def _check_suffix_options(
+    beta: bool, rc: bool, release: bool, custom: Optional[str]
 ) -> None:
+    """Rejects more than one version suffix option.
+
+    Raises:
+        click.UsageError: If more than one suffix option is set.
+    """
     selected_options = [beta, rc, release]
     if custom:
         selected_options.append(True)
@@ -71,62 +189,241 @@ def main(
             "Only one of --beta, --rc, --release, or --custom can be set at a time."
         )
 
-    config: Dict[str, Any] = load_config()
-    version_format: str = config.get(
-        "version_format", "{current_date}-{build_count:03}"
+
+def _new_version(
+    settings: Dict[str, Any],
+    build: bool,
+    beta: bool,
+    rc: bool,
+    release: bool,
+    custom: Optional[str],
+) -> str:
+    """Computes the new version of a run.
+
+    Raises:
+        ValueError: If the version cannot be generated, e.g. from an invalid format.
+    """
+    if beta:
+        suffix: Optional[str] = "beta"
+    elif rc:
+        suffix = "rc"
+    elif release:
+        suffix = "release"
+    else:
+        suffix = custom or None
+
+    if build:
+        print("Build option is set. Calling get_build_version.")
+        init_file_config: Dict[str, Any] = settings["file_configs"][0]
+        return get_build_version(
+            init_file_config,
+            settings["version_format"],
+            settings["timezone"],
+            settings["date_format"],
+            suffix=suffix,
+        )
+
+    print("Build option is not set. Calling get_current_datetime_version.")
+    current_date = get_current_datetime_version(
+        settings["timezone"], settings["date_format"]
     )
-    date_format: str = config.get("date_format", "%Y.%m.%d")
-    file_configs: List[Dict[str, Any]] = config.get("file_configs", [])
-    config_timezone: str = config.get("timezone", default_timezone)
-    config_git_tag: bool = config.get("git_tag", False)
-    config_auto_commit: bool = config.get("auto_commit", False)
+    return compile_version_format(DATE_VERSION_FORMAT).render(
+        current_date, suffix=suffix, timezone=settings["timezone"]
+    )
+
 
-    if not file_configs:  # pragma: no cover
+def _report(
+    new_version: str, files_updated: UpdatedFiles, git_tag: bool, auto_commit: bool
+) -> None:
+    """Prints the updated files and creates the Git tag if requested."""
+    for update in files_updated.updates:
+        if update.changed:
+            print(f"{update.path}: {update.old} -> {update.new}")
+    print(f"Files updated: {files_updated}")
+    if files_updated.unchanged:
+        print(f"Files unchanged: {files_updated.unchanged}")
+
+    if git_tag:
+        create_git_tag(new_version, files_updated, auto_commit)
+
+    print(f"Updated version to {new_version} in specified files.")
+
+
+@click.group(invoke_without_command=True)
+@_version_options
+@_git_options
+@_cache_option
+@click.pass_context
+def main(
+    ctx: click.Context,
+    beta: bool,
+    rc: bool,
+    build: bool,
+    release: bool,
+    custom: str,
+    timezone: Optional[str],
+    git_tag: Optional[bool],
+    auto_commit: Optional[bool],
+    jobs: Optional[int],
+    no_cache: bool,
+) -> None:
+    if ctx.invoked_subcommand is not None:
+        if any(value not in (None, False) for value in ctx.params.values()):
+            raise click.UsageError(
+                f"Options must be given after the {ctx.invoked_subcommand} command."
+            )
+        return
+
+    _check_suffix_options(beta, rc, release, custom)
+
+    settings = _load_settings(timezone, git_tag, auto_commit, jobs, no_cache)
+    if not settings["file_configs"]:  # pragma: no cover
         print("No files specified in the configuration.")
         return
 
-    timezone = timezone or config_timezone
-    if git_tag is None:
-        git_tag = config_git_tag
-    if auto_commit is None:
-        auto_commit = config_auto_commit
+    try:
+        # The configuration was loaded from the working directory, which is
+        # the project root the journal of an interrupted run is kept under
+        project_root = os.getcwd()
+        complete_interrupted_update(project_root)
+        # One transaction for the whole run: the file read for the build count
+        # is parsed once and shared with the update. One clock, so that every
+        # date of the run comes from the same instant.
+        with Clock().activate(), FileTransaction(project_root) as transaction:
+            new_version = _new_version(settings, build, beta, rc, release, custom)
 
-    project_root: str = os.getcwd()
-    for file_config in file_configs:
-        file_config["path"] = os.path.join(project_root, file_config["path"])
+            print(f"Calling update_version_in_files with version: {new_version}")
+            files_updated: UpdatedFiles = update_version_in_files(
+                new_version,
+                settings["file_configs"],
+                jobs=settings["jobs"],
+                transaction=transaction,
+            )
+        _report(
+            new_version, files_updated, settings["git_tag"], settings["auto_commit"]
+        )
+    except (ValueError, KeyError) as e:
+        print(f"Error generating version: {e}")
+        sys.exit(1)
+
+
+@main.command("plan")
+@_version_options
+@click.option(
+    "--output",
+    "-o",
+    default=DEFAULT_PLAN_FILE,
+    show_default=True,
+    help="File to write the plan to",
+)
+@_cache_option
+def plan_command(
+    beta: bool,
+    rc: bool,
+    build: bool,
+    release: bool,
+    custom: str,
+    timezone: Optional[str],
+    jobs: Optional[int],
+    output: str,
+    no_cache: bool,
+) -> None:
+    """Computes the edits of a version bump without writing them.
+
+    Every edit (file, byte span, old and new value) is printed and saved to a
+    plan file, together with a hash of each file, for `bumpcalver apply`.
+    """
+    _check_suffix_options(beta, rc, release, custom)
+
+    settings = _load_settings(timezone, None, None, jobs, no_cache)
+    if not settings["file_configs"]:  # pragma: no cover
+        print("No files specified in the configuration.")
+        return
 
     try:
-        if build:
-            print("Build option is set. Calling get_build_version.")
-            init_file_config: Dict[str, Any] = file_configs[0]
-            new_version: str = get_build_version(
-                init_file_config, version_format, timezone, date_format
+        recorder = PlanRecorder()
+        with Clock().activate(), recorder.activate():
+            new_version = _new_version(settings, build, beta, rc, release, custom)
+            update_plan, files = plan_version_update(
+                new_version,
+                settings["file_configs"],
+                jobs=settings["jobs"],
+                recorder=recorder,
             )
-        else:
-            print("Build option is not set. Calling get_current_datetime_version.")
-            new_version = get_current_datetime_version(timezone, date_format)
-
-        if beta:
-            new_version += ".beta"
-        elif rc:
-            new_version += ".rc"
-        elif release:
-            new_version += ".release"
-        elif custom:
-            new_version += f".{custom}"
-
-        print(f"Calling update_version_in_files with version: {new_version}")
-        files_updated: List[str] = update_version_in_files(new_version, file_configs)
-        print(f"Files updated: {files_updated}")
-
-        if git_tag:
-            create_git_tag(new_version, files_updated, auto_commit)
-
-        print(f"Updated version to {new_version} in specified files.")
     except (ValueError, KeyError) as e:
         print(f"Error generating version: {e}")
         sys.exit(1)
 
+    for file_plan in update_plan.files:
+        for edit in file_plan.edits:
+            print(
+                f"{file_plan.path}:{edit.start}-{edit.end}: {edit.old!r} -> {edit.new!r}"
+            )
+    if files.unchanged:
+        print(f"Files unchanged: {files.unchanged}")
+    save_plan(update_plan, output)
+    print(f"Plan for version {new_version} written to {output}.")
+
+
+@main.command("apply")
+@click.argument("plan_file", default=DEFAULT_PLAN_FILE, type=click.Path(dir_okay=False))
+@_git_options
+@_cache_option
+def apply_command(
+    plan_file: str, git_tag: Optional[bool], auto_commit: Optional[bool], no_cache: bool
+) -> None:
+    """Applies the edits of a plan written by `bumpcalver plan`.
+
+    The files are not parsed again. If any of them changed since the plan was
+    made, nothing is written.
+    """
+    settings = _load_settings(None, git_tag, auto_commit, None, no_cache)
+    try:
+        project_root = os.getcwd()
+        complete_interrupted_update(project_root)
+        update_plan = load_plan(plan_file, project_root)
+        files_updated = apply_plan(update_plan, root=project_root)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error applying plan: {e}")
+        sys.exit(1)
+    _report(
+        update_plan.version,
+        files_updated,
+        settings["git_tag"],
+        settings["auto_commit"],
+    )
+
+
+@main.command("check")
+@_cache_option
+def check_command(no_cache: bool) -> None:
+    """Prints the version held by each configured file.
+
+    Exits with status 1 if a version cannot be read or the files hold
+    different versions (compared in their PEP 440 form). Versions are cached
+    per file and reused until the file changes, unless --no-cache is given.
+    """
+    settings = _load_settings(None, None, None, None, no_cache)
+    cache = None if no_cache else VersionCache()
+
+    normalized = set()
+    missing = False
+    for file_config in settings["file_configs"]:
+        version = read_file_version(file_config, cache)
+        print(f"{file_config['path']}: {version}")
+        if version is None:
+            missing = True
+        else:
+            handler = get_version_handler(file_config.get("file_type", ""))
+            normalized.add(handler.format_pep440_version(str(version)))
+    if cache is not None:
+        cache.save()
+
+    if missing or len(normalized) > 1:
+        print("Files hold different versions.")
+        sys.exit(1)
+    print("All files hold the same version.")
+
 
 if __name__ == "__main__":
     main()
@@ -4,11 +4,15 @@ Configuration loader for BumpCalver.
 This module provides functionality to load configuration settings for BumpCalver
 from either a `pyproject.toml` or `bumpcalver.toml` file. The configuration
 includes settings for version format, timezone, file configurations, Git tagging,
-and auto-commit.
+auto-commit, and the number of parallel jobs used to update files.
 
 The primary configuration file is `pyproject.toml`. If it is not found, the module
 will look for `bumpcalver.toml`.
 
+The normalized configuration can be cached in `.bumpcalver/cache/config`, keyed
+by a hash of the configuration file, so that later runs neither parse the TOML
+nor resolve the file paths again until the file changes.
+
 Functions:
     load_config: Loads the configuration settings from the configuration file.
 
@@ -19,14 +23,52 @@ Example:
 
 import os
 import sys
-from typing import Any, Dict
+from typing import Any, Dict, Optional, Tuple
+
+from . import __version__
+from .cache import DEFAULT_CACHE_DIR, load_cache, save_cache
+from .utils import compile_version_format, default_timezone, parse_dot_path
+
+# Cache file of the normalized configuration written by `load_config`
+CONFIG_CACHE_PATH = os.path.join(DEFAULT_CACHE_DIR, "config")
+
+
+def _config_cache_key(config_file: str, source: bytes) -> Tuple[str, str, str, str]:
+    """Returns the key of a configuration file's cache entry.
+
+    The key includes the BumpCalver version and the path separator, which the
+    normalization depends on besides the file content.
+    """
+    import hashlib
+
+    return (config_file, hashlib.sha256(source).hexdigest(), __version__, os.sep)
+
+
+def _print_converted_path(original_path: str, converted_path: str) -> None:
+    """Prints how the path of a file configuration was resolved."""
+    print(f"Original path: {original_path} -> Converted path: {converted_path}")
+
 
-import toml
+class _InvalidSettingError(ValueError):
+    """A configuration setting that fails the run instead of being ignored."""
 
-from .utils import default_timezone, parse_dot_path
 
+def load_config(use_cache: bool = False) -> Dict[str, Any]:
+    """Loads the configuration settings from the configuration file.
 
-def load_config() -> Dict[str, Any]:
+    Args:
+        use_cache (bool, optional): Whether to reuse the configuration normalized by an
+            earlier call for the same file content, and to store it for later calls
+            in `CONFIG_CACHE_PATH`. Defaults to False.
+
+    Returns:
+        Dict[str, Any]: The configuration, or an empty dictionary if no configuration
+            file was found or it could not be loaded.
+
+    Raises:
+        ValueError: If the version format or the number of jobs of the
+            configuration is invalid.
+    """
     config: Dict[str, Any] = {}
 
     config_file = None
@@ -35,10 +77,39 @@ def load_config() -> Dict[str, Any]:
     elif os.path.exists("bumpcalver.toml"):
         config_file = "bumpcalver.toml"
 
+    source: Optional[bytes] = None
+    cache_key: Optional[Tuple[str, str, str, str]] = None
+    if config_file and use_cache:
+        try:
+            with open(config_file, "rb") as f:
+                source = f.read()
+        except OSError:
+            source = None
+        if source is not None:
+            cache_key = _config_cache_key(config_file, source)
+            cached = load_cache(CONFIG_CACHE_PATH)
+            if (
+                isinstance(cached, tuple)
+                and len(cached) == 3
+                and cached[0] == cache_key
+            ):
+                config, original_paths = cached[1], cached[2]
+                for original_path, file_config in zip(
+                    original_paths, config.get("file_configs", [])
+                ):
+                    _print_converted_path(original_path, file_config["path"])
+                return config
+
     if config_file:
+        # Imported here so that e.g. `bumpcalver --help` does not load the parser
+        import toml
+
         try:
-            with open(config_file, "r", encoding="utf-8") as f:
-                loaded_config: Dict[str, Any] = toml.load(f)
+            if source is not None:
+                loaded_config: Dict[str, Any] = toml.loads(source.decode("utf-8"))
+            else:
+                with open(config_file, "r", encoding="utf-8") as f:
+                    loaded_config = toml.load(f)
 
             if config_file == "pyproject.toml":
                 bumpcalver_config: Dict[str, Any] = loaded_config.get("tool", {}).get(
@@ -47,23 +118,43 @@ def load_config() -> Dict[str, Any]:
             else:
                 bumpcalver_config: Dict[str, Any] = loaded_config
 
-            config["version_format"] = bumpcalver_config.get(
+            version_format: str = bumpcalver_config.get(
                 "version_format", "{current_date}-{build_count:03}"
             )
+            # Checked here so that a bad format fails before any file is read
+            try:
+                compile_version_format(version_format)
+            except ValueError as e:
+                raise _InvalidSettingError(
+                    f"Invalid configuration in {config_file}: {e}"
+                ) from e
+            config["version_format"] = version_format
             config["date_format"] = bumpcalver_config.get("date_format", "%Y.%m.%d")
             config["timezone"] = bumpcalver_config.get("timezone", default_timezone)
             config["file_configs"] = bumpcalver_config.get("file", [])
             config["git_tag"] = bumpcalver_config.get("git_tag", False)
             config["auto_commit"] = bumpcalver_config.get("auto_commit", False)
+            jobs = bumpcalver_config.get("jobs", 1)
+            if isinstance(jobs, bool) or not isinstance(jobs, int) or jobs < 1:
+                raise _InvalidSettingError(
+                    f"Invalid configuration in {config_file}: "
+                    f"jobs must be a positive integer, got {jobs!r}"
+                )
+            config["jobs"] = jobs
 
+            original_paths = []
             for file_config in config["file_configs"]:
                 original_path = file_config["path"]
                 file_type = file_config.get("file_type", "")
                 file_config["path"] = parse_dot_path(original_path, file_type)
-                print(
-                    f"Original path: {original_path} -> Converted path: {file_config['path']}"
-                )
+                original_paths.append(original_path)
+                _print_converted_path(original_path, file_config["path"])
+
+            if cache_key is not None:
+                save_cache(CONFIG_CACHE_PATH, (cache_key, config, original_paths))
 
+        except _InvalidSettingError:
+            raise
         except toml.TomlDecodeError as e:
             print(f"Error decoding {config_file}: {e}", file=sys.stderr)
         except Exception as e:
@@ -0,0 +1,947 @@
+"""
+File writing utilities for BumpCalver.
+
+This module provides the write path shared by the version handlers. Handlers
+locate the byte spans of the version values they update and hand the edits to
+`write_edits`, which picks the cheapest way to put them on disk.
+
+A `FileTransaction` is the view of the files of one run: while it is active,
+`read_file` loads each file at most once, `parse_cached` keeps what the
+handlers extracted from it, and `write_edits` and `write_content` only update
+the transaction's buffers. Committing the transaction writes every changed
+file in one phase and moves them into place together.
+
+Classes:
+    TextFormat: The byte order mark and line ending of a text file.
+    FileTransaction: The files of one run, written together through a journal.
+
+Functions:
+    detect_text_format: Detects the byte order mark and line ending of file content.
+    apply_text_format: Gives serializer output the byte order mark and line endings of a file.
+    apply_edits: Applies non-overlapping span replacements to a document.
+    write_edits: Writes span replacements to a file, patching in place when possible.
+    write_content: Writes a whole new body to a file.
+    read_file: Returns the content of a file.
+    parse_cached: Returns a parse of file content, reusing earlier results of the run.
+    current_transaction: Returns the transaction active in the current context.
+    project_journal_path: Returns the absolute path of the journal of a project.
+    recover_transaction: Rolls an interrupted transaction forward or back.
+
+Example:
+    To replace the bytes 10..20 of a file whose content was already read:
+        write_edits("pyproject.toml", content, {(10, 20): b'"2024.12.15"'})
+"""
+
+import os
+import stat
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import (
+    Any,
+    AnyStr,
+    BinaryIO,
+    Callable,
+    Dict,
+    Hashable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+_T = TypeVar("_T")
+
+# Size of the reads used to copy unchanged ranges when the kernel cannot copy them
+_COPY_CHUNK_SIZE = 1024 * 1024
+
+# Journal of the transaction being committed, relative to the project root. It
+# only exists while the staged files are being moved into place.
+DEFAULT_JOURNAL_PATH = os.path.join(".bumpcalver", "journal.json")
+
+_TEMP_PREFIX = ".bumpcalver-"
+
+# Transaction that file writes of the current context are staged in, if any
+_ACTIVE_TRANSACTION: "ContextVar[Optional[FileTransaction]]" = ContextVar(
+    "bumpcalver_transaction", default=None
+)
+
+UTF8_BOM = b"\xef\xbb\xbf"
+
+
+class TextFormat(NamedTuple):
+    """The byte order mark and line ending of a text file.
+
+    Attributes:
+        bom (bytes): The UTF-8 byte order mark, or b"" if the file has none.
+        newline (bytes): The line ending used by the file, b"\\r\\n" or b"\\n".
+    """
+
+    bom: bytes
+    newline: bytes
+
+
+def detect_text_format(content: bytes) -> TextFormat:
+    """Detects the byte order mark and line ending of file content.
+
+    The line ending is the one that terminates the first line; files without
+    line breaks are reported as using b"\\n".
+
+    Args:
+        content (bytes): The raw content of the file.
+
+    Returns:
+        TextFormat: The detected byte order mark and line ending.
+    """
+    bom = UTF8_BOM if content.startswith(UTF8_BOM) else b""
+    first_newline = content.find(b"\n")
+    crlf = first_newline > 0 and content[first_newline - 1 : first_newline] == b"\r"
+    return TextFormat(bom, b"\r\n" if crlf else b"\n")
+
+
+def apply_text_format(content: bytes, text_format: TextFormat) -> bytes:
+    """Gives serializer output the byte order mark and line endings of a file.
+
+    Serializers used when a document has to be rewritten as a whole (toml,
+    PyYAML, json, ElementTree) emit "\\n" line endings and no byte order mark;
+    this restores the original file's conventions so that the rewrite does not
+    churn every line of a Windows-authored file.
+
+    Args:
+        content (bytes): The serialized document.
+        text_format (TextFormat): The format of the original file.
+
+    Returns:
+        bytes: The document with the original byte order mark and line endings.
+    """
+    if content.startswith(UTF8_BOM):
+        content = content[len(UTF8_BOM) :]
+    if text_format.newline != b"\n":
+        content = content.replace(b"\r\n", b"\n").replace(b"\n", text_format.newline)
+    return text_format.bom + content
+
+
+def apply_edits(content: AnyStr, edits: Dict[Tuple[int, int], AnyStr]) -> AnyStr:
+    """Applies non-overlapping span replacements to a document.
+
+    Args:
+        content (AnyStr): The original document, as text or bytes.
+        edits (Dict[Tuple[int, int], AnyStr]): Replacements keyed by (start, end) span.
+
+    Returns:
+        AnyStr: The document with every span replaced.
+    """
+    if not edits:
+        return content
+    chunks: List[AnyStr] = []
+    position = 0
+    for (start, end), replacement in sorted(edits.items()):
+        chunks.append(content[position:start])
+        chunks.append(replacement)
+        position = end
+    chunks.append(content[position:])
+    return content[:0].join(chunks)
+
+
+def _compose_edits(
+    base: Dict[Tuple[int, int], bytes], edits: Dict[Tuple[int, int], bytes]
+) -> Optional[Dict[Tuple[int, int], bytes]]:
+    """Combines span replacements applied one after the other.
+
+    Args:
+        base (Dict[Tuple[int, int], bytes]): Replacements of the original document.
+        edits (Dict[Tuple[int, int], bytes]): Replacements of the document with `base` applied.
+
+    Returns:
+        Optional[Dict[Tuple[int, int], bytes]]: Replacements of the original document
+            with the same result, or None if an edit overlaps or touches a span of `base`.
+    """
+    combined = dict(base)
+    spans = sorted(base.items())
+    for (start, end), data in edits.items():
+        # Offset of the original document against the edited one before `start`
+        shift = 0
+        for (base_start, base_end), base_data in spans:
+            edited_start = base_start + shift
+            if edited_start > end:
+                break
+            if edited_start + len(base_data) >= start:
+                return None
+            shift += len(base_data) - (base_end - base_start)
+        combined[(start - shift, end - shift)] = data
+    return combined
+
+
+def _copy_range(source: int, target: int, offset: int, count: int) -> None:
+    """Appends `count` bytes of `source` starting at `offset` to `target`.
+
+    The copy is done by the kernel with `os.copy_file_range` or `os.sendfile`
+    when available, and falls back to bounded reads and writes otherwise.
+    """
+    end = offset + count
+    copy_file_range = getattr(os, "copy_file_range", None)
+    sendfile = getattr(os, "sendfile", None)
+    while offset < end:
+        copied = 0
+        if copy_file_range is not None:
+            try:
+                copied = copy_file_range(source, target, end - offset, offset)
+            except OSError:
+                # Not supported between these files (e.g. across filesystems)
+                copy_file_range = None
+                continue
+        elif sendfile is not None:
+            try:
+                copied = sendfile(target, source, offset, end - offset)
+            except OSError:
+                sendfile = None
+                continue
+        else:
+            chunk = os.pread(source, min(_COPY_CHUNK_SIZE, end - offset), offset)
+            copied = os.write(target, chunk) if chunk else 0
+        if copied == 0:
+            raise OSError(f"Unexpected end of file while copying at offset {offset}")
+        offset += copied
+
+
+def _create_temp(directory: str) -> Tuple[int, str]:
+    """Creates a new, empty file with a unique name in `directory`.
+
+    This is `tempfile.mkstemp` without the cost of importing `tempfile`, which
+    would otherwise be loaded by every run that writes a file.
+
+    Returns:
+        Tuple[int, str]: The open descriptor and the path of the file.
+    """
+    while True:
+        temp_path = os.path.join(directory, _TEMP_PREFIX + os.urandom(6).hex())
+        try:
+            descriptor = os.open(
+                temp_path,
+                os.O_RDWR | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0),
+                0o600,
+            )
+        except FileExistsError:  # pragma: no cover - 48 random bits
+            continue
+        return descriptor, temp_path
+
+
+def _copy_metadata(temp_path: str, file_stat: os.stat_result) -> None:
+    """Gives a temporary file the owner and permissions of the file it replaces.
+
+    The owner is only copied where the process may set it (e.g. the group, or
+    any owner when running as root). Access control lists and extended
+    attributes are not copied.
+    """
+    if hasattr(os, "chown"):
+        try:
+            os.chown(temp_path, file_stat.st_uid, file_stat.st_gid)
+        except OSError:
+            pass
+    os.chmod(temp_path, stat.S_IMODE(file_stat.st_mode))
+
+
+def _stage_edits(
+    source_path: str, target_path: str, edits: Dict[Tuple[int, int], bytes]
+) -> str:
+    """Writes a copy of a file with span replacements to a new temporary file.
+
+    The unchanged ranges around the spans are copied file-to-file (see
+    `_copy_range`), so memory use does not depend on the file size. The
+    temporary file is created next to `target_path`, so that it can be moved
+    over it atomically, and gets the owner and permissions of the source
+    (see `_copy_metadata`).
+
+    Returns:
+        str: The path of the temporary file.
+    """
+    descriptor, temp_path = _create_temp(os.path.dirname(target_path))
+    try:
+        with open(source_path, "rb") as source:
+            source_fd = source.fileno()
+            file_stat = os.fstat(source_fd)
+            position = 0
+            for (start, end), data in sorted(edits.items()):
+                _copy_range(source_fd, descriptor, position, start - position)
+                os.write(descriptor, data)
+                position = end
+            _copy_range(source_fd, descriptor, position, file_stat.st_size - position)
+        _copy_metadata(temp_path, file_stat)
+    except BaseException:
+        os.close(descriptor)
+        os.unlink(temp_path)
+        raise
+    os.close(descriptor)
+    return temp_path
+
+
+def _stage_content(source_path: str, target_path: str, content: bytes) -> str:
+    """Writes a new body for a file to a temporary file next to `target_path`.
+
+    Returns:
+        str: The path of the temporary file, which has the owner and permissions
+            of the source.
+    """
+    descriptor, temp_path = _create_temp(os.path.dirname(target_path))
+    try:
+        with open(descriptor, "wb", closefd=False) as file:
+            file.write(content)
+        _copy_metadata(temp_path, os.stat(source_path))
+    except BaseException:
+        os.close(descriptor)
+        os.unlink(temp_path)
+        raise
+    os.close(descriptor)
+    return temp_path
+
+
+def _same_length(edits: Dict[Tuple[int, int], bytes]) -> bool:
+    """Returns whether every replacement has the length of the span it replaces."""
+    return all(len(data) == end - start for (start, end), data in edits.items())
+
+
+def _patch(file: BinaryIO, patches: List[Tuple[int, bytes]]) -> None:
+    """Overwrites bytes of an open file at the given offsets."""
+    for offset, data in patches:
+        if hasattr(os, "pwrite"):
+            os.pwrite(file.fileno(), data, offset)
+        else:  # pragma: no cover - Windows has no positional writes
+            file.seek(offset)
+            file.write(data)
+
+
+def _overwrite(source_path: str, target_path: str, offset: int = 0) -> None:
+    """Copies a file over another from `offset` on, keeping the target's inode.
+
+    The bytes are copied file-to-file (see `_copy_range`), then the target is
+    cut to the size of the source and flushed to disk.
+    """
+    with open(source_path, "rb") as source, open(target_path, "r+b") as target:
+        size = os.fstat(source.fileno()).st_size
+        os.lseek(target.fileno(), offset, os.SEEK_SET)
+        _copy_range(source.fileno(), target.fileno(), offset, size - offset)
+        os.ftruncate(target.fileno(), size)
+        os.fsync(target.fileno())
+
+
+def _rewrite_in_place(file_path: str, edits: Dict[Tuple[int, int], bytes]) -> None:
+    """Rewrites a file with span replacements, keeping its inode.
+
+    The new content and a backup of the file are staged next to it with
+    `_stage_edits`, then the new content is copied over the file from the
+    first edit on. Memory use does not depend on the file size. Readers may
+    see the file half written while it is copied; if the copy fails, the file
+    is restored from the backup, and the backup is kept if that fails too.
+    """
+    temp_path = _stage_edits(file_path, file_path, edits)
+    try:
+        backup_path = _stage_edits(file_path, file_path, {})
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    try:
+        _overwrite(temp_path, file_path, min(edits)[0])
+    except BaseException:
+        _overwrite(backup_path, file_path)
+        os.unlink(backup_path)
+        raise
+    finally:
+        os.unlink(temp_path)
+    os.unlink(backup_path)
+
+
+def _splice_edits(file_path: str, edits: Dict[Tuple[int, int], bytes]) -> None:
+    """Rewrites a file with span replacements through a temporary file.
+
+    The file is staged with `_stage_edits` and moved over the original with
+    `os.replace`, which makes the update atomic. The new file gets the owner
+    and permissions of the original, but not its access control lists or
+    extended attributes. A file with other hardlinks would lose them when
+    replaced, so it is overwritten in place behind a backup instead (see
+    `_rewrite_in_place`).
+    """
+    real_path = os.path.realpath(file_path)
+    if os.stat(real_path).st_nlink > 1:
+        _rewrite_in_place(real_path, edits)
+        return
+    temp_path = _stage_edits(real_path, real_path, edits)
+    try:
+        os.replace(temp_path, real_path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def write_edits(
+    file_path: str, content: bytes, edits: Dict[Tuple[int, int], bytes]
+) -> bool:
+    """Writes span replacements to a file, patching in place when possible.
+
+    Replacements whose bytes equal the current content of their span are
+    dropped, and when nothing is left the file is not opened for writing at
+    all, so its modification time is preserved and build tools that track it
+    do not rebuild.
+
+    When every replacement has the same length as the span it replaces (the
+    common case for calendar versions, e.g. "2024.12.14-001" to
+    "2024.12.15-002") only those bytes are overwritten with positional writes:
+    the cost does not depend on the file size, and the file keeps its inode,
+    hardlinks and permissions. Otherwise the file is rebuilt in a temporary
+    file, copying the unchanged ranges around the spans in the kernel, and
+    atomically moved into place (files with other hardlinks are overwritten in
+    place behind a backup instead, see `_splice_edits`). Platforms
+    without positional reads fall back to writing the edited content directly.
+
+    Args:
+        file_path (str): The path to the file.
+        content (bytes): The current content of the file, as read by the handler.
+        edits (Dict[Tuple[int, int], bytes]): Replacements keyed by (start, end) byte span.
+
+    Returns:
+        bool: True if the file was written, False if every span already held its replacement.
+    """
+    edits = {
+        (start, end): data
+        for (start, end), data in edits.items()
+        if content[start:end] != data
+    }
+    if not edits:
+        return False
+    transaction = _ACTIVE_TRANSACTION.get()
+    if transaction is not None:
+        transaction.stage_edits(file_path, edits)
+        return True
+    if _same_length(edits):
+        with open(file_path, "r+b") as file:
+            _patch(file, [(start, data) for (start, _), data in sorted(edits.items())])
+        return True
+    if hasattr(os, "pread"):
+        _splice_edits(file_path, edits)
+        return True
+    with open(file_path, "wb") as file:  # pragma: no cover - Windows
+        file.write(apply_edits(content, edits))
+    return True
+
+
+def write_content(file_path: str, content: bytes) -> None:
+    """Writes a whole new body to a file.
+
+    Used by the handlers that re-serialize a document instead of patching
+    spans. Inside an active `FileTransaction` the body is buffered instead.
+
+    Args:
+        file_path (str): The path to the file.
+        content (bytes): The new content of the file.
+    """
+    transaction = _ACTIVE_TRANSACTION.get()
+    if transaction is not None:
+        transaction.stage_content(file_path, content)
+        return
+    with open(file_path, "wb") as file:
+        file.write(content)
+
+
+def read_file(file_path: str) -> bytes:
+    """Returns the content of a file.
+
+    Inside an active `FileTransaction` each file is read from disk at most once
+    per run, and the content includes the writes staged earlier in the run.
+
+    Args:
+        file_path (str): The path to the file.
+
+    Returns:
+        bytes: The content of the file.
+    """
+    transaction = _ACTIVE_TRANSACTION.get()
+    if transaction is not None:
+        return transaction.read(file_path)
+    with open(file_path, "rb") as file:
+        return file.read()
+
+
+def parse_cached(
+    file_path: str, content: bytes, key: Hashable, parse: Callable[[bytes], _T]
+) -> _T:
+    """Returns `parse(content)`, reusing the result of an earlier call in the run.
+
+    Inside an active `FileTransaction` the result is kept per file and `key`
+    for as long as the file's content does not change, so that e.g. reading a
+    version and then updating it locates the value only once. The result must
+    not be modified by the caller.
+
+    Args:
+        file_path (str): The path to the file.
+        content (bytes): The content of the file, as returned by `read_file`.
+        key (Hashable): Identifies the parse (e.g. the handler and its targets).
+        parse (Callable[[bytes], _T]): Parses the content.
+
+    Returns:
+        _T: The parse result.
+    """
+    transaction = _ACTIVE_TRANSACTION.get()
+    if transaction is None:
+        return parse(content)
+    return transaction.parsed(file_path, content, key, parse)
+
+
+def current_transaction() -> Optional["FileTransaction"]:
+    """Returns the transaction active in the current context, if any."""
+    return _ACTIVE_TRANSACTION.get()
+
+
+def _fsync_path(path: str) -> None:
+    """Flushes a file or directory to disk."""
+    try:
+        descriptor = os.open(path, os.O_RDONLY)
+    except OSError:  # pragma: no cover - directories cannot be opened on Windows
+        return
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+
+
+class _JournalEntry(NamedTuple):
+    """One file of a transaction, as recorded in its journal.
+
+    A file patched in place has no staged file or backup; its `patches` hold
+    the offset, old bytes and new bytes (in hex) of each span instead.
+    """
+
+    path: str
+    staged: str
+    backup: str
+    in_place: bool
+    patches: Sequence[Tuple[int, str, str]] = ()
+
+
+def _patch_entry(entry: _JournalEntry, new: bool) -> None:
+    """Writes the new (or old) bytes of every span of a patched target."""
+    with open(entry.path, "r+b") as file:
+        _patch(
+            file,
+            [
+                (offset, bytes.fromhex(new_data if new else old_data))
+                for offset, old_data, new_data in entry.patches
+            ],
+        )
+        file.flush()
+        os.fsync(file.fileno())
+
+
+def _apply_entry(entry: _JournalEntry) -> None:
+    """Moves a staged file over its target."""
+    if entry.patches:
+        _patch_entry(entry, new=True)
+    elif entry.in_place:
+        # The target has other hardlinks: overwrite its inode so they see the update
+        _overwrite(entry.staged, entry.path)
+        os.unlink(entry.staged)
+    else:
+        os.replace(entry.staged, entry.path)
+
+
+def _back_up_entry(entry: _JournalEntry) -> None:
+    """Keeps the current content of a target until its transaction is committed."""
+    if entry.patches:
+        # The old bytes of the spans are kept in the journal
+        return
+    if not entry.in_place:
+        try:
+            # Free: the replaced inode lives on under the backup name
+            os.link(entry.path, entry.backup)
+            return
+        except OSError:  # pragma: no cover - filesystems without hardlinks
+            pass
+    import shutil
+
+    shutil.copyfile(entry.path, entry.backup)
+
+
+def _restore_entry(entry: _JournalEntry) -> None:
+    """Puts the backup of a target back in place."""
+    if entry.patches:
+        _patch_entry(entry, new=False)
+    elif entry.in_place:
+        _overwrite(entry.backup, entry.path)
+        os.unlink(entry.backup)
+    else:
+        os.replace(entry.backup, entry.path)
+        # Renaming a hardlink over the same inode is a no-op that keeps the source
+        _remove(entry.backup)
+
+
+def _remove(path: str) -> None:
+    """Removes a file if it exists."""
+    if not path:
+        return
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+class FileTransaction:
+    """The files of one run, written together through a journal.
+
+    While the transaction is active (see `activate`), `read_file` serves each
+    file from a buffer filled by a single read, and `parse_cached` keeps the
+    values the handlers located in it. `write_edits` and `write_content`
+    update the buffer and mark the file dirty instead of touching it, so later
+    reads in the same run see the new content.
+
+    `commit` then writes and moves all dirty files into place as a group:
+
+    1. each dirty file is written to a temporary file next to it and flushed
+       to disk, all in one pass: files changed only by span replacements are
+       copied from the target around the spans (see `_stage_edits`), other
+       files are written from their buffer. Files whose replacements all keep
+       the length of their span are not staged but patched in place;
+    2. each target is backed up with a hardlink (a copy for targets that have
+       other hardlinks, which are overwritten in place rather than replaced);
+       the old bytes of patched spans are kept in the journal instead;
+    3. a journal listing the targets, staged files and backups is written;
+    4. the staged files are moved over their targets, the patched spans are
+       written with positional writes, and each directory involved is
+       flushed once;
+    5. the backups and the journal are removed.
+
+    A run interrupted after step 3 can be rolled forward or back with
+    `recover_transaction`; before it, no target has been touched. A single
+    replaced file needs neither backup nor journal, as `os.replace` is atomic,
+    and neither does a single patched span, written with one positional write.
+    Patched files keep their inode, hardlinks, owner and permissions.
+
+    Used as a context manager, the transaction is activated, then committed on
+    success or discarded if an exception is raised.
+
+    Args:
+        project_root (Optional[str], optional): The directory whose journal
+            (`DEFAULT_JOURNAL_PATH`) the commit writes. Defaults to the
+            working directory when the transaction is created.
+
+    Example:
+        with FileTransaction():
+            content = read_file("version.py")
+            write_edits("version.py", content, edits)
+    """
+
+    # Whether the writes are only recorded (e.g. for a plan) and never reach the files
+    dry_run = False
+
+    def __init__(self, project_root: Optional[str] = None) -> None:
+        # Absolute path of the journal written by `commit`
+        self.journal_path = project_journal_path(project_root)
+        # Staged temporary file of each target, keyed by the target's real path
+        self.staged: Dict[str, str] = {}
+        # Same-length span replacements of the targets patched in place
+        self.patched: Dict[str, Dict[Tuple[int, int], bytes]] = {}
+        # Current content of each file read or written in the run
+        self._contents: Dict[str, bytes] = {}
+        # Span replacements that turn each file on disk into its current content,
+        # or None when the content has to be written whole
+        self._edits: Dict[str, Optional[Dict[Tuple[int, int], bytes]]] = {}
+        # Real paths of the files whose buffer has not been staged yet
+        self._dirty: Dict[str, None] = {}
+        self._parsed: Dict[Tuple[str, Hashable], Tuple[bytes, Any]] = {}
+        self._token: Any = None
+
+    @contextmanager
+    def activate(self) -> Iterator["FileTransaction"]:
+        """Routes the file reads and writes of the current context to this transaction."""
+        token = _ACTIVE_TRANSACTION.set(self)
+        try:
+            yield self
+        finally:
+            _ACTIVE_TRANSACTION.reset(token)
+
+    def __enter__(self) -> "FileTransaction":
+        self._token = _ACTIVE_TRANSACTION.set(self)
+        return self
+
+    def __exit__(self, exc_type: Any, exc_value: Any, traceback: Any) -> None:
+        _ACTIVE_TRANSACTION.reset(self._token)
+        if exc_type is None:
+            self.commit()
+        else:
+            self.discard()
+
+    def read(self, file_path: str) -> bytes:
+        """Returns the current content of a file, reading it at most once.
+
+        Args:
+            file_path (str): The path to the file.
+
+        Returns:
+            bytes: The content on disk, or the content written in this run.
+        """
+        target = os.path.realpath(file_path)
+        content = self._contents.get(target)
+        if content is None:
+            with open(self.staged.get(target, file_path), "rb") as file:
+                content = file.read()
+            self._contents[target] = content
+        return content
+
+    def parsed(
+        self,
+        file_path: str,
+        content: bytes,
+        key: Hashable,
+        parse: Callable[[bytes], _T],
+    ) -> _T:
+        """Returns `parse(content)`, reusing the result for unchanged content.
+
+        Args:
+            file_path (str): The path to the file.
+            content (bytes): The content of the file.
+            key (Hashable): Identifies the parse.
+            parse (Callable[[bytes], _T]): Parses the content.
+
+        Returns:
+            _T: The parse result.
+        """
+        cache_key = (os.path.realpath(file_path), key)
+        cached = self._parsed.get(cache_key)
+        if cached is not None and cached[0] is content:
+            return cached[1]
+        result = parse(content)
+        self._parsed[cache_key] = (content, result)
+        return result
+
+    def _stage(self, target: str, temp_path: str) -> None:
+        previous = self.staged.get(target)
+        self.staged[target] = temp_path
+        self.patched.pop(target, None)
+        if previous is not None:
+            os.unlink(previous)
+
+    def _patch(self, target: str, edits: Dict[Tuple[int, int], bytes]) -> None:
+        self.patched[target] = edits
+        _remove(self.staged.pop(target, ""))
+
+    def stage_edits(self, file_path: str, edits: Dict[Tuple[int, int], bytes]) -> None:
+        """Applies span replacements to the buffer of a file.
+
+        Args:
+            file_path (str): The path to the file.
+            edits (Dict[Tuple[int, int], bytes]): Replacements keyed by (start, end) byte span.
+        """
+        target = os.path.realpath(file_path)
+        content = self.read(file_path)
+        base = self._edits.get(target, {})
+        if base is not None:
+            # Kept relative to the file on disk, so that it can be staged by
+            # copying the unchanged ranges instead of writing the whole buffer
+            self._edits[target] = _compose_edits(base, edits)
+        self._contents[target] = apply_edits(content, edits)
+        self._dirty[target] = None
+
+    def stage_content(self, file_path: str, content: bytes) -> None:
+        """Replaces the buffer of a file with a whole new body.
+
+        Args:
+            file_path (str): The path to the file.
+            content (bytes): The new content of the file.
+        """
+        target = os.path.realpath(file_path)
+        self._dirty[target] = None
+        self._contents[target] = content
+        self._edits[target] = None
+
+    def flush(self) -> None:
+        """Writes every dirty file to a temporary file next to its target.
+
+        A file changed only by span replacements is staged with `_stage_edits`,
+        which copies the unchanged ranges from the target in the kernel, or is
+        left to be patched in place by `commit` when every replacement keeps
+        the length of its span; other files are staged from their buffer.
+        """
+        dirty, self._dirty = self._dirty, {}
+        for target in dirty:
+            edits = self._edits.get(target)
+            if edits is not None and _same_length(edits):
+                self._patch(target, edits)
+            elif edits is not None:
+                self._stage(target, _stage_edits(target, target, edits))
+            else:
+                self._stage(
+                    target, _stage_content(target, target, self._contents[target])
+                )
+
+    def discard(self) -> None:
+        """Drops every buffer and staged file, leaving all targets untouched."""
+        for temp_path in self.staged.values():
+            _remove(temp_path)
+        self.staged = {}
+        self.patched = {}
+        self._contents = {}
+        self._edits = {}
+        self._dirty = {}
+        self._parsed = {}
+
+    def commit(self, journal_path: Optional[str] = None) -> None:
+        """Writes every dirty file and moves them into place.
+
+        Args:
+            journal_path (Optional[str], optional): Where to write the journal.
+                Defaults to the `journal_path` of the transaction.
+        """
+        journal_path = journal_path or self.journal_path
+        try:
+            self.flush()
+        except BaseException:
+            self.discard()
+            raise
+        self._contents = {}
+        self._edits = {}
+        self._parsed = {}
+        if not self.staged and not self.patched:
+            return
+        staged, self.staged = self.staged, {}
+        patched, self.patched = self.patched, {}
+        try:
+            entries = [
+                _JournalEntry(
+                    target,
+                    temp_path,
+                    temp_path + ".orig",
+                    os.stat(target).st_nlink > 1,
+                )
+                for target, temp_path in staged.items()
+            ]
+            for entry in entries:
+                _fsync_path(entry.staged)
+            entries += [
+                _patched_entry(target, edits) for target, edits in patched.items()
+            ]
+            entries.sort()
+        except BaseException:
+            for temp_path in staged.values():
+                _remove(temp_path)
+            raise
+
+        directories = {
+            os.path.dirname(entry.path) for entry in entries if not entry.patches
+        }
+        if len(entries) == 1 and (
+            len(entries[0].patches) == 1 or not entries[0].in_place
+        ):
+            _apply_entry(entries[0])
+            for directory in directories:
+                _fsync_path(directory)
+            return
+
+        try:
+            for entry in entries:
+                _back_up_entry(entry)
+            _write_journal(journal_path, entries)
+        except BaseException:
+            for entry in entries:
+                _remove(entry.staged)
+                _remove(entry.backup)
+            raise
+
+        for entry in entries:
+            _apply_entry(entry)
+        for directory in directories:
+            _fsync_path(directory)
+        for entry in entries:
+            _remove(entry.backup)
+        _remove_journal(journal_path)
+
+
+def _patched_entry(target: str, edits: Dict[Tuple[int, int], bytes]) -> _JournalEntry:
+    """Returns the journal entry of a target patched in place, with its old bytes."""
+    patches = []
+    with open(target, "rb") as file:
+        for (start, end), data in sorted(edits.items()):
+            file.seek(start)
+            patches.append((start, file.read(end - start).hex(), data.hex()))
+    return _JournalEntry(target, "", "", True, patches)
+
+
+def _write_journal(journal_path: str, entries: List[_JournalEntry]) -> None:
+    """Durably writes the journal of a transaction."""
+    import json
+
+    directory = os.path.dirname(journal_path) or "."
+    os.makedirs(directory, exist_ok=True)
+    temp_path = journal_path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as file:
+        json.dump({"files": [entry._asdict() for entry in entries]}, file)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_path, journal_path)
+    _fsync_path(directory)
+
+
+def _remove_journal(journal_path: str) -> None:
+    """Removes a journal and its directory once it is empty."""
+    _remove(journal_path)
+    try:
+        os.rmdir(os.path.dirname(journal_path) or ".")
+    except OSError:
+        pass
+
+
+def project_journal_path(project_root: Optional[str] = None) -> str:
+    """Returns the absolute path of the journal of a project.
+
+    Args:
+        project_root (Optional[str], optional): The directory holding the
+            project's configuration. Defaults to the working directory.
+
+    Returns:
+        str: The path of `DEFAULT_JOURNAL_PATH` under the project root.
+    """
+    return os.path.join(
+        os.path.abspath(project_root or os.curdir), DEFAULT_JOURNAL_PATH
+    )
+
+
+def recover_transaction(
+    journal_path: Optional[str] = None, roll_back: bool = False
+) -> List[str]:
+    """Rolls an interrupted transaction forward or back.
+
+    Rolling forward moves the remaining staged files into place, so that every
+    file of the transaction is updated. Rolling back restores every target
+    from its backup, so that none is.
+
+    Args:
+        journal_path (Optional[str], optional): The journal of the interrupted
+            transaction. Defaults to the journal of the working directory.
+        roll_back (bool, optional): Whether to roll back instead of forward.
+
+    Returns:
+        List[str]: The paths of the files in the transaction, or an empty list
+            if there is no journal.
+    """
+    journal_path = journal_path or project_journal_path()
+    try:
+        file = open(journal_path, "r", encoding="utf-8")
+    except FileNotFoundError:
+        return []
+    import json
+
+    with file:
+        entries = [_JournalEntry(**entry) for entry in json.load(file)["files"]]
+
+    for entry in entries:
+        # Patching is idempotent, so patched targets are always written again
+        if roll_back:
+            if entry.patches or os.path.exists(entry.backup):
+                _restore_entry(entry)
+            _remove(entry.staged)
+        else:
+            if entry.patches or os.path.exists(entry.staged):
+                _apply_entry(entry)
+            _remove(entry.backup)
+    for directory in {os.path.dirname(entry.path) for entry in entries}:
+        _fsync_path(directory)
+    _remove_journal(journal_path)
+    return [entry.path for entry in entries]
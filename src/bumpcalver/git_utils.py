@@ -6,13 +6,14 @@ and committing changes. It is used by the BumpCalver CLI to automate version con
 
 Functions:
     create_git_tag: Creates a Git tag and optionally commits changes.
+    get_git_sha: Returns the abbreviated hash of the current Git commit.
+    get_git_branch: Returns the name of the current Git branch.
 
 Example:
     To create a Git tag and commit changes:
         create_git_tag("v1.0.0", ["file1.py", "file2.py"], auto_commit=True)
 """
 
-import subprocess
 from typing import List
 
 
@@ -36,6 +37,9 @@ def create_git_tag(version: str, files_to_commit: List[str], auto_commit: bool)
         To create a Git tag and commit changes:
             create_git_tag("v1.0.0", ["file1.py", "file2.py"], auto_commit=True)
     """
+    # Only runs that create tags need subprocess
+    import subprocess
+
     try:
         # Check if the Git tag already exists
         tag_check = subprocess.run(
@@ -64,3 +68,47 @@ def create_git_tag(version: str, files_to_commit: List[str], auto_commit: bool)
         print(f"Created Git tag '{version}'")
     except subprocess.CalledProcessError as e:
         print(f"Error during Git operations: {e}")
+
+
+def _git_output(args: List[str]) -> str:
+    """Returns the output of a Git command, stripped.
+
+    Raises:
+        ValueError: If Git is not available or the command fails.
+    """
+    # Only versions that use Git fields need subprocess
+    import subprocess
+
+    try:
+        result = subprocess.run(
+            ["git"] + args, capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError) as e:
+        raise ValueError(f"Error running git {' '.join(args)}: {e}") from e
+    return result.stdout.strip()
+
+
+def get_git_sha() -> str:
+    """
+    Returns the abbreviated hash of the current Git commit.
+
+    Returns:
+        str: The abbreviated commit hash (e.g., "1a2b3c4").
+
+    Raises:
+        ValueError: If the working directory is not in a Git repository with a commit.
+    """
+    return _git_output(["rev-parse", "--short", "HEAD"])
+
+
+def get_git_branch() -> str:
+    """
+    Returns the name of the current Git branch.
+
+    Returns:
+        str: The branch name, or "HEAD" if no branch is checked out.
+
+    Raises:
+        ValueError: If the working directory is not in a Git repository with a commit.
+    """
+    return _git_output(["rev-parse", "--abbrev-ref", "HEAD"])
@@ -14,26 +14,351 @@ Classes:
     XmlVersionHandler: Handler for XML files.
     DockerfileVersionHandler: Handler for Dockerfile files.
     MakefileVersionHandler: Handler for Makefile files.
+    VersionUpdate: The previous and new version of one updated variable.
+    UpdatedFiles: The files updated by `update_version_in_files`.
 
 Functions:
     format_version: Formats the version string according to the specified standard.
     format_pep440_version: Formats the version string according to PEP 440.
+    register_handler: Registers the version handler used for a file type.
+    get_version_handler: Returns the appropriate version handler for a file type.
+    pattern_cache_info: Returns the statistics of the compiled pattern cache.
+    clear_pattern_cache: Empties the compiled pattern cache.
+    complete_interrupted_update: Rolls forward an update left by an interrupted run.
+    update_version_in_files: Updates the version string in multiple files, optionally in parallel.
 
 Example:
     To read and update a version in a Python file:
         handler = PythonVersionHandler()
         version = handler.read_version("version.py", "__version__")
         handler.update_version("version.py", "__version__", "2023.10.05")
+
+    To update it and get the previous version in the same pass:
+        update = handler.swap_version("version.py", "__version__", "2023.10.06")
+        print(f"{update.old} -> {update.new}")
 """
 
-import json
+import contextvars
+import importlib
+import io
+import os
 import re
-import xml.etree.ElementTree as ET
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional
+from contextlib import nullcontext
+from functools import lru_cache
+from itertools import groupby
+from typing import (
+    Any,
+    BinaryIO,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
+
+from .file_utils import (
+    FileTransaction,
+    apply_edits,
+    apply_text_format,
+    detect_text_format,
+    current_transaction,
+    parse_cached,
+    project_journal_path,
+    read_file,
+    recover_transaction,
+    write_content,
+    write_edits,
+)
+from .locators import (
+    decode_toml_string,
+    encode_toml_string,
+    encode_xml_text,
+    encode_yaml_scalar,
+    find_json_values,
+    find_toml_value,
+    find_xml_texts,
+    find_yaml_scalars,
+    split_xml_path,
+)
+
+# Parser libraries are imported by the handlers that use them, so a run that only
+# touches e.g. a Makefile never pays for loading them. They remain reachable as
+# attributes of this module (e.g. `handlers.toml`) for backwards compatibility.
+_LAZY_MODULES = {
+    "ET": "xml.etree.ElementTree",
+    "json": "json",
+    "toml": "toml",
+    "yaml": "yaml",
+}
+
+
+# Upper bound on the number of compiled variable patterns kept by `_version_pattern`
+PATTERN_CACHE_SIZE = 256
+
+_PEP440_LEADING_ZEROS = re.compile(r"\b0+(\d)")
+
+# Number of bytes at the start of a file that `read_version` searches before
+# falling back to the whole file (override per file with `head_window`)
+DEFAULT_HEAD_WINDOW = 64 * 1024
+_HEAD_CHUNK_SIZE = 16 * 1024
+
+# Outcomes of updating one file configuration, as returned by
+# `VersionHandler.update_versions`. A configuration is "unchanged" when its
+# variable already holds the new version, in which case nothing is written.
+UPDATED = "updated"
+UNCHANGED = "unchanged"
+FAILED = "failed"
+
+
+class VersionUpdate(NamedTuple):
+    """The outcome of updating one variable, as returned by `VersionHandler.swap_versions`.
+
+    Attributes:
+        path (str): The path to the file.
+        old (Optional[str]): The version the variable held before the update, or None
+            if it was not found (or was created by the update).
+        new (str): The version written, as formatted for the file.
+        status (str): `UPDATED`, `UNCHANGED` or `FAILED`.
+    """
+
+    path: str
+    old: Optional[str]
+    new: str
+    status: str
+
+    @property
+    def changed(self) -> bool:
+        """Whether the update rewrote the variable."""
+        return self.status == UPDATED
+
+
+class PatternCacheInfo(NamedTuple):
+    """Statistics of the compiled pattern cache.
+
+    Attributes:
+        hits (int): The number of lookups served from the cache.
+        misses (int): The number of lookups that compiled a new pattern.
+        size (int): The number of patterns currently cached.
+        maxsize (int): The maximum number of patterns kept.
+    """
+
+    hits: int
+    misses: int
+    size: int
+    maxsize: int
+
+
+@lru_cache(maxsize=PATTERN_CACHE_SIZE)
+def _version_pattern(
+    handler: str, variable: str, directive: str = ""
+) -> "re.Pattern[bytes]":
+    """Returns the compiled pattern that locates a variable's version value.
+
+    Patterns are compiled once per (handler, variable, directive) and kept in a
+    bounded LRU cache, so bumping many files that use the same variable name
+    does not recompile them.
+
+    Args:
+        handler (str): The handler kind: "python", "dockerfile" or "makefile".
+        variable (str): The variable name that holds the version string.
+        directive (str): The Dockerfile directive ("ARG" or "ENV").
+
+    Returns:
+        re.Pattern[bytes]: The pattern; the version value is group 3 for Python
+        files and group 2 otherwise.
+    """
+    name = re.escape(variable.encode("utf-8"))
+    # Files may start with a UTF-8 byte order mark, which is not whitespace
+    bom = rb"(?:\xef\xbb\xbf)?"
+    if handler == "python":
+        pattern = rb"^(" + bom + rb"\s*" + name + rb'\s*=\s*)(["\'])(.+?)(["\'])(\s*)$'
+    elif handler == "dockerfile":
+        pattern = (
+            rb"(^"
+            + bom
+            + rb"\s*"
+            + directive.encode("ascii")
+            + rb"\s+"
+            + name
+            + rb"\s*=\s*)"
+            rb"(.+?)[ \t\r]*$"
+        )
+    else:
+        pattern = rb"^(" + bom + name + rb"\s*[:]?=\s*)(.*?)\r?$"
+    return re.compile(pattern, re.MULTILINE)
+
+
+def _search_head(
+    file: BinaryIO, pattern: "re.Pattern[bytes]", head_window: int
+) -> "Optional[re.Match[bytes]]":
+    """Searches a file for the first match of a line-based pattern.
+
+    The first `head_window` bytes are read in chunks, and after each chunk the
+    complete lines read so far are searched, so the scan stops shortly after
+    the line holding the match. If the head contains no match, the rest of the
+    file is read and the whole content is searched.
+
+    Args:
+        file (BinaryIO): The file, opened in binary mode.
+        pattern (re.Pattern[bytes]): The pattern; it must not match across a line break
+            into a following line.
+        head_window (int): The number of bytes to scan before falling back to the whole file.
+
+    Returns:
+        Optional[re.Match[bytes]]: The first match, or None if the file has no match.
+    """
+    content = b""
+    while len(content) < head_window:
+        chunk = file.read(min(_HEAD_CHUNK_SIZE, head_window - len(content)))
+        if not chunk:
+            return pattern.search(content)
+        content += chunk
+        match = pattern.search(content, 0, content.rfind(b"\n") + 1)
+        if match:
+            return match
+    return pattern.search(content + file.read())
+
+
+def _find_spans(
+    file_path: str, content: bytes, handler: str, variable: str, directive: str = ""
+) -> List[Tuple[int, int]]:
+    """Returns the byte spans of every version value of a variable in file content.
+
+    The spans are kept by the run's `FileTransaction` (see `parse_cached`), so
+    reading a version and updating it searches the file once.
+
+    Args:
+        file_path (str): The path to the file.
+        content (bytes): The content of the file.
+        handler (str): The handler kind: "python", "dockerfile" or "makefile".
+        variable (str): The variable name that holds the version string.
+        directive (str): The Dockerfile directive ("ARG" or "ENV").
+
+    Returns:
+        List[Tuple[int, int]]: The (start, end) spans of the values, in file order.
+    """
+    pattern = _version_pattern(handler, variable, directive)
+    group = 3 if handler == "python" else 2
+    return parse_cached(
+        file_path,
+        content,
+        (handler, variable, directive),
+        lambda data: [match.span(group) for match in pattern.finditer(data)],
+    )
+
+
+def _find_first_value(
+    file_path: str, handler: str, variable: str, head_window: int, directive: str = ""
+) -> Optional[bytes]:
+    """Returns the first version value of a variable in a file.
+
+    Inside a `FileTransaction` the run's buffer of the file is searched, as
+    the update that follows needs the whole file anyway. Otherwise only the
+    head of the file is read (see `_search_head`).
+
+    Args:
+        file_path (str): The path to the file.
+        handler (str): The handler kind: "python", "dockerfile" or "makefile".
+        variable (str): The variable name that holds the version string.
+        head_window (int): The number of bytes to scan before falling back to the whole file.
+        directive (str): The Dockerfile directive ("ARG" or "ENV").
+
+    Returns:
+        Optional[bytes]: The value, or None if the variable is not assigned.
+    """
+    if current_transaction() is not None:
+        content = read_file(file_path)
+        spans = _find_spans(file_path, content, handler, variable, directive)
+        return content[spans[0][0] : spans[0][1]] if spans else None
+    with open(file_path, "rb") as file:
+        match = _search_head(
+            file, _version_pattern(handler, variable, directive), head_window
+        )
+    return match.group(3 if handler == "python" else 2) if match else None
+
+
+def _find_toml_value(
+    file_path: str, content: bytes, variable: str
+) -> Optional[Tuple[int, int]]:
+    """Locates a dot-separated TOML key, sharing the result within a run (see `find_toml_value`)."""
+    return parse_cached(
+        file_path,
+        content,
+        ("toml", variable),
+        lambda data: find_toml_value(data, variable.split(".")),
+    )
+
+
+def _find_yaml_scalars(
+    file_path: str, content: bytes, variables: List[str]
+) -> List[Optional[Any]]:
+    """Locates dot-separated YAML keys, sharing the result within a run (see `find_yaml_scalars`)."""
+    return parse_cached(
+        file_path,
+        content,
+        ("yaml", tuple(variables)),
+        lambda data: find_yaml_scalars(
+            data.decode("utf-8"), [variable.split(".") for variable in variables]
+        ),
+    )
+
+
+def _find_json_values(
+    file_path: str, content: bytes, variables: List[str]
+) -> List[Optional[Tuple[int, int]]]:
+    """Locates dot-separated JSON keys, sharing the result within a run (see `find_json_values`)."""
+    return parse_cached(
+        file_path,
+        content,
+        ("json", tuple(variables)),
+        lambda data: find_json_values(
+            data, [variable.split(".") for variable in variables]
+        ),
+    )
+
+
+def _find_xml_texts(
+    file_path: str,
+    content: bytes,
+    steps: List[List[Tuple[Optional[str], Optional[str], str]]],
+) -> List[Optional[Any]]:
+    """Locates XML element texts, sharing the result within a run (see `find_xml_texts`)."""
+    return parse_cached(
+        file_path,
+        content,
+        ("xml", tuple(tuple(path) for path in steps)),
+        lambda data: find_xml_texts(data, steps),
+    )
+
+
+def pattern_cache_info() -> PatternCacheInfo:
+    """Returns the statistics of the compiled pattern cache.
+
+    Returns:
+        PatternCacheInfo: The cache hits, misses, current size and maximum size.
+
+    Example:
+        info = pattern_cache_info()
+        print(f"{info.hits} hits, {info.misses} misses")
+    """
+    info = _version_pattern.cache_info()
+    return PatternCacheInfo(info.hits, info.misses, info.currsize, info.maxsize)
+
 
-import toml
-import yaml
+def clear_pattern_cache() -> None:
+    """Empties the compiled pattern cache and resets its statistics."""
+    _version_pattern.cache_clear()
+
+
+def __getattr__(name: str) -> Any:
+    """Imports the parser libraries exposed by this module on first access."""
+    if name in _LAZY_MODULES:
+        return importlib.import_module(_LAZY_MODULES[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # Abstract base class for version handlers
@@ -42,11 +367,15 @@ class VersionHandler(ABC):
 
     This class provides the interface for reading and updating version strings
     in various file formats. Subclasses must implement the `read_version` and
-    `update_version` methods.
+    `swap_versions` methods; the other update methods are defined in terms of
+    `swap_versions`.
 
     Methods:
         read_version: Reads the version string from the specified file.
         update_version: Updates the version string in the specified file.
+        update_versions: Updates several version strings in the specified file.
+        swap_version: Updates the version string and returns the previous one.
+        swap_versions: Updates several version strings and returns the previous ones.
         format_version: Formats the version string according to the specified standard.
         format_pep440_version: Formats the version string according to PEP 440.
     """
@@ -67,20 +396,80 @@ class VersionHandler(ABC):
         """
 
     @abstractmethod
+    def swap_versions(
+        self, file_path: str, new_version: str, file_configs: List[Dict[str, Any]]
+    ) -> List[VersionUpdate]:  # pragma: no cover
+        """Updates several version strings in the specified file and returns the previous ones.
+
+        Each file configuration describes one variable to update (see
+        `update_version_in_files`). The built-in handlers apply all variables
+        with a single read, parse and write, capture the previous value of each
+        variable while locating it, and do not rewrite files that already hold
+        the new version.
+
+        Args:
+            file_path (str): The path to the file.
+            new_version (str): The new version string.
+            file_configs (List[Dict[str, Any]]): The file configurations targeting this file.
+
+        Returns:
+            List[VersionUpdate]: The outcome of each configuration, in order.
+        """
+
     def update_version(
         self, file_path: str, variable: str, new_version: str, **kwargs
-    ) -> bool:  # pragma: no cover
+    ) -> bool:
         """Updates the version string in the specified file.
 
         Args:
             file_path (str): The path to the file.
             variable (str): The variable name that holds the version string.
             new_version (str): The new version string.
-            **kwargs: Additional keyword arguments.
+            **kwargs: Additional keyword arguments, as for `swap_version`.
 
         Returns:
-            bool: True if the version was successfully updated, otherwise False.
+            bool: True if the file holds the new version, otherwise False.
         """
+        return (
+            self.swap_version(file_path, variable, new_version, **kwargs).status
+            != FAILED
+        )
+
+    def update_versions(
+        self, file_path: str, new_version: str, file_configs: List[Dict[str, Any]]
+    ) -> List[str]:
+        """Updates several version strings in the specified file (see `swap_versions`).
+
+        Args:
+            file_path (str): The path to the file.
+            new_version (str): The new version string.
+            file_configs (List[Dict[str, Any]]): The file configurations targeting this file.
+
+        Returns:
+            List[str]: For each configuration, `UPDATED`, `UNCHANGED` or `FAILED`.
+        """
+        return [
+            update.status
+            for update in self.swap_versions(file_path, new_version, file_configs)
+        ]
+
+    def swap_version(
+        self, file_path: str, variable: str, new_version: str, **kwargs
+    ) -> VersionUpdate:
+        """Updates the version string in the specified file and returns the previous one.
+
+        Args:
+            file_path (str): The path to the file.
+            variable (str): The variable name that holds the version string.
+            new_version (str): The new version string.
+            **kwargs: Additional configuration keys (e.g. `directive` or `version_standard`).
+
+        Returns:
+            VersionUpdate: The previous and the new version, and whether the file changed.
+        """
+        return self.swap_versions(
+            file_path, new_version, [dict(kwargs, variable=variable)]
+        )[0]
 
     def format_version(self, version: str, standard: str) -> str:
         """Formats the version string according to the specified standard.
@@ -111,7 +500,7 @@ class VersionHandler(ABC):
         # Replace hyphens and underscores with dots
         version = version.replace("-", ".").replace("_", ".")
         # Ensure no leading zeros in numeric segments
-        version = re.sub(r"\b0+(\d)", r"\1", version)
+        version = _PEP440_LEADING_ZEROS.sub(r"\1", version)
         return version
 
 
@@ -124,18 +513,21 @@ class PythonVersionHandler(VersionHandler):
     Methods:
         read_version: Reads the version string from the specified Python file.
         update_version: Updates the version string in the specified Python file.
+        swap_versions: Updates several version strings and returns the previous ones.
     """
 
     def read_version(self, file_path: str, variable: str, **kwargs) -> Optional[str]:
         """Reads the version string from the specified Python file.
 
         This method searches for the version string in the specified Python file
-        using a regular expression that matches the variable name.
+        using a regular expression that matches the variable name. Only the head
+        of the file is read unless the variable is not assigned there.
 
         Args:
             file_path (str): The path to the Python file.
             variable (str): The variable name that holds the version string.
-            **kwargs: Additional keyword arguments.
+            **kwargs: Additional keyword arguments, including 'head_window', the number of
+                bytes searched before the whole file is (default `DEFAULT_HEAD_WINDOW`).
 
         Returns:
             Optional[str]: The version string if found, otherwise None.
@@ -143,77 +535,74 @@ class PythonVersionHandler(VersionHandler):
         Raises:
             Exception: If there is an error reading the file.
         """
-        version_pattern = re.compile(
-            rf'^\s*{re.escape(variable)}\s*=\s*["\'](.+?)["\']\s*$', re.MULTILINE
-        )
+        head_window = kwargs.get("head_window", DEFAULT_HEAD_WINDOW)
         try:
-            with open(file_path, "r", encoding="utf-8") as file:
-                content = file.read()
-            match = version_pattern.search(content)
-            if match:
-                return match.group(1)
+            value = _find_first_value(file_path, "python", variable, head_window)
+            if value is not None:
+                return value.decode("utf-8")
             print(f"Variable '{variable}' not found in {file_path}")
             return None
         except Exception as e:
             print(f"Error reading version from {file_path}: {e}")
             return None
 
-    def update_version(
-        self, file_path: str, variable: str, new_version: str, **kwargs
-    ) -> bool:
-        """Updates the version string in the specified Python file.
+    def swap_versions(
+        self, file_path: str, new_version: str, file_configs: List[Dict[str, Any]]
+    ) -> List[VersionUpdate]:
+        """Updates several version strings in the specified Python file and returns the previous ones.
 
-        This method searches for the version string in the specified Python file
-        using a regular expression that matches the variable name and updates it
-        with the new version string.
+        The file is read once and the quoted value of every assignment to a
+        configured variable is replaced. When the new version has the same length
+        as the old one the bytes are patched in place (see `write_edits`).
 
         Args:
             file_path (str): The path to the Python file.
-            variable (str): The variable name that holds the version string.
             new_version (str): The new version string.
-            **kwargs: Additional keyword arguments.
+            file_configs (List[Dict[str, Any]]): The file configurations targeting this file.
 
         Returns:
-            bool: True if the version was successfully updated, otherwise False.
-
-        Raises:
-            Exception: If there is an error reading or writing the file.
+            List[VersionUpdate]: The outcome of each configuration, with the previous version.
         """
-        version_pattern = re.compile(
-            rf'^(\s*{re.escape(variable)}\s*=\s*)(["\'])(.+?)(["\'])(\s*)$',
-            re.MULTILINE,
-        )
         try:
-            with open(file_path, "r", encoding="utf-8") as file:
-                content = file.read()
-
-            def replacement(match):
-                return f"{match.group(1)}{match.group(2)}{new_version}{match.group(4)}{match.group(5)}"
-
-            new_content, num_subs = version_pattern.subn(replacement, content)
-
-            if num_subs > 0:
-                with open(file_path, "w", encoding="utf-8") as file:
-                    file.write(new_content)
-                print(f"Updated {file_path}")
-                return True
-            else:
-                print(f"Variable '{variable}' not found in {file_path}")
-                return False
+            content = read_file(file_path)
+
+            results: List[str] = []
+            old_versions: List[Optional[str]] = []
+            edits: Dict[Tuple[int, int], bytes] = {}
+            for file_config in file_configs:
+                variable = file_config.get("variable", "")
+                spans = _find_spans(file_path, content, "python", variable)
+                for span in spans:
+                    edits[span] = new_version.encode("utf-8")
+                if not spans:
+                    print(f"Variable '{variable}' not found in {file_path}")
+                old_versions.append(_span_value(content, spans))
+                results.append(
+                    _edit_status(content, spans, new_version.encode("utf-8"))
+                )
+
+            _write_if_changed(file_path, content, edits, results)
+            return _version_updates(
+                file_path, old_versions, [new_version] * len(file_configs), results
+            )
         except Exception as e:
             print(f"Error updating {file_path}: {e}")
-            return False
+            return _failed_updates(file_path, new_version, file_configs)
 
 
 class TomlVersionHandler(VersionHandler):
     """Handler for reading and updating version strings in TOML files.
 
     This class provides methods to read and update version strings in TOML files.
-    It uses the `toml` library to parse and modify the version string.
+    The version literal is located with a lightweight tokenizer and only its bytes
+    are rewritten, so comments, table order and formatting are preserved. The
+    `toml` library is only used as a fallback for keys that cannot be resolved
+    lexically (e.g. keys inside inline tables).
 
     Methods:
         read_version: Reads the version string from the specified TOML file.
         update_version: Updates the version string in the specified TOML file.
+        swap_versions: Updates several version strings and returns the previous ones.
     """
 
     def read_version(self, file_path: str, variable: str, **kwargs) -> Optional[str]:
@@ -234,12 +623,19 @@ class TomlVersionHandler(VersionHandler):
             Exception: If there is an error reading the file.
         """
         try:
-            with open(file_path, "r", encoding="utf-8") as file:
-                toml_content = toml.load(file)
+            content = read_file(file_path)
+            span = _find_toml_value(file_path, content, variable)
+            if span is not None:
+                return decode_toml_string(content[span[0] : span[1]])
+
+            # Fall back to a full parse for keys the tokenizer cannot resolve
+            import toml
+
+            toml_content = toml.loads(content.decode("utf-8-sig"))
             keys = variable.split(".")
             temp = toml_content
             for key in keys:
-                temp = temp.get(key)
+                temp = temp.get(key) if isinstance(temp, dict) else None
                 if temp is None:
                     print(f"Variable '{variable}' not found in {file_path}")
                     return None
@@ -248,66 +644,100 @@ class TomlVersionHandler(VersionHandler):
             print(f"Error reading version from {file_path}: {e}")
             return None
 
-    def update_version(
-        self, file_path: str, variable: str, new_version: str, **kwargs
-    ) -> bool:
-        """Updates the version string in the specified TOML file.
+    def swap_versions(
+        self, file_path: str, new_version: str, file_configs: List[Dict[str, Any]]
+    ) -> List[VersionUpdate]:
+        """Updates several version strings in the specified TOML file and returns the previous ones.
 
-        This method searches for the version string in the specified TOML file
-        using the provided variable name, which can be a dot-separated path, and updates it
-        with the new version string.
+        The file is read once and each configured dot-separated path is located
+        lexically; only the bytes of the matched string literals are replaced.
+        Paths the tokenizer cannot resolve are applied through a full `toml`
+        parse and dump of the document. The file is written once if at least one
+        path was found.
 
         Args:
             file_path (str): The path to the TOML file.
-            variable (str): The variable name that holds the version string, which can be a dot-separated path.
             new_version (str): The new version string.
-            **kwargs: Additional keyword arguments.
+            file_configs (List[Dict[str, Any]]): The file configurations targeting this file.
 
         Returns:
-            bool: True if the version was successfully updated, otherwise False.
-
-        Raises:
-            Exception: If there is an error reading or writing the file.
+            List[VersionUpdate]: The outcome of each configuration, with the previous version.
         """
-        version_standard = kwargs.get("version_standard", "default")
-        new_version = self.format_version(new_version, version_standard)
-
         try:
-            with open(file_path, "r", encoding="utf-8") as file:
-                toml_content = toml.load(file)
-
-            keys = variable.split(".")
-            temp = toml_content
-            for key in keys[:-1]:
-                if key not in temp:
-                    temp[key] = {}
-                temp = temp[key]
-            last_key = keys[-1]
-            if last_key in temp:
-                temp[last_key] = new_version
+            content = read_file(file_path)
+
+            results: List[str] = [FAILED] * len(file_configs)
+            old_versions: List[Optional[str]] = [None] * len(file_configs)
+            versions = [
+                self.format_version(
+                    new_version, file_config.get("version_standard", "default")
+                )
+                for file_config in file_configs
+            ]
+            edits: Dict[Tuple[int, int], bytes] = {}
+            unresolved: List[int] = []
+            for index, file_config in enumerate(file_configs):
+                span = _find_toml_value(
+                    file_path, content, file_config.get("variable", "")
+                )
+                if span is None:
+                    unresolved.append(index)
+                    continue
+                old_literal = content[span[0] : span[1]]
+                literal = encode_toml_string(versions[index], old_literal)
+                edits[span] = literal
+                old_versions[index] = decode_toml_string(old_literal)
+                results[index] = _edit_status(content, [span], literal)
+
+            rewritten: Optional[bytes] = None
+            if unresolved:
+                import toml
+
+                toml_content = toml.loads(
+                    apply_edits(content, edits).decode("utf-8-sig")
+                )
+                for index in unresolved:
+                    file_config = file_configs[index]
+                    variable = file_config.get("variable", "")
+                    keys = variable.split(".")
+                    temp = toml_content
+                    for key in keys[:-1]:
+                        temp = temp.get(key) if isinstance(temp, dict) else None
+                    if isinstance(temp, dict) and keys[-1] in temp:
+                        old_versions[index] = temp[keys[-1]]
+                        results[index] = _set_value(temp, keys[-1], versions[index])
+                    else:
+                        print(f"Variable '{variable}' not found in {file_path}")
+                if any(results[index] == UPDATED for index in unresolved):
+                    rewritten = apply_text_format(
+                        toml.dumps(toml_content).encode("utf-8"),
+                        detect_text_format(content),
+                    )
+
+            if rewritten is not None:
+                write_content(file_path, rewritten)
+                print(f"{_updated_label()} {file_path}")
             else:
-                print(f"Variable '{variable}' not found in {file_path}")
-                return False
-
-            with open(file_path, "w", encoding="utf-8") as file:
-                toml.dump(toml_content, file)
-
-            print(f"Updated {file_path}")
-            return True
+                _write_if_changed(file_path, content, edits, results)
+            return _version_updates(file_path, old_versions, versions, results)
         except Exception as e:
             print(f"Error updating {file_path}: {e}")
-            return False
+            return _failed_updates(file_path, new_version, file_configs)
 
 
 class YamlVersionHandler(VersionHandler):
     """Handler for reading and updating version strings in YAML files.
 
     This class provides methods to read and update version strings in YAML files.
-    It uses the `yaml` library to parse and modify the version string.
+    The PyYAML event stream (libyaml based when available) is walked only until
+    the dotted path is found, and only the characters of the matched scalar are
+    rewritten, so comments, key order and formatting are preserved. A full
+    `yaml` load and dump is only used to create paths that do not exist yet.
 
     Methods:
         read_version: Reads the version string from the specified YAML file.
         update_version: Updates the version string in the specified YAML file.
+        swap_versions: Updates several version strings and returns the previous ones.
     """
 
     def read_version(self, file_path: str, variable: str, **kwargs) -> Optional[str]:
@@ -328,81 +758,125 @@ class YamlVersionHandler(VersionHandler):
             Exception: If there is an error reading the file.
         """
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                data = yaml.safe_load(f)
-            keys = variable.split(".")
-            temp = data
-            for key in keys:
-                temp = temp.get(key)
-                if temp is None:
-                    print(f"Variable '{variable}' not found in {file_path}")
-                    return None
-            return temp
+            scalar = _find_yaml_scalars(file_path, read_file(file_path), [variable])[0]
+            if scalar is None:
+                print(f"Variable '{variable}' not found in {file_path}")
+                return None
+            return scalar.value
         except Exception as e:
             print(f"Error reading version from {file_path}: {e}")
             return None
 
-    def update_version(
-        self, file_path: str, variable: str, new_version: str, **kwargs
-    ) -> bool:
-        """Updates the version string in the specified YAML file.
+    def swap_versions(
+        self, file_path: str, new_version: str, file_configs: List[Dict[str, Any]]
+    ) -> List[VersionUpdate]:
+        """Updates several version strings in the specified YAML file and returns the previous ones.
 
-        This method searches for the version string in the specified YAML file
-        using the provided variable name, which can be a dot-separated path, and updates it
-        with the new version string.
+        The file is read once and all configured dot-separated paths are located
+        in a single pass over the event stream; only the matched scalars are
+        replaced, keeping their quoting style. Paths that do not exist yet are
+        created through a full load and dump of the document.
 
         Args:
             file_path (str): The path to the YAML file.
-            variable (str): The variable name that holds the version string, which can be a dot-separated path.
             new_version (str): The new version string.
-            **kwargs: Additional keyword arguments.
+            file_configs (List[Dict[str, Any]]): The file configurations targeting this file.
 
         Returns:
-            bool: True if the version was successfully updated, otherwise False.
-
-        Raises:
-            Exception: If there is an error reading or writing the file.
+            List[VersionUpdate]: The outcome of each configuration, with the previous version.
         """
-        version_standard = kwargs.get("version_standard", "default")
-        new_version = self.format_version(new_version, version_standard)
+        import yaml
 
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                data = yaml.safe_load(f)
-            keys = variable.split(".")
-            temp = data
-            for key in keys[:-1]:
-                temp = temp.setdefault(key, {})
-            temp[keys[-1]] = new_version
-            with open(file_path, "w", encoding="utf-8") as f:
-                yaml.safe_dump(data, f)
-            print(f"Updated {file_path}")
-            return True
+            raw = read_file(file_path)
+            content = raw.decode("utf-8")
+
+            scalars = _find_yaml_scalars(
+                file_path,
+                raw,
+                [file_config.get("variable", "") for file_config in file_configs],
+            )
+            results: List[str] = [FAILED] * len(file_configs)
+            old_versions: List[Optional[str]] = [None] * len(file_configs)
+            versions = [
+                self.format_version(
+                    new_version, file_config.get("version_standard", "default")
+                )
+                for file_config in file_configs
+            ]
+            edits: Dict[Tuple[int, int], str] = {}
+            unresolved: List[int] = []
+            for index, scalar in enumerate(scalars):
+                if scalar is None:
+                    unresolved.append(index)
+                    continue
+                text = encode_yaml_scalar(versions[index], scalar.style)
+                edits[(scalar.start, scalar.end)] = text
+                old_versions[index] = scalar.value
+                results[index] = (
+                    UNCHANGED if content[scalar.start : scalar.end] == text else UPDATED
+                )
+
+            if unresolved:
+                data = yaml.safe_load(apply_edits(content, edits))
+                for index in unresolved:
+                    file_config = file_configs[index]
+                    keys = file_config.get("variable", "").split(".")
+                    temp = data
+                    for key in keys[:-1]:
+                        temp = temp.setdefault(key, {})
+                    old_versions[index] = temp.get(keys[-1])
+                    results[index] = _set_value(temp, keys[-1], versions[index])
+            if any(results[index] == UPDATED for index in unresolved):
+                write_content(
+                    file_path,
+                    apply_text_format(
+                        yaml.safe_dump(data).encode("utf-8"), detect_text_format(raw)
+                    ),
+                )
+                print(f"{_updated_label()} {file_path}")
+            else:
+                _write_if_changed(
+                    file_path,
+                    raw,
+                    {
+                        _byte_span(content, span, len(raw)): text.encode("utf-8")
+                        for span, text in edits.items()
+                    },
+                    results,
+                )
+            return _version_updates(file_path, old_versions, versions, results)
         except Exception as e:
             print(f"Error updating {file_path}: {e}")
-            return False
+            return _failed_updates(file_path, new_version, file_configs)
 
 
 class JsonVersionHandler(VersionHandler):
     """Handler for reading and updating version strings in JSON files.
 
     This class provides methods to read and update version strings in JSON files.
-    It uses the `json` library to parse and modify the version string.
+    Values are located with a streaming tokenizer that resolves dot-separated
+    paths without building the document in memory, and only the bytes of the
+    value are rewritten, so the formatting of the file is preserved. A full parse
+    (using `orjson` when installed) is only needed to create keys that do not
+    exist yet.
 
     Methods:
         read_version: Reads the version string from the specified JSON file.
         update_version: Updates the version string in the specified JSON file.
+        swap_versions: Updates several version strings and returns the previous ones.
     """
 
     def read_version(self, file_path: str, variable: str, **kwargs) -> Optional[str]:
         """Reads the version string from the specified JSON file.
 
         This method searches for the version string in the specified JSON file
-        using the provided variable name.
+        using the provided variable name, which can be a dot-separated path
+        (e.g. "packages..version" for the empty key of a package-lock.json).
 
         Args:
             file_path (str): The path to the JSON file.
-            variable (str): The variable name that holds the version string.
+            variable (str): The variable name that holds the version string, which can be a dot-separated path.
             **kwargs: Additional keyword arguments.
 
         Returns:
@@ -411,65 +885,113 @@ class JsonVersionHandler(VersionHandler):
         Raises:
             Exception: If there is an error reading the file.
         """
+        import json
+
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            return data.get(variable)
+            content = read_file(file_path)
+            span = _find_json_values(file_path, content, [variable])[0]
+            if span is None:
+                print(f"Variable '{variable}' not found in {file_path}")
+                return None
+            return json.loads(content[span[0] : span[1]])
         except Exception as e:
             print(f"Error reading version from {file_path}: {e}")
             return None
 
-    def update_version(
-        self, file_path: str, variable: str, new_version: str, **kwargs
-    ) -> bool:
-        """Updates the version string in the specified JSON file.
+    def swap_versions(
+        self, file_path: str, new_version: str, file_configs: List[Dict[str, Any]]
+    ) -> List[VersionUpdate]:
+        """Updates several version strings in the specified JSON file and returns the previous ones.
 
-        This method searches for the version string in the specified JSON file
-        using the provided variable name and updates it with the new version string.
+        The file is read once and all configured dot-separated paths are located
+        in a single streaming pass; the new string literals are spliced in at the
+        values' byte offsets. Paths that do not exist yet are created through a
+        full parse and an `indent=2` dump of the document.
 
         Args:
             file_path (str): The path to the JSON file.
-            variable (str): The variable name that holds the version string.
             new_version (str): The new version string.
-            **kwargs: Additional keyword arguments.
+            file_configs (List[Dict[str, Any]]): The file configurations targeting this file.
 
         Returns:
-            bool: True if the version was successfully updated, otherwise False.
-
-        Raises:
-            Exception: If there is an error reading or writing the file.
+            List[VersionUpdate]: The outcome of each configuration, with the previous version.
         """
-        version_standard = kwargs.get("version_standard", "default")
-        new_version = self.format_version(new_version, version_standard)
+        import json
 
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            data[variable] = new_version
-            with open(file_path, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2)
-            return True
+            content = read_file(file_path)
+
+            spans = _find_json_values(
+                file_path,
+                content,
+                [file_config.get("variable", "") for file_config in file_configs],
+            )
+            results: List[str] = [FAILED] * len(file_configs)
+            old_versions: List[Optional[str]] = [None] * len(file_configs)
+            versions = [
+                self.format_version(
+                    new_version, file_config.get("version_standard", "default")
+                )
+                for file_config in file_configs
+            ]
+            edits: Dict[Tuple[int, int], bytes] = {}
+            unresolved: List[int] = []
+            for index, span in enumerate(spans):
+                if span is None:
+                    unresolved.append(index)
+                    continue
+                literal = json.dumps(versions[index]).encode("utf-8")
+                edits[span] = literal
+                old_versions[index] = json.loads(content[span[0] : span[1]])
+                results[index] = _edit_status(content, [span], literal)
+
+            text_format = detect_text_format(content)
+            if unresolved:
+                data = _load_json(apply_edits(content, edits)[len(text_format.bom) :])
+                for index in unresolved:
+                    file_config = file_configs[index]
+                    keys = file_config.get("variable", "").split(".")
+                    temp = data
+                    for key in keys[:-1]:
+                        temp = temp.setdefault(key, {})
+                    old_versions[index] = temp.get(keys[-1])
+                    results[index] = _set_value(temp, keys[-1], versions[index])
+            if any(results[index] == UPDATED for index in unresolved):
+                write_content(
+                    file_path, apply_text_format(_dump_json(data), text_format)
+                )
+                print(f"{_updated_label()} {file_path}")
+            else:
+                _write_if_changed(file_path, content, edits, results)
+            return _version_updates(file_path, old_versions, versions, results)
         except Exception as e:
             print(f"Error updating {file_path}: {e}")
-            return False
+            return _failed_updates(file_path, new_version, file_configs)
 
 
 class XmlVersionHandler(VersionHandler):
     """Handler for reading and updating version strings in XML files.
 
     This class provides methods to read and update version strings in XML files.
-    It uses the `xml.etree.ElementTree` library to parse and modify the version string.
+    Elements are located with a streaming `expat` scan that stops at the first
+    match and records the byte offsets of the element text, so only those bytes
+    are rewritten and the XML declaration, comments and namespace prefixes are
+    preserved. Paths are namespace-aware: "{uri}tag", "prefix:tag" and plain
+    "tag" (any namespace) steps are supported. Other ElementPath syntax, and
+    elements whose content is not plain text, fall back to `xml.etree.ElementTree`.
 
     Methods:
         read_version: Reads the version string from the specified XML file.
         update_version: Updates the version string in the specified XML file.
+        swap_versions: Updates several version strings and returns the previous ones.
     """
 
     def read_version(self, file_path: str, variable: str, **kwargs) -> Optional[str]:
         """Reads the version string from the specified XML file.
 
         This method searches for the version string in the specified XML file
-        using the provided variable name.
+        using the provided variable name, which is an element path relative to
+        the root element.
 
         Args:
             file_path (str): The path to the XML file.
@@ -483,8 +1005,21 @@ class XmlVersionHandler(VersionHandler):
             Exception: If there is an error reading the file.
         """
         try:
-            tree = ET.parse(file_path)
-            root = tree.getroot()
+            steps = split_xml_path(variable)
+            if steps is not None:
+                if current_transaction() is not None:
+                    text = _find_xml_texts(file_path, read_file(file_path), [steps])[0]
+                else:
+                    # Outside a run only the head of the document is scanned
+                    with open(file_path, "rb") as f:
+                        text = find_xml_texts(f, [steps])[0]
+                if text is not None:
+                    return text.value
+
+            # Fall back to ElementTree for paths the scanner cannot resolve
+            import xml.etree.ElementTree as ET
+
+            root = ET.fromstring(read_file(file_path))
             element = root.find(variable)
             if element is not None:
                 return element.text
@@ -494,42 +1029,89 @@ class XmlVersionHandler(VersionHandler):
             print(f"Error reading version from {file_path}: {e}")
             return None
 
-    def update_version(
-        self, file_path: str, variable: str, new_version: str, **kwargs
-    ) -> bool:
-        """Updates the version string in the specified XML file.
+    def swap_versions(
+        self, file_path: str, new_version: str, file_configs: List[Dict[str, Any]]
+    ) -> List[VersionUpdate]:
+        """Updates several version strings in the specified XML file and returns the previous ones.
 
-        This method searches for the version string in the specified XML file
-        using the provided variable name and updates it with the new version string.
+        The file is read once and all configured elements are located in a
+        single streaming pass; their text is patched in place. Elements the
+        scanner cannot patch are updated through an `ElementTree` parse of the
+        document, which then rewrites the whole file.
 
         Args:
             file_path (str): The path to the XML file.
-            variable (str): The variable name that holds the version string.
             new_version (str): The new version string.
-            **kwargs: Additional keyword arguments.
+            file_configs (List[Dict[str, Any]]): The file configurations targeting this file.
 
         Returns:
-            bool: True if the version was successfully updated, otherwise False.
-
-        Raises:
-            Exception: If there is an error reading or writing the file.
+            List[VersionUpdate]: The outcome of each configuration, with the previous version.
         """
-        version_standard = kwargs.get("version_standard", "default")
-        new_version = self.format_version(new_version, version_standard)
-
         try:
-            tree = ET.parse(file_path)
-            root = tree.getroot()
-            element = root.find(variable)
-            if element is not None:
-                element.text = new_version
-                tree.write(file_path)
-                return True
-            print(f"Variable '{variable}' not found in {file_path}")
-            return False
+            content = read_file(file_path)
+
+            variables = [
+                file_config.get("variable", "") for file_config in file_configs
+            ]
+            steps = [split_xml_path(variable) for variable in variables]
+            located = iter(
+                _find_xml_texts(file_path, content, [s for s in steps if s is not None])
+            )
+            texts = [next(located) if s is not None else None for s in steps]
+
+            results: List[str] = []
+            old_versions: List[Optional[str]] = [None] * len(file_configs)
+            versions = [
+                self.format_version(
+                    new_version, file_config.get("version_standard", "default")
+                )
+                for file_config in file_configs
+            ]
+            edits: Dict[Tuple[int, int], bytes] = {}
+            unresolved: List[int] = []
+            for index, text in enumerate(texts):
+                if text is None:
+                    results.append(FAILED)
+                    unresolved.append(index)
+                    continue
+                encoded = encode_xml_text(versions[index], text.encoding)
+                edits[(text.start, text.end)] = encoded
+                old_versions[index] = text.value
+                results.append(_edit_status(content, [(text.start, text.end)], encoded))
+
+            tree = None
+            if unresolved:
+                import xml.etree.ElementTree as ET
+
+                tree = ET.ElementTree(ET.fromstring(apply_edits(content, edits)))
+                root = tree.getroot()
+                for index in unresolved:
+                    element = root.find(variables[index])
+                    if element is not None:
+                        old_versions[index] = element.text
+                        if element.text == versions[index]:
+                            results[index] = UNCHANGED
+                        else:
+                            element.text = versions[index]
+                            results[index] = UPDATED
+                    else:
+                        print(f"Variable '{variables[index]}' not found in {file_path}")
+            if tree is not None and any(
+                results[index] == UPDATED for index in unresolved
+            ):
+                buffer = io.BytesIO()
+                tree.write(buffer)
+                write_content(
+                    file_path,
+                    apply_text_format(buffer.getvalue(), detect_text_format(content)),
+                )
+                print(f"{_updated_label()} {file_path}")
+            else:
+                _write_if_changed(file_path, content, edits, results)
+            return _version_updates(file_path, old_versions, versions, results)
         except Exception as e:
             print(f"Error updating {file_path}: {e}")
-            return False
+            return _failed_updates(file_path, new_version, file_configs)
 
 
 class DockerfileVersionHandler(VersionHandler):
@@ -541,18 +1123,21 @@ class DockerfileVersionHandler(VersionHandler):
     Methods:
         read_version: Reads the version string from the specified Dockerfile.
         update_version: Updates the version string in the specified Dockerfile.
+        swap_versions: Updates several version strings and returns the previous ones.
     """
 
     def read_version(self, file_path: str, variable: str, **kwargs) -> Optional[str]:
         """Reads the version string from the specified Dockerfile.
 
         This method searches for the version string in the specified Dockerfile
-        using the provided variable name and directive (ARG or ENV).
+        using the provided variable name and directive (ARG or ENV). Only the head
+        of the file is read unless the variable is not declared there.
 
         Args:
             file_path (str): The path to the Dockerfile.
             variable (str): The variable name that holds the version string.
-            **kwargs: Additional keyword arguments, including 'directive' which should be 'ARG' or 'ENV'.
+            **kwargs: Additional keyword arguments, including 'directive' which should be 'ARG' or 'ENV',
+                and 'head_window', the number of bytes searched before the whole file is.
 
         Returns:
             Optional[str]: The version string if found, otherwise None.
@@ -567,76 +1152,83 @@ class DockerfileVersionHandler(VersionHandler):
             )
             return None
 
-        pattern = re.compile(
-            rf"^\s*{directive}\s+{re.escape(variable)}\s*=\s*(.+?)\s*$", re.MULTILINE
-        )
-
+        head_window = kwargs.get("head_window", DEFAULT_HEAD_WINDOW)
         try:
-            with open(file_path, "r", encoding="utf-8") as file:
-                content = file.read()
-            match = pattern.search(content)
-            if match:
-                return match.group(1).strip()
+            value = _find_first_value(
+                file_path, "dockerfile", variable, head_window, directive
+            )
+            if value is not None:
+                return value.decode("utf-8").strip()
             print(f"No {directive} variable '{variable}' found in {file_path}")
             return None
         except Exception as e:
             print(f"Error reading version from {file_path}: {e}")
             return None
 
-    def update_version(
-        self, file_path: str, variable: str, new_version: str, **kwargs
-    ) -> bool:
-        """Updates the version string in the specified Dockerfile.
+    def swap_versions(
+        self, file_path: str, new_version: str, file_configs: List[Dict[str, Any]]
+    ) -> List[VersionUpdate]:
+        """Updates several version strings in the specified Dockerfile and returns the previous ones.
 
-        This method searches for the version string in the specified Dockerfile
-        using the provided variable name and directive (ARG or ENV), and updates it
-        with the new version string.
+        The file is read once and the value of every configured ARG or ENV
+        variable is replaced, patching the bytes in place when the new version
+        has the same length as the old one (see `write_edits`).
 
         Args:
             file_path (str): The path to the Dockerfile.
-            variable (str): The variable name that holds the version string.
             new_version (str): The new version string.
-            **kwargs: Additional keyword arguments, including 'directive' which should be 'ARG' or 'ENV'.
+            file_configs (List[Dict[str, Any]]): The file configurations targeting this file.
 
         Returns:
-            bool: True if the version was successfully updated, otherwise False.
-
-        Raises:
-            Exception: If there is an error reading or writing the file.
+            List[VersionUpdate]: The outcome of each configuration, with the previous version.
         """
-        directive = kwargs.get("directive", "").upper()
-        if directive not in ["ARG", "ENV"]:
-            print(
-                f"Invalid or missing directive for variable '{variable}' in {file_path}."
+        results: List[str] = [FAILED] * len(file_configs)
+        old_versions: List[Optional[str]] = [None] * len(file_configs)
+        versions = [
+            self.format_version(
+                new_version, file_config.get("version_standard", "default")
             )
-            return False
-
-        version_standard = kwargs.get("version_standard", "default")
-        new_version = self.format_version(new_version, version_standard)
-
-        pattern = re.compile(
-            rf"(^\s*{directive}\s+{re.escape(variable)}\s*=\s*)(.+?)\s*$", re.MULTILINE
-        )
+            for file_config in file_configs
+        ]
+        valid = []
+        for index, file_config in enumerate(file_configs):
+            directive = file_config.get("directive", "").upper()
+            if directive in ["ARG", "ENV"]:
+                valid.append((index, directive, file_config))
+            else:
+                print(
+                    f"Invalid or missing directive for variable '{file_config.get('variable', '')}' in {file_path}."
+                )
+        if not valid:
+            return _version_updates(file_path, old_versions, versions, results)
 
         try:
-            with open(file_path, "r", encoding="utf-8") as file:
-                content = file.read()
-
-            def replacement(match):
-                return f"{match.group(1)}{new_version}"
-
-            new_content, num_subs = pattern.subn(replacement, content)
-            if num_subs > 0:
-                with open(file_path, "w", encoding="utf-8") as file:
-                    file.write(new_content)
-                print(f"Updated {directive} variable '{variable}' in {file_path}")
-                return True
-            else:
-                print(f"No {directive} variable '{variable}' found in {file_path}")
-                return False
+            content = read_file(file_path)
+
+            edits: Dict[Tuple[int, int], bytes] = {}
+            for index, directive, file_config in valid:
+                variable = file_config.get("variable", "")
+                version = versions[index]
+                spans = _find_spans(
+                    file_path, content, "dockerfile", variable, directive
+                )
+                for span in spans:
+                    edits[span] = version.encode("utf-8")
+                if not spans:
+                    print(f"No {directive} variable '{variable}' found in {file_path}")
+                old_versions[index] = _span_value(content, spans, strip=True)
+                results[index] = _edit_status(content, spans, version.encode("utf-8"))
+
+            if write_edits(file_path, content, edits):
+                for index, directive, file_config in valid:
+                    if results[index] == UPDATED:
+                        print(
+                            f"{_updated_label()} {directive} variable '{file_config.get('variable', '')}' in {file_path}"
+                        )
+            return _version_updates(file_path, old_versions, versions, results)
         except Exception as e:
             print(f"Error updating {file_path}: {e}")
-            return False
+            return _failed_updates(file_path, new_version, file_configs)
 
 
 class MakefileVersionHandler(VersionHandler):
@@ -648,18 +1240,21 @@ class MakefileVersionHandler(VersionHandler):
     Methods:
         read_version: Reads the version string from the specified Makefile.
         update_version: Updates the version string in the specified Makefile.
+        swap_versions: Updates several version strings and returns the previous ones.
     """
 
     def read_version(self, file_path: str, variable: str, **kwargs) -> Optional[str]:
         """Reads the version string from the specified Makefile.
 
         This method searches for the version string in the specified Makefile
-        using the provided variable name.
+        using a regular expression that matches the variable assignment. Only the
+        head of the file is read unless the variable is not assigned there.
 
         Args:
             file_path (str): The path to the Makefile.
             variable (str): The variable name that holds the version string.
-            **kwargs: Additional keyword arguments.
+            **kwargs: Additional keyword arguments, including 'head_window', the number of
+                bytes searched before the whole file is (default `DEFAULT_HEAD_WINDOW`).
 
         Returns:
             Optional[str]: The version string if found, otherwise None.
@@ -667,109 +1262,401 @@ class MakefileVersionHandler(VersionHandler):
         Raises:
             Exception: If there is an error reading the file.
         """
+        head_window = kwargs.get("head_window", DEFAULT_HEAD_WINDOW)
         try:
-            with open(file_path, "r") as file:
-                for line in file:
-                    if line.startswith(variable):
-                        return line.split("=")[1].strip()
+            value = _find_first_value(file_path, "makefile", variable, head_window)
+            if value is not None:
+                return value.decode("utf-8").strip()
             print(f"Variable '{variable}' not found in {file_path}")
             return None
         except Exception as e:
             print(f"Error reading version from {file_path}: {e}")
             return None
 
-    def update_version(
-        self, file_path: str, variable: str, new_version: str, **kwargs
-    ) -> bool:
-        """Updates the version string in the specified Makefile.
+    def swap_versions(
+        self, file_path: str, new_version: str, file_configs: List[Dict[str, Any]]
+    ) -> List[VersionUpdate]:
+        """Updates several version strings in the specified Makefile and returns the previous ones.
 
-        This method searches for the version string in the specified Makefile
-        using the provided variable name and updates it with the new version string.
+        The file is read once and the value of every configured variable is
+        replaced, patching the bytes in place when the new version has the same
+        length as the old one (see `write_edits`).
 
         Args:
             file_path (str): The path to the Makefile.
-            variable (str): The variable name that holds the version string.
             new_version (str): The new version string.
-            **kwargs: Additional keyword arguments.
+            file_configs (List[Dict[str, Any]]): The file configurations targeting this file.
 
         Returns:
-            bool: True if the version was successfully updated, otherwise False.
-
-        Raises:
-            Exception: If there is an error reading or writing the file.
+            List[VersionUpdate]: The outcome of each configuration, with the previous version.
         """
-        version_standard = kwargs.get("version_standard", "default")
-        new_version = self.format_version(new_version, version_standard)
-
-        version_pattern = re.compile(
-            rf"^({re.escape(variable)}\s*[:]?=\s*)(.*)$", re.MULTILINE
-        )
         try:
-            with open(file_path, "r", encoding="utf-8") as file:
-                content = file.read()
-
-            def replacement(match):
-                return f"{match.group(1)}{new_version}"
-
-            new_content, num_subs = version_pattern.subn(replacement, content)
+            content = read_file(file_path)
+
+            results: List[str] = []
+            old_versions: List[Optional[str]] = []
+            versions: List[str] = []
+            edits: Dict[Tuple[int, int], bytes] = {}
+            for file_config in file_configs:
+                variable = file_config.get("variable", "")
+                version = self.format_version(
+                    new_version, file_config.get("version_standard", "default")
+                )
+                spans = _find_spans(file_path, content, "makefile", variable)
+                for span in spans:
+                    edits[span] = version.encode("utf-8")
+                if not spans:
+                    print(f"Variable '{variable}' not found in {file_path}")
+                old_versions.append(_span_value(content, spans, strip=True))
+                versions.append(version)
+                results.append(_edit_status(content, spans, version.encode("utf-8")))
 
-            if num_subs > 0:
-                with open(file_path, "w", encoding="utf-8") as file:
-                    file.write(new_content)
-                print(f"Updated {file_path}")
-                return True
-            else:
-                print(f"Variable '{variable}' not found in {file_path}")
-                return False
+            _write_if_changed(file_path, content, edits, results)
+            return _version_updates(file_path, old_versions, versions, results)
         except Exception as e:
             print(f"Error updating {file_path}: {e}")
-            return False
+            return _failed_updates(file_path, new_version, file_configs)
+
+
+def _byte_span(text: str, span: Tuple[int, int], size: int) -> Tuple[int, int]:
+    """Converts a character span of decoded UTF-8 text into a byte span."""
+    if len(text) == size:
+        # Pure ASCII: characters and bytes line up
+        return span
+    start = len(text[: span[0]].encode("utf-8"))
+    return start, start + len(text[span[0] : span[1]].encode("utf-8"))
+
+
+def _edit_status(content: bytes, spans: List[Tuple[int, int]], data: bytes) -> str:
+    """Returns the outcome of replacing every span of `content` with `data`."""
+    if not spans:
+        return FAILED
+    if all(content[start:end] == data for start, end in spans):
+        return UNCHANGED
+    return UPDATED
+
+
+def _span_value(
+    content: bytes, spans: List[Tuple[int, int]], strip: bool = False
+) -> Optional[str]:
+    """Returns the text of the first span of `content`, or None if there are no spans."""
+    if not spans:
+        return None
+    value = content[spans[0][0] : spans[0][1]].decode("utf-8")
+    return value.strip() if strip else value
+
+
+def _version_updates(
+    file_path: str,
+    old_versions: List[Optional[str]],
+    new_versions: List[str],
+    results: List[str],
+) -> List[VersionUpdate]:
+    """Returns the `VersionUpdate` of each configuration of a file."""
+    return [
+        VersionUpdate(file_path, old_version, new_version, status)
+        for old_version, new_version, status in zip(old_versions, new_versions, results)
+    ]
+
+
+def _failed_updates(
+    file_path: str, new_version: str, file_configs: List[Dict[str, Any]]
+) -> List[VersionUpdate]:
+    """Returns a failed `VersionUpdate` for each configuration of a file."""
+    return [VersionUpdate(file_path, None, new_version, FAILED) for _ in file_configs]
+
+
+def _set_value(container: Dict[str, Any], key: str, version: str) -> str:
+    """Sets a parsed document value to the new version unless it already holds it."""
+    if container.get(key) == version:
+        return UNCHANGED
+    container[key] = version
+    return UPDATED
+
+
+def _updated_label() -> str:
+    """Returns how a written file is reported: "Would update" while only planning."""
+    transaction = current_transaction()
+    if transaction is not None and transaction.dry_run:
+        return "Would update"
+    return "Updated"
+
+
+def _write_if_changed(
+    file_path: str,
+    content: bytes,
+    edits: Dict[Tuple[int, int], bytes],
+    results: List[str],
+) -> None:
+    """Writes the edits of a file unless every configuration is unchanged."""
+    if write_edits(file_path, content, edits):
+        print(f"{_updated_label()} {file_path}")
+    elif UNCHANGED in results:
+        print(f"Unchanged {file_path}")
+
+
+def _load_json(content: bytes) -> Any:
+    """Parses a whole JSON document, using `orjson` when it is installed."""
+    try:
+        import orjson
+    except ImportError:  # pragma: no cover - optional dependency
+        import json
+
+        return json.loads(content)
+    return orjson.loads(content)
+
+
+def _dump_json(data: Any) -> bytes:
+    """Serializes a JSON document with a two-space indent, using `orjson` when it is installed."""
+    try:
+        import orjson
+    except ImportError:  # pragma: no cover - optional dependency
+        import json
+
+        return json.dumps(data, indent=2).encode("utf-8")
+    return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+
+
+# Entry-point group through which other packages can provide handlers for their
+# own file types, e.g. in their pyproject.toml:
+#     [project.entry-points."bumpcalver.handlers"]
+#     gradle = "my_package.bumpcalver:GradleVersionHandler"
+HANDLER_ENTRY_POINT_GROUP = "bumpcalver.handlers"
+
+# Registered handlers by file type: a handler class or instance, or a
+# "module:attribute" reference that is imported when the file type is first used
+_HANDLER_REGISTRY: Dict[str, Union[Type[VersionHandler], VersionHandler, str]] = {
+    "python": PythonVersionHandler,
+    "toml": TomlVersionHandler,
+    "yaml": YamlVersionHandler,
+    "json": JsonVersionHandler,
+    "xml": XmlVersionHandler,
+    "dockerfile": DockerfileVersionHandler,
+    "makefile": MakefileVersionHandler,
+}
+# Handler instances shared by every file of a type (handlers are stateless)
+_HANDLER_INSTANCES: Dict[str, VersionHandler] = {}
+
+
+def register_handler(
+    file_type: str, handler: Union[Type[VersionHandler], VersionHandler, str]
+) -> None:
+    """Registers the version handler used for a file type.
+
+    Registering a file type that already has a handler replaces it. Worker
+    processes started with the "spawn" method do not see handlers registered
+    at runtime, so files of a registered type are always updated in the
+    calling process (on the thread pool when `jobs` is greater than 1).
+
+    Args:
+        file_type (str): The file type, as used in the `file_type` setting of a file configuration.
+        handler (Union[Type[VersionHandler], VersionHandler, str]): A handler class or instance,
+            or a "module:attribute" reference to one that is imported on first use.
+
+    Example:
+        register_handler("gradle", "my_package.bumpcalver:GradleVersionHandler")
+    """
+    _HANDLER_REGISTRY[file_type] = handler
+    _HANDLER_INSTANCES.pop(file_type, None)
+
+
+def _load_handler_reference(reference: str) -> Any:
+    """Imports the object named by a "module:attribute" reference."""
+    module_name, _, attribute = reference.partition(":")
+    target: Any = importlib.import_module(module_name)
+    for name in filter(None, attribute.split(".")):
+        target = getattr(target, name)
+    return target
+
+
+def _find_entry_point_handler(file_type: str) -> Optional[Any]:
+    """Loads the handler that an installed package provides for a file type, if any."""
+    from importlib.metadata import entry_points
+
+    discovered = entry_points()
+    if hasattr(discovered, "select"):
+        candidates = discovered.select(group=HANDLER_ENTRY_POINT_GROUP, name=file_type)
+    else:  # pragma: no cover - Python 3.9
+        candidates = [
+            entry_point
+            for entry_point in discovered.get(HANDLER_ENTRY_POINT_GROUP, [])
+            if entry_point.name == file_type
+        ]
+    for entry_point in candidates:
+        return entry_point.load()
+    return None
 
 
 def get_version_handler(file_type: str) -> VersionHandler:
     """Returns the appropriate version handler for the given file type.
 
-    This function returns an instance of a version handler class based on the
-    specified file type. If the file type is not supported, it raises a ValueError.
+    Handlers are looked up in the handler registry (see `register_handler`) and
+    then in the `bumpcalver.handlers` entry-point group of the installed
+    packages; a third-party handler is only imported once its file type is
+    requested. Each file type has a single shared handler instance. If the file
+    type is not supported, it raises a ValueError.
 
     Args:
         file_type (str): The type of the file (e.g., "python", "toml", "yaml", "json", "xml", "dockerfile", "makefile").
 
     Returns:
-        VersionHandler: An instance of the appropriate version handler class.
+        VersionHandler: The version handler instance for the file type.
 
     Raises:
         ValueError: If the specified file type is not supported.
+        TypeError: If the registered handler is not a VersionHandler.
 
     Example:
         handler = get_version_handler("python")
     """
-    if file_type == "python":
-        return PythonVersionHandler()
-    elif file_type == "toml":
-        return TomlVersionHandler()
-    elif file_type == "yaml":
-        return YamlVersionHandler()
-    elif file_type == "json":
-        return JsonVersionHandler()
-    elif file_type == "xml":
-        return XmlVersionHandler()
-    elif file_type == "dockerfile":
-        return DockerfileVersionHandler()
-    elif file_type == "makefile":
-        return MakefileVersionHandler()
-    else:
-        raise ValueError(f"Unsupported file type: {file_type}")
+    handler = _HANDLER_INSTANCES.get(file_type)
+    if handler is not None:
+        return handler
+
+    provider: Any = _HANDLER_REGISTRY.get(file_type)
+    if provider is None:
+        provider = _find_entry_point_handler(file_type)
+        if provider is None:
+            raise ValueError(f"Unsupported file type: {file_type}")
+    elif isinstance(provider, str):
+        provider = _load_handler_reference(provider)
+
+    handler = provider() if isinstance(provider, type) else provider
+    if not isinstance(handler, VersionHandler):
+        raise TypeError(
+            f"Handler for file type '{file_type}' is not a VersionHandler: {handler!r}"
+        )
+    return _HANDLER_INSTANCES.setdefault(file_type, handler)
 
 
-def update_version_in_files(
+def _file_identity(file_path: str) -> Union[Tuple[int, int], str]:
+    """Returns a key identifying the file behind a path.
+
+    Symlinks and hardlinks to the same file resolve to the same key: the
+    (device, inode) pair when the file can be stat'ed, otherwise the resolved
+    real path.
+
+    Args:
+        file_path (str): The path to the file.
+
+    Returns:
+        Union[Tuple[int, int], str]: The identity of the file.
+    """
+    try:
+        stat_result = os.stat(file_path)
+    except OSError:
+        return os.path.realpath(file_path)
+    if stat_result.st_ino == 0:  # pragma: no cover - filesystems without inodes
+        return os.path.realpath(file_path)
+    return (stat_result.st_dev, stat_result.st_ino)
+
+
+class UpdatedFiles(List[str]):
+    """The files updated by `update_version_in_files`.
+
+    The list holds the paths whose version was rewritten, in configuration order,
+    so it can be used wherever a plain list of paths was expected (e.g. to stage
+    the files for a commit).
+
+    Attributes:
+        unchanged (List[str]): The paths that already held the new version and were not written.
+        updates (List[VersionUpdate]): The outcome of every configuration, in configuration
+            order, with the version each variable held before the update.
+    """
+
+    def __init__(
+        self,
+        updated: Iterable[str] = (),
+        unchanged: Iterable[str] = (),
+        updates: Iterable[VersionUpdate] = (),
+    ) -> None:
+        super().__init__(updated)
+        self.unchanged: List[str] = list(unchanged)
+        self.updates: List[VersionUpdate] = list(updates)
+
+
+def _update_file_group(
     new_version: str, file_configs: List[Dict[str, Any]]
-) -> List[str]:
+) -> List[VersionUpdate]:
+    """Updates every file configuration of a group with one handler call per file type.
+
+    All configurations in a group point at the same file, so their variables are
+    applied together through `VersionHandler.swap_versions`, which reads, parses
+    and writes the file once. This function is the unit of work submitted to the
+    thread pool.
+
+    Args:
+        new_version (str): The new version string to set in the file.
+        file_configs (List[Dict[str, Any]]): The file configurations of the group.
+
+    Returns:
+        List[VersionUpdate]: The outcome of each configuration, in order.
+    """
+    results: List[VersionUpdate] = []
+    for file_type, run in groupby(
+        file_configs, key=lambda file_config: file_config.get("file_type", "")
+    ):
+        run_configs = list(run)
+        handler = get_version_handler(file_type)
+        # A file shared by several file types sees the earlier writes of the run
+        updates = handler.swap_versions(
+            run_configs[0]["path"], new_version, run_configs
+        )
+        for file_config, update in zip(run_configs, updates):
+            # Report each configuration under its own path (e.g. a symlink)
+            results.append(update._replace(path=file_config["path"]))
+    return results
+
+
+def complete_interrupted_update(project_root: Optional[str] = None) -> List[str]:
+    """Rolls forward an update interrupted while its files were moved into place.
+
+    Args:
+        project_root (Optional[str], optional): The directory holding the
+            project's configuration. Defaults to the working directory.
+
+    Returns:
+        List[str]: The paths of the files the interrupted update covered, if any.
+    """
+    journal_path = project_journal_path(project_root)
+    if not os.path.exists(journal_path):
+        return []
+    print(f"Completing the interrupted update recorded in {journal_path}")
+    return recover_transaction(journal_path)
+
+
+def update_version_in_files(
+    new_version: str,
+    file_configs: List[Dict[str, Any]],
+    jobs: int = 1,
+    atomic: bool = True,
+    transaction: Optional[FileTransaction] = None,
+    project_root: Optional[str] = None,
+) -> "UpdatedFiles":
     """Updates the version string in multiple files based on the provided configurations.
 
     This function iterates over the provided file configurations, updates the version
     string in each file using the appropriate version handler, and returns a list of
-    files that were successfully updated.
+    files that were successfully updated. Files that already hold the new version are
+    not rewritten, so their modification time is preserved; they are reported in the
+    `unchanged` attribute of the returned list instead.
+
+    Configurations are grouped by the file they resolve to (following symlinks and
+    hardlinks), and all variables of one file are applied with a single read,
+    parse and write. When `jobs` is greater than 1 the groups are updated
+    concurrently on a thread pool. The returned list is always in configuration
+    order.
+
+    With `atomic` (the default) the files are updated as a group through a
+    `FileTransaction`: every new file body is staged next to its target first,
+    and only once all handlers have run are they flushed to disk in one pass
+    and moved into place, with a journal (`DEFAULT_JOURNAL_PATH` under
+    `project_root`) that lets an interrupted run be completed with
+    `complete_interrupted_update`. If any configuration fails (the
+    handlers report their own errors and return `FAILED`) or an exception is
+    raised while the handlers run, nothing is committed and every file is left
+    untouched. The same holds for a `transaction` given by the caller, which is
+    then expected to discard it.
 
     Args:
         new_version (str): The new version string to set in the files.
@@ -780,9 +1667,22 @@ def update_version_in_files(
                 - "variable" (str, optional): The variable name that holds the version string.
                 - "directive" (str, optional): The directive for Dockerfile (e.g., "ARG" or "ENV").
                 - "version_standard" (str, optional): The versioning standard to follow (default is "default").
+        jobs (int, optional): The number of parallel workers to use. Defaults to 1 (serial).
+        atomic (bool, optional): Whether to commit all files together. Defaults to True;
+            when False each file is written as soon as its handler is done.
+        transaction (Optional[FileTransaction], optional): A transaction to stage the
+            writes in instead of committing them; the caller commits or discards it.
+            Files the caller already read through it are not read again.
+        project_root (Optional[str], optional): The directory the journal of an
+            atomic update is written under. Defaults to the working directory.
 
     Returns:
-        List[str]: A list of file paths that were successfully updated.
+        UpdatedFiles: A list of file paths that were successfully updated, with the
+            paths that already held the new version in its `unchanged` attribute.
+
+    Raises:
+        ValueError: If a file configuration has an unsupported file type, or if
+            `atomic` is set (or a transaction is given) and a configuration failed.
 
     Example:
         file_configs = [
@@ -791,23 +1691,99 @@ def update_version_in_files(
         ]
         updated_files = update_version_in_files("2023.10.05", file_configs)
     """
-    files_updated: List[str] = []
-
+    # Fail fast on unsupported file types before any file is touched
     for file_config in file_configs:
-        file_path: str = file_config["path"]
-        file_type: str = file_config.get("file_type", "")
-        variable: str = file_config.get("variable", "")
-        directive: str = file_config.get("directive", "")
-        version_standard: str = file_config.get("version_standard", "default")
+        get_version_handler(file_config.get("file_type", ""))
+
+    groups: Dict[Union[Tuple[int, int], str], List[int]] = {}
+    for index, file_config in enumerate(file_configs):
+        groups.setdefault(_file_identity(file_config["path"]), []).append(index)
+
+    owns_transaction = transaction is None and atomic
+    if owns_transaction:
+        transaction = FileTransaction(project_root)
+
+    results = [
+        VersionUpdate(file_config["path"], None, new_version, FAILED)
+        for file_config in file_configs
+    ]
+    try:
+        with transaction.activate() if transaction else nullcontext():
+            if jobs <= 1:
+                for indexes in groups.values():
+                    group = [file_configs[index] for index in indexes]
+                    updates = _update_file_group(new_version, group)
+                    for index, update in zip(indexes, updates):
+                        results[index] = update
+            else:
+                _update_file_groups_in_parallel(
+                    new_version, file_configs, groups, jobs, results, transaction
+                )
+        failed = [update.path for update in results if update.status == FAILED]
+        if failed and transaction is not None:
+            raise ValueError(
+                f"Failed to update {', '.join(dict.fromkeys(failed))}; no file was changed"
+            )
+    except BaseException:
+        if owns_transaction:
+            transaction.discard()
+        raise
+    if owns_transaction:
+        transaction.commit()
+
+    return UpdatedFiles(
+        [update.path for update in results if update.status == UPDATED],
+        unchanged=[update.path for update in results if update.status == UNCHANGED],
+        updates=results,
+    )
+
+
+def _update_file_groups_in_parallel(
+    new_version: str,
+    file_configs: List[Dict[str, Any]],
+    groups: Dict[Union[Tuple[int, int], str], List[int]],
+    jobs: int,
+    results: List[VersionUpdate],
+    transaction: Optional[FileTransaction] = None,
+) -> None:
+    """Updates the file groups concurrently and stores each result at its config index.
+
+    The handlers locate version values lexically instead of parsing whole
+    documents, so a group costs little CPU next to starting a worker process:
+    every group runs on a thread pool, which also sees handlers registered at
+    runtime. When a transaction is given, the writes are staged in it.
 
-        handler = get_version_handler(file_type)
-        if handler.update_version(
-            file_path,
-            variable,
-            new_version,
-            directive=directive,
-            version_standard=version_standard,
-        ):
-            files_updated.append(file_path)
-
-    return files_updated
+    Args:
+        new_version (str): The new version string to set in the files.
+        file_configs (List[Dict[str, Any]]): All file configurations.
+        groups (Dict[Union[Tuple[int, int], str], List[int]]): Config indexes grouped by file identity.
+        jobs (int): The number of worker threads.
+        results (List[VersionUpdate]): The per-config outcomes, filled in place.
+        transaction (Optional[FileTransaction]): The transaction to stage the writes in.
+    """
+    from concurrent.futures import Future, ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=jobs) as thread_pool:
+        futures: Dict[Future, List[int]] = {}
+        for indexes in groups.values():
+            # Threads see the active transaction through a copy of this context
+            future = thread_pool.submit(
+                contextvars.copy_context().run,
+                _update_file_group,
+                new_version,
+                [file_configs[index] for index in indexes],
+            )
+            futures[future] = indexes
+
+        error: Optional[BaseException] = None
+        for future, indexes in futures.items():
+            try:
+                updates = future.result()
+            except BaseException as e:
+                # Keep collecting so that every staged file can be discarded
+                error = error or e
+                continue
+            for index, update in zip(indexes, updates):
+                results[index] = update
+        if error is not None:
+            raise error
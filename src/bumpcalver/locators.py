@@ -0,0 +1,852 @@
+"""
+Value locators for BumpCalver.
+
+This module provides lightweight scanners that find the exact byte span of a
+version value inside a structured document without building the whole document
+in memory. Handlers use the span to patch only the version literal, which keeps
+the rest of the file byte-for-byte identical (comments, ordering, formatting).
+
+A locator returns None when it cannot resolve a key lexically, in which case
+the caller falls back to a full parse of the document.
+
+Classes:
+    YamlScalar: Location, value and style of a scalar found in a YAML document.
+    XmlText: Location and value of the text of an XML element.
+
+Functions:
+    find_toml_value: Finds the byte span of a string value addressed by a dotted key in TOML.
+    decode_toml_string: Decodes a TOML string literal into a Python string.
+    encode_toml_string: Encodes a Python string as a TOML string literal.
+    find_yaml_scalars: Finds the scalars addressed by dotted keys in a YAML document.
+    encode_yaml_scalar: Encodes a Python string as a YAML scalar.
+    find_json_values: Finds the byte spans of the values addressed by dotted keys in JSON.
+    split_xml_path: Splits a simple ElementTree path into namespace-aware steps.
+    find_xml_texts: Finds the text of the first element addressed by each path in XML.
+    encode_xml_text: Encodes a Python string as XML element text.
+
+Example:
+    To replace the project version in a pyproject.toml document:
+        span = find_toml_value(data, ["project", "version"])
+        if span is not None:
+            start, end = span
+            literal = encode_toml_string("2024.12.15", data[start:end])
+            data = data[:start] + literal + data[end:]
+"""
+
+import re
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    BinaryIO,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+if TYPE_CHECKING:  # pragma: no cover
+    import json
+
+    import yaml
+
+# The parser libraries (yaml, json, expat) are imported by the locators that use
+# them so that loading this module stays cheap.
+
+# Loader used for the YAML event stream; resolved on first use to the libyaml
+# based parser when PyYAML was built with it
+_YAML_LOADER: Any = None
+_YAML_PLAIN_SCALAR = re.compile(r"[A-Za-z0-9_][A-Za-z0-9_.+\-/]*")
+_YAML_NODE_PROPERTIES = re.compile(r"(?:[&!]\S*\s+)+")
+
+_JSON_WHITESPACE = re.compile(rb"[ \t\r\n]*")
+_JSON_STRING = re.compile(rb'"(?:[^"\\]|\\.)*"', re.DOTALL)
+_JSON_SCALAR = re.compile(rb"[^ \t\r\n,\]}]+")
+_JSON_STRUCTURE = re.compile(rb'[{}\[\]"]')
+
+_XML_CHUNK_SIZE = 64 * 1024
+_XML_PATH_SEPARATOR = re.compile(r"/(?![^{]*\})")
+_XML_STEP = re.compile(r"(?:\{([^}]*)\}|([A-Za-z_][\w.-]*):)?([A-Za-z_][\w.-]*)")
+
+_TOML_WHITESPACE = re.compile(rb"[ \t]*")
+_TOML_BLANK = re.compile(rb"(?:[ \t\r\n]|#[^\n]*)*")
+_TOML_BARE_KEY = re.compile(rb"[A-Za-z0-9_-]+")
+_TOML_BASIC_STRING = re.compile(rb'"(?:[^"\\\n]|\\.)*"')
+_TOML_LITERAL_STRING = re.compile(rb"'[^'\n]*'")
+_TOML_MULTILINE_BASIC_STRING = re.compile(rb'"""(?:\\.|[^\\])*?"""(?!")', re.DOTALL)
+_TOML_MULTILINE_LITERAL_STRING = re.compile(rb"'''.*?'''(?!')", re.DOTALL)
+_TOML_SCALAR = re.compile(rb"[^\r\n#,\]}]*")
+_TOML_END_OF_LINE = re.compile(rb"[ \t]*(?:#[^\n]*)?(?:\r?\n|$)")
+_TOML_ESCAPE = re.compile(
+    r'\\(u[0-9A-Fa-f]{4}|U[0-9A-Fa-f]{8}|[btnfr"\\]|[ \t]*\r?\n\s*)'
+)
+_TOML_SIMPLE_ESCAPES = {
+    "b": "\b",
+    "t": "\t",
+    "n": "\n",
+    "f": "\f",
+    "r": "\r",
+    '"': '"',
+    "\\": "\\",
+}
+
+
+class _TomlLexError(Exception):
+    """Raised when the TOML scanner meets syntax it does not understand."""
+
+
+def _match_toml_string(data: bytes, pos: int) -> Optional[re.Match]:
+    """Matches any kind of TOML string literal starting at `pos`."""
+    if data.startswith(b'"""', pos):
+        return _TOML_MULTILINE_BASIC_STRING.match(data, pos)
+    if data.startswith(b"'''", pos):
+        return _TOML_MULTILINE_LITERAL_STRING.match(data, pos)
+    if data.startswith(b'"', pos):
+        return _TOML_BASIC_STRING.match(data, pos)
+    if data.startswith(b"'", pos):
+        return _TOML_LITERAL_STRING.match(data, pos)
+    return None
+
+
+def _parse_toml_key(data: bytes, pos: int) -> Tuple[List[str], int]:
+    """Parses a (possibly dotted and quoted) TOML key starting at `pos`.
+
+    Returns:
+        Tuple[List[str], int]: The key parts and the position after the key.
+    """
+    keys: List[str] = []
+    while True:
+        pos = _TOML_WHITESPACE.match(data, pos).end()
+        if data.startswith((b'"', b"'"), pos):
+            match = _match_toml_string(data, pos)
+            if match is None or data.startswith((b'"""', b"'''"), pos):
+                raise _TomlLexError(f"invalid quoted key at byte {pos}")
+            keys.append(decode_toml_string(match.group()))
+        else:
+            match = _TOML_BARE_KEY.match(data, pos)
+            if match is None:
+                raise _TomlLexError(f"invalid key at byte {pos}")
+            keys.append(match.group().decode("ascii"))
+        pos = _TOML_WHITESPACE.match(data, match.end()).end()
+        if not data.startswith(b".", pos):
+            return keys, pos
+        pos += 1
+
+
+def _skip_toml_container(data: bytes, pos: int) -> int:
+    """Skips an array or inline table starting at `pos`, including nested ones."""
+    depth = 0
+    length = len(data)
+    while pos < length:
+        char = data[pos : pos + 1]
+        if char in (b"[", b"{"):
+            depth += 1
+            pos += 1
+        elif char in (b"]", b"}"):
+            depth -= 1
+            pos += 1
+            if depth == 0:
+                return pos
+        elif char in (b'"', b"'"):
+            match = _match_toml_string(data, pos)
+            if match is None:
+                raise _TomlLexError(f"unterminated string at byte {pos}")
+            pos = match.end()
+        elif char == b"#":
+            newline = data.find(b"\n", pos)
+            pos = length if newline == -1 else newline + 1
+        else:
+            pos += 1
+    raise _TomlLexError("unterminated array or inline table")
+
+
+def _skip_toml_value(data: bytes, pos: int) -> Tuple[bool, int]:
+    """Skips the TOML value starting at `pos`.
+
+    Returns:
+        Tuple[bool, int]: Whether the value is a string, and the position after it.
+    """
+    match = _match_toml_string(data, pos)
+    if match is not None:
+        return True, match.end()
+    if data.startswith((b'"', b"'"), pos):
+        raise _TomlLexError(f"unterminated string at byte {pos}")
+    if data.startswith((b"[", b"{"), pos):
+        return False, _skip_toml_container(data, pos)
+    end = _TOML_SCALAR.match(data, pos).end()
+    if end == pos:
+        raise _TomlLexError(f"missing value at byte {pos}")
+    return False, end
+
+
+def _scan_toml(data: bytes, target: List[str]) -> Optional[Tuple[int, int]]:
+    """Scans a TOML document for the string value at `target`."""
+    pos = 3 if data.startswith(b"\xef\xbb\xbf") else 0
+    length = len(data)
+    table: Optional[List[str]] = []
+    array_tables: Set[Tuple[str, ...]] = set()
+
+    while True:
+        pos = _TOML_BLANK.match(data, pos).end()
+        if pos >= length:
+            return None
+
+        if data.startswith(b"[", pos):
+            is_array = data.startswith(b"[[", pos)
+            keys, pos = _parse_toml_key(data, pos + (2 if is_array else 1))
+            closing = b"]]" if is_array else b"]"
+            if not data.startswith(closing, pos):
+                raise _TomlLexError(f"unterminated table header at byte {pos}")
+            pos += len(closing)
+            # Keys below an array of tables live in a list element and cannot
+            # be addressed with a plain dotted path.
+            if is_array:
+                array_tables.add(tuple(keys))
+            if is_array or any(
+                tuple(keys[:size]) in array_tables for size in range(1, len(keys) + 1)
+            ):
+                table = None
+            else:
+                table = keys
+        else:
+            keys, pos = _parse_toml_key(data, pos)
+            if not data.startswith(b"=", pos):
+                raise _TomlLexError(f"expected '=' at byte {pos}")
+            pos = _TOML_WHITESPACE.match(data, pos + 1).end()
+            start = pos
+            is_string, pos = _skip_toml_value(data, pos)
+            if is_string and table is not None and table + keys == target:
+                return start, pos
+
+        match = _TOML_END_OF_LINE.match(data, pos)
+        if match is None:
+            raise _TomlLexError(f"unexpected content at byte {pos}")
+        pos = match.end()
+
+
+def find_toml_value(data: bytes, keys: List[str]) -> Optional[Tuple[int, int]]:
+    """Finds the byte span of the string value addressed by a dotted key in TOML.
+
+    The document is scanned token by token, tracking the current table header,
+    and stops at the first key whose full path equals `keys`. Only plain string
+    values are located; the returned span covers the whole literal including
+    its quotes.
+
+    Args:
+        data (bytes): The UTF-8 encoded TOML document.
+        keys (List[str]): The key path, e.g. ["tool", "poetry", "version"].
+
+    Returns:
+        Optional[Tuple[int, int]]: The (start, end) byte span of the string literal,
+        or None if the key cannot be resolved lexically (missing key, non-string
+        value, key inside an inline table or array of tables, or unsupported syntax).
+
+    Example:
+        span = find_toml_value(b'[project]\\nversion = "1.0"\\n', ["project", "version"])
+    """
+    try:
+        return _scan_toml(data, keys)
+    except _TomlLexError:
+        return None
+
+
+def decode_toml_string(literal: bytes) -> str:
+    """Decodes a TOML string literal, including its quotes, into a Python string.
+
+    Args:
+        literal (bytes): The string literal as it appears in the document.
+
+    Returns:
+        str: The decoded string value.
+    """
+    text = literal.decode("utf-8")
+    if text.startswith(('"""', "'''")):
+        content = text[3:-3]
+        if content.startswith("\r\n"):
+            content = content[2:]
+        elif content.startswith("\n"):
+            content = content[1:]
+    else:
+        content = text[1:-1]
+    if text.startswith("'"):
+        return content
+
+    def replacement(match):
+        escape = match.group(1)
+        if escape[0] in "uU":
+            return chr(int(escape[1:], 16))
+        if escape in _TOML_SIMPLE_ESCAPES:
+            return _TOML_SIMPLE_ESCAPES[escape]
+        # Line ending backslash in a multi-line basic string
+        return ""
+
+    return _TOML_ESCAPE.sub(replacement, content)
+
+
+def encode_toml_string(value: str, like: bytes = b'"') -> bytes:
+    """Encodes a Python string as a TOML string literal.
+
+    The quoting style of `like` (basic, literal, or their multi-line variants) is
+    kept when the value can be represented with it; otherwise a basic string is
+    used.
+
+    Args:
+        value (str): The string value to encode.
+        like (bytes, optional): An existing literal whose quoting style should be kept.
+
+    Returns:
+        bytes: The encoded string literal including its quotes.
+    """
+    delimiter = like[:3] if like[:3] in (b'"""', b"'''") else like[:1]
+    if delimiter not in (b'"', b"'", b'"""', b"'''"):
+        delimiter = b'"'
+    if delimiter.startswith(b"'"):
+        if "'" not in value and "\n" not in value and "\r" not in value:
+            return delimiter + value.encode("utf-8") + delimiter
+        delimiter = b'"'
+    escaped = "".join(
+        (
+            "\\" + char
+            if char in '"\\'
+            else (
+                f"\\u{ord(char):04x}" if ord(char) < 0x20 or ord(char) == 0x7F else char
+            )
+        )
+        for char in value
+    )
+    return delimiter + escaped.encode("utf-8") + delimiter
+
+
+class YamlScalar(NamedTuple):
+    """Location, value and style of a scalar found in a YAML document.
+
+    Attributes:
+        start (int): The character offset where the scalar (including quotes) starts.
+        end (int): The character offset where the scalar (including quotes) ends.
+        value (str): The scalar value.
+        style (Optional[str]): The scalar style: None for plain, "'", '"', "|" or ">".
+    """
+
+    start: int
+    end: int
+    value: str
+    style: Optional[str]
+
+
+def _advance_yaml_frame(frame: List[Any]) -> None:
+    """Moves a mapping frame from key to value or from value to the next key."""
+    if frame[1]:
+        if not frame[2]:
+            frame[3] = None
+        frame[2] = not frame[2]
+
+
+def _yaml_loader() -> Any:
+    """Returns the loader used for the YAML event stream."""
+    global _YAML_LOADER
+    if _YAML_LOADER is None:
+        import yaml
+
+        _YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    return _YAML_LOADER
+
+
+def _yaml_scalar(text: str, event: "yaml.ScalarEvent") -> YamlScalar:
+    """Builds the YamlScalar for a scalar event, trimming node properties and block padding."""
+    start = event.start_mark.index
+    end = event.end_mark.index
+    style = event.style or None
+    if event.anchor is not None or event.tag is not None:
+        # Keep anchors and tags in front of the value, e.g. "&version !!str 1.0"
+        match = _YAML_NODE_PROPERTIES.match(text, start, end)
+        if match is not None:
+            start = match.end()
+    if style in ("|", ">"):
+        # Block scalars end at the next content line; keep the line breaks
+        end = start + len(text[start:end].rstrip())
+    return YamlScalar(start, end, event.value, style)
+
+
+def find_yaml_scalars(
+    text: str, targets: List[List[str]]
+) -> List[Optional[YamlScalar]]:
+    """Finds the scalars addressed by dotted keys in a YAML document.
+
+    The PyYAML event stream (using the libyaml `CParser` when available) is
+    walked while tracking the current mapping path, and parsing stops as soon as
+    every target has been found. No node graph is built for the document.
+
+    Args:
+        text (str): The YAML document.
+        targets (List[List[str]]): The key paths to find, e.g. [["image", "tag"]].
+
+    Returns:
+        List[Optional[YamlScalar]]: For each target, the scalar found at its path,
+        or None if the path does not exist or does not hold a scalar.
+
+    Raises:
+        yaml.YAMLError: If the document is not valid YAML up to the last target.
+
+    Example:
+        scalar, = find_yaml_scalars("image:\n  tag: '1.0'\n", [["image", "tag"]])
+    """
+    import yaml
+
+    if text.startswith("\ufeff"):
+        # libyaml reports marks relative to the text after the byte order mark
+        return [
+            (
+                scalar._replace(start=scalar.start + 1, end=scalar.end + 1)
+                if scalar
+                else None
+            )
+            for scalar in find_yaml_scalars(text[1:], targets)
+        ]
+
+    wanted: Dict[Tuple[str, ...], List[int]] = {}
+    for index, target in enumerate(targets):
+        wanted.setdefault(tuple(target), []).append(index)
+    found: List[Optional[YamlScalar]] = [None] * len(targets)
+    remaining = len(wanted)
+
+    # Each frame is [path, is_mapping, expect_key, key]. The path is None for
+    # collections that cannot be addressed with a dotted path (sequence items,
+    # complex keys), and key is None for keys that are not plain scalars.
+    stack: List[List[Any]] = []
+    for event in yaml.parse(text, Loader=_yaml_loader()):
+        if isinstance(event, yaml.DocumentEndEvent):
+            break
+        if isinstance(event, (yaml.MappingEndEvent, yaml.SequenceEndEvent)):
+            stack.pop()
+            if stack:
+                _advance_yaml_frame(stack[-1])
+            continue
+        if not isinstance(event, (yaml.NodeEvent, yaml.CollectionStartEvent)):
+            continue
+
+        frame = stack[-1] if stack else None
+        if frame is not None and frame[1] and frame[2]:
+            # Mapping key
+            frame[3] = event.value if isinstance(event, yaml.ScalarEvent) else None
+            if isinstance(event, yaml.CollectionStartEvent):
+                stack.append(
+                    [None, isinstance(event, yaml.MappingStartEvent), True, None]
+                )
+            else:
+                _advance_yaml_frame(frame)
+            continue
+
+        # Mapping value, sequence item or document root
+        if frame is None:
+            path: Optional[Tuple[str, ...]] = ()
+        elif frame[1] and frame[0] is not None and frame[3] is not None:
+            path = frame[0] + (frame[3],)
+        else:
+            path = None
+        if isinstance(event, yaml.CollectionStartEvent):
+            stack.append([path, isinstance(event, yaml.MappingStartEvent), True, None])
+            continue
+        if isinstance(event, yaml.ScalarEvent) and path in wanted:
+            scalar = _yaml_scalar(text, event)
+            for index in wanted.pop(path):
+                found[index] = scalar
+            remaining -= 1
+            if remaining == 0:
+                break
+        if frame is not None:
+            _advance_yaml_frame(frame)
+    return found
+
+
+def encode_yaml_scalar(value: str, style: Optional[str] = None) -> str:
+    """Encodes a Python string as a YAML scalar.
+
+    The style of the scalar being replaced is kept where possible. A plain
+    scalar stays plain only if it would still load as the same string (for
+    example "2024.12" would load as a float and is quoted instead). Block
+    scalars are replaced by a double-quoted scalar.
+
+    Args:
+        value (str): The string value to encode.
+        style (Optional[str], optional): The style of the scalar being replaced.
+
+    Returns:
+        str: The encoded scalar.
+    """
+    import json
+
+    import yaml
+
+    if style is None:
+        resolved = yaml.resolver.Resolver().resolve(
+            yaml.ScalarNode, value, (True, False)
+        )
+        if resolved == "tag:yaml.org,2002:str" and _YAML_PLAIN_SCALAR.fullmatch(value):
+            return value
+        style = "'"
+    if style == "'" and "\n" not in value:
+        return "'" + value.replace("'", "''") + "'"
+    return json.dumps(value, ensure_ascii=False)
+
+
+class _JsonDone(Exception):
+    """Raised to stop scanning once every JSON target has been found."""
+
+
+def _json_error(message: str, data: bytes, pos: int) -> "json.JSONDecodeError":
+    """Builds a JSONDecodeError pointing at a byte offset of the document."""
+    import json
+
+    document = data[:pos].decode("utf-8", "replace")
+    return json.JSONDecodeError(message, document, len(document))
+
+
+def _decode_json_string(literal: bytes) -> str:
+    """Decodes a JSON string literal that contains escape sequences."""
+    import json
+
+    return json.loads(literal)
+
+
+def _skip_json_value(data: bytes, pos: int) -> int:
+    """Skips the JSON value starting at `pos` without decoding it."""
+    char = data[pos : pos + 1]
+    if char == b'"':
+        match = _JSON_STRING.match(data, pos)
+        if match is None:
+            raise _json_error("Unterminated string starting at", data, pos)
+        return match.end()
+    if char in (b"{", b"["):
+        depth = 0
+        while True:
+            match = _JSON_STRUCTURE.search(data, pos)
+            if match is None:
+                raise _json_error("Unterminated object or array", data, len(data))
+            token = match.group()
+            if token == b'"':
+                pos = _skip_json_value(data, match.start())
+                continue
+            depth += 1 if token in (b"{", b"[") else -1
+            pos = match.end()
+            if depth == 0:
+                return pos
+    match = _JSON_SCALAR.match(data, pos)
+    if match is None:
+        raise _json_error("Expecting value", data, pos)
+    return match.end()
+
+
+def _scan_json_value(
+    data: bytes,
+    pos: int,
+    path: Tuple[str, ...],
+    wanted: Dict[Tuple[str, ...], List[int]],
+    prefixes: Set[Tuple[str, ...]],
+    found: List[Optional[Tuple[int, int]]],
+) -> int:
+    """Scans the JSON value at `pos`, descending only into containers on a target path."""
+    if path in wanted:
+        end = _skip_json_value(data, pos)
+        for index in wanted.pop(path):
+            found[index] = (pos, end)
+        if not wanted:
+            raise _JsonDone()
+        return end
+    char = data[pos : pos + 1]
+    if path not in prefixes or char not in (b"{", b"["):
+        return _skip_json_value(data, pos)
+
+    closing = b"}" if char == b"{" else b"]"
+    pos = _JSON_WHITESPACE.match(data, pos + 1).end()
+    if data.startswith(closing, pos):
+        return pos + 1
+    index = 0
+    while True:
+        if char == b"{":
+            match = _JSON_STRING.match(data, pos)
+            if match is None:
+                raise _json_error(
+                    "Expecting property name enclosed in double quotes", data, pos
+                )
+            raw_key = match.group()
+            key = (
+                raw_key[1:-1].decode("utf-8")
+                if b"\\" not in raw_key
+                else _decode_json_string(raw_key)
+            )
+            pos = _JSON_WHITESPACE.match(data, match.end()).end()
+            if not data.startswith(b":", pos):
+                raise _json_error("Expecting ':' delimiter", data, pos)
+            pos = _JSON_WHITESPACE.match(data, pos + 1).end()
+        else:
+            key = str(index)
+            index += 1
+        pos = _scan_json_value(data, pos, path + (key,), wanted, prefixes, found)
+        pos = _JSON_WHITESPACE.match(data, pos).end()
+        if data.startswith(b",", pos):
+            pos = _JSON_WHITESPACE.match(data, pos + 1).end()
+        elif data.startswith(closing, pos):
+            return pos + 1
+        else:
+            raise _json_error("Expecting ',' delimiter", data, pos)
+
+
+def find_json_values(
+    data: bytes, targets: List[List[str]]
+) -> List[Optional[Tuple[int, int]]]:
+    """Finds the byte spans of the values addressed by dotted keys in a JSON document.
+
+    The document is tokenized without building any Python objects: containers
+    that are not on the way to a target are skipped by bracket matching, and
+    scanning stops as soon as every target has been found. Path segments are
+    object keys or, inside arrays, decimal indexes. An empty segment addresses
+    the empty key, e.g. "packages..version" in a package-lock.json file.
+
+    Args:
+        data (bytes): The UTF-8 encoded JSON document.
+        targets (List[List[str]]): The key paths to find, e.g. [["packages", "", "version"]].
+
+    Returns:
+        List[Optional[Tuple[int, int]]]: For each target, the (start, end) byte span
+        of its value (including quotes for strings), or None if the path does not exist.
+
+    Raises:
+        json.JSONDecodeError: If the document is malformed before the last target is found.
+
+    Example:
+        span, = find_json_values(b'{"version": "1.0"}', [["version"]])
+    """
+    wanted: Dict[Tuple[str, ...], List[int]] = {}
+    prefixes: Set[Tuple[str, ...]] = set()
+    for index, target in enumerate(targets):
+        wanted.setdefault(tuple(target), []).append(index)
+        prefixes.update(tuple(target[:size]) for size in range(len(target)))
+    found: List[Optional[Tuple[int, int]]] = [None] * len(targets)
+
+    pos = 3 if data.startswith(b"\xef\xbb\xbf") else 0
+    pos = _JSON_WHITESPACE.match(data, pos).end()
+    try:
+        _scan_json_value(data, pos, (), wanted, prefixes, found)
+    except _JsonDone:
+        pass
+    return found
+
+
+class XmlText(NamedTuple):
+    """Location and value of the text of an XML element.
+
+    Attributes:
+        start (int): The byte offset where the element text starts.
+        end (int): The byte offset where the element text ends.
+        value (str): The decoded element text.
+        encoding (str): The document encoding, used to encode replacement text.
+    """
+
+    start: int
+    end: int
+    value: str
+    encoding: str
+
+
+class _XmlDone(Exception):
+    """Raised to stop parsing once every XML target has been found."""
+
+
+class _XmlScanner:
+    """Expat callbacks that track the element path and capture the text of targets."""
+
+    def __init__(
+        self,
+        parser: Any,
+        targets: List[List[Tuple[Optional[str], Optional[str], str]]],
+    ) -> None:
+        self.parser = parser
+        self.targets = targets
+        self.found: List[Optional[XmlText]] = [None] * len(targets)
+        self.settled = [False] * len(targets)
+        self.encoding = "utf-8"
+        self.prefixes: Dict[str, List[str]] = {}
+        # For each open element, the (target, matched steps) pairs still alive
+        self.stack: List[List[Tuple[int, int]]] = []
+        self.capture: Optional[List[Any]] = None
+
+    def matches(
+        self, step: Tuple[Optional[str], Optional[str], str], name: str
+    ) -> bool:
+        uri, prefix, local = step
+        element_uri, _, element_local = name.rpartition(" ")
+        if element_local != local:
+            return False
+        if prefix is not None:
+            uri = (self.prefixes.get(prefix) or [None])[-1]
+        return uri is None or uri == element_uri
+
+    def interrupt(self, *args: Any) -> None:
+        # Mixed content, comments, CDATA and processing instructions cannot be patched
+        if self.capture is not None:
+            indexes, self.capture = self.capture[0], None
+            for index in indexes:
+                self.settle(index, None)
+
+    def settle(self, index: int, text: Optional[XmlText]) -> None:
+        self.found[index] = text
+        self.settled[index] = True
+        if all(self.settled):
+            raise _XmlDone
+
+    def xml_decl(self, version: str, encoding: Optional[str], standalone: int) -> None:
+        if encoding:
+            self.encoding = encoding
+
+    def start_namespace(self, prefix: Optional[str], uri: str) -> None:
+        self.prefixes.setdefault(prefix or "", []).append(uri)
+
+    def end_namespace(self, prefix: Optional[str]) -> None:
+        self.prefixes[prefix or ""].pop()
+
+    def start_element(self, name: str, attributes: Dict[str, str]) -> None:
+        self.interrupt()
+        if not self.stack:
+            alive = [(index, 0) for index in range(len(self.targets))]
+        else:
+            alive = []
+            complete = []
+            for index, depth in self.stack[-1]:
+                steps = self.targets[index]
+                if self.settled[index] or not self.matches(steps[depth], name):
+                    continue
+                if depth + 1 < len(steps):
+                    alive.append((index, depth + 1))
+                else:
+                    complete.append(index)
+            if complete:
+                # [targets, text start, text parts]
+                self.capture = [complete, None, []]
+        self.stack.append(alive)
+
+    def character_data(self, data: str) -> None:
+        if self.capture is not None:
+            if self.capture[1] is None:
+                self.capture[1] = self.parser.CurrentByteIndex
+            self.capture[2].append(data)
+
+    def end_element(self, name: str) -> None:
+        self.stack.pop()
+        capture, self.capture = self.capture, None
+        if capture is not None:
+            indexes, start, parts = capture
+            text = None
+            # Empty and self-closing elements have no text span to patch
+            if start is not None:
+                end = self.parser.CurrentByteIndex
+                text = XmlText(start, end, "".join(parts), self.encoding)
+            for index in indexes:
+                self.settle(index, text)
+
+
+def split_xml_path(
+    path: str,
+) -> Optional[List[Tuple[Optional[str], Optional[str], str]]]:
+    """Splits a simple ElementTree path into namespace-aware steps.
+
+    Each step is a tag name relative to the root element, written as
+    "{uri}tag", "prefix:tag" (resolved against the document's own namespace
+    declarations) or "tag", which matches that local name in any namespace.
+
+    Args:
+        path (str): The element path, e.g. "{http://maven.apache.org/POM/4.0.0}version".
+
+    Returns:
+        Optional[List[Tuple[Optional[str], Optional[str], str]]]: The (uri, prefix, local name)
+        of each step, or None if the path uses other ElementPath syntax
+        (wildcards, predicates, "..", "//" or absolute paths).
+    """
+    steps: List[Tuple[Optional[str], Optional[str], str]] = []
+    for step in _XML_PATH_SEPARATOR.split(path):
+        if step == "." and not steps:
+            continue
+        match = _XML_STEP.fullmatch(step)
+        if match is None:
+            return None
+        uri, prefix, local = match.groups()
+        steps.append((uri, prefix, local))
+    return steps or None
+
+
+def find_xml_texts(
+    source: Union[bytes, BinaryIO],
+    targets: List[List[Tuple[Optional[str], Optional[str], str]]],
+) -> List[Optional[XmlText]]:
+    """Finds the text of the first element addressed by each path in an XML document.
+
+    The document is fed to expat in chunks and parsing stops as soon as every
+    target has been found, so neither the element tree nor (for a file) the
+    rest of the document is loaded. Byte offsets are taken from the parser, so
+    the declaration, comments and namespace prefixes stay untouched when the
+    span is patched.
+
+    Args:
+        source (Union[bytes, BinaryIO]): The XML document, or a binary file to read it from.
+        targets (List[List[Tuple[Optional[str], Optional[str], str]]]): The paths to find,
+            as returned by `split_xml_path`.
+
+    Returns:
+        List[Optional[XmlText]]: For each target, the text of the first matching
+        element, or None if no element matches or its content is not plain text
+        (child elements, comments, CDATA, empty or self-closing elements).
+
+    Raises:
+        xml.parsers.expat.ExpatError: If the document is malformed before the last target is found.
+
+    Example:
+        text, = find_xml_texts(b"<project><version>1.0</version></project>", [split_xml_path("version")])
+    """
+    from xml.parsers import expat
+
+    parser = expat.ParserCreate(namespace_separator=" ")
+    scanner = _XmlScanner(parser, targets)
+    parser.XmlDeclHandler = scanner.xml_decl
+    parser.StartNamespaceDeclHandler = scanner.start_namespace
+    parser.EndNamespaceDeclHandler = scanner.end_namespace
+    parser.StartElementHandler = scanner.start_element
+    parser.EndElementHandler = scanner.end_element
+    parser.CharacterDataHandler = scanner.character_data
+    parser.CommentHandler = scanner.interrupt
+    parser.StartCdataSectionHandler = scanner.interrupt
+    parser.ProcessingInstructionHandler = scanner.interrupt
+    if not targets:
+        return []
+    try:
+        if isinstance(source, bytes):
+            if source.startswith((b"\xff\xfe", b"\xfe\xff")):
+                # Offsets cannot be patched with ASCII-incompatible encodings
+                return [None] * len(targets)
+            parser.Parse(source, True)
+        else:
+            chunk = source.read(_XML_CHUNK_SIZE)
+            if chunk.startswith((b"\xff\xfe", b"\xfe\xff")):
+                return [None] * len(targets)
+            while chunk:
+                parser.Parse(chunk, False)
+                chunk = source.read(_XML_CHUNK_SIZE)
+            parser.Parse(b"", True)
+    except _XmlDone:
+        pass
+    return scanner.found
+
+
+def encode_xml_text(value: str, encoding: str = "utf-8") -> bytes:
+    """Encodes a Python string as XML element text.
+
+    Args:
+        value (str): The text to encode.
+        encoding (str): The document encoding; characters it cannot represent become character references.
+
+    Returns:
+        bytes: The escaped, encoded text.
+    """
+    from xml.sax.saxutils import escape
+
+    return escape(value).encode(encoding, "xmlcharrefreplace")
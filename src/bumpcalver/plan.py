@@ -0,0 +1,431 @@
+"""
+Edit plans for BumpCalver.
+
+This module splits a version bump into a planning phase and an apply phase.
+Planning runs the version handlers without writing anything and records, for
+every file that would change, the byte spans to replace together with their
+old and new values and a hash of the file's content. Applying a plan splices
+the new values into the files directly, without parsing them again, and
+refuses to touch any file whose content changed since the plan was made.
+
+Classes:
+    PlannedEdit: One byte span replacement of a plan.
+    FilePlan: The planned edits of one file.
+    UpdatePlan: The planned edits of a version bump.
+    PlanRecorder: A transaction that records file writes as a plan.
+
+Functions:
+    plan_version_update: Computes the edits of a version bump without writing them.
+    save_plan: Writes a plan to a file.
+    load_plan: Reads a plan from a file.
+    apply_plan: Applies the edits of a plan.
+
+Example:
+    To compute a plan on one machine and apply it on another:
+        plan, _ = plan_version_update("2024.12.15", file_configs)
+        save_plan(plan, "bump.plan")
+        ...
+        apply_plan(load_plan("bump.plan"))
+"""
+
+import os
+from contextlib import nullcontext
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from .file_utils import FileTransaction, write_edits
+from .handlers import (
+    UNCHANGED,
+    UPDATED,
+    UpdatedFiles,
+    VersionUpdate,
+    update_version_in_files,
+)
+
+# Version of the plan file layout written by `save_plan`
+PLAN_FORMAT = 1
+
+# Size of the slices compared at once when looking for the span a new body changes
+_COMPARE_CHUNK_SIZE = 64 * 1024
+
+
+class PlannedEdit(NamedTuple):
+    """One byte span replacement of a plan.
+
+    Attributes:
+        start (int): The offset of the first byte to replace.
+        end (int): The offset after the last byte to replace.
+        old (bytes): The bytes currently in the span.
+        new (bytes): The bytes to put in the span.
+    """
+
+    start: int
+    end: int
+    old: bytes
+    new: bytes
+
+
+class FilePlan(NamedTuple):
+    """The planned edits of one file.
+
+    Attributes:
+        path (str): The path to the file.
+        sha256 (str): The hex SHA-256 digest of the file content the edits apply to.
+        edits (List[PlannedEdit]): The edits, sorted by offset.
+    """
+
+    path: str
+    sha256: str
+    edits: List[PlannedEdit]
+
+
+class UpdatePlan(NamedTuple):
+    """The planned edits of a version bump.
+
+    Attributes:
+        version (str): The new version.
+        files (List[FilePlan]): The files that change, in configuration order.
+    """
+
+    version: str
+    files: List[FilePlan]
+
+
+def _sha256(content: bytes) -> str:
+    """Returns the hex SHA-256 digest of file content."""
+    import hashlib
+
+    return hashlib.sha256(content).hexdigest()
+
+
+def _read(file_path: str) -> bytes:
+    """Returns the content of a file."""
+    with open(file_path, "rb") as file:
+        return file.read()
+
+
+def _common_prefix_length(first: bytes, second: bytes) -> int:
+    """Returns the length of the longest common prefix of two byte strings.
+
+    Whole chunks are compared as slices; only the first chunk that differs is
+    scanned further, with `os.path.commonprefix`.
+    """
+    limit = min(len(first), len(second))
+    start = 0
+    while start < limit:
+        end = min(start + _COMPARE_CHUNK_SIZE, limit)
+        chunks = [first[start:end], second[start:end]]
+        if chunks[0] != chunks[1]:
+            return start + len(os.path.commonprefix(chunks))
+        start = end
+    return limit
+
+
+def _common_suffix_length(first: bytes, second: bytes, limit: int) -> int:
+    """Returns the length of the longest common suffix of two byte strings, up to `limit`."""
+    length = 0
+    while length < limit:
+        size = min(_COMPARE_CHUNK_SIZE, limit - length)
+        chunks = [
+            first[len(first) - length - size : len(first) - length][::-1],
+            second[len(second) - length - size : len(second) - length][::-1],
+        ]
+        if chunks[0] != chunks[1]:
+            return length + len(os.path.commonprefix(chunks))
+        length += size
+    return limit
+
+
+class PlanRecorder(FileTransaction):
+    """A transaction that records file writes as a plan instead of staging them.
+
+    While it is active, the span replacements passed to `write_edits` are
+    recorded as they are. Whole new bodies passed to `write_content` are
+    reduced to the single span that differs from the current content. Reads
+    of a file always return its content on disk, even after a write, so every
+    recorded span refers to the file as it is on disk. Files are keyed by
+    their real path, so a file reached through a symlink is planned once.
+
+    Nothing is ever staged, so committing the recorder writes nothing; its
+    edits are written out with `plan` and applied with `apply_plan`.
+    """
+
+    dry_run = True
+
+    def __init__(self) -> None:
+        super().__init__()
+        # Content digest and edits of each file, keyed by the file's real path
+        self.recorded: Dict[str, Tuple[str, Dict[Tuple[int, int], bytes]]] = {}
+
+    def read(self, file_path: str) -> bytes:
+        """Returns the content of a file on disk, reading it once per run.
+
+        Recorded edits are never applied to the buffer, so that every span
+        refers to the content the plan is checked against.
+        """
+        target = os.path.realpath(file_path)
+        if target not in self._contents:
+            self._contents[target] = _read(file_path)
+        return self._contents[target]
+
+    def stage_edits(self, file_path: str, edits: Dict[Tuple[int, int], bytes]) -> None:
+        """Records span replacements of a file.
+
+        Args:
+            file_path (str): The path to the file.
+            edits (Dict[Tuple[int, int], bytes]): Replacements keyed by (start, end) byte span.
+
+        Raises:
+            ValueError: If the edits overlap edits recorded earlier for the file.
+        """
+        content = self.read(file_path)
+        target = os.path.realpath(file_path)
+        digest, recorded = self.recorded.get(target, (_sha256(content), {}))
+        merged = dict(recorded)
+        merged.update(edits)
+        spans = sorted(merged)
+        for (_, end), (start, _) in zip(spans, spans[1:]):
+            if start < end:
+                raise ValueError(f"Overlapping edits planned for {file_path}")
+        self.recorded[target] = (digest, merged)
+
+    def stage_content(self, file_path: str, content: bytes) -> None:
+        """Records a whole new body of a file as the span that differs.
+
+        Args:
+            file_path (str): The path to the file.
+            content (bytes): The new content of the file.
+        """
+        current = self.read(file_path)
+        start = _common_prefix_length(current, content)
+        suffix = _common_suffix_length(
+            current, content, min(len(current), len(content)) - start
+        )
+        self.stage_edits(
+            file_path,
+            {(start, len(current) - suffix): content[start : len(content) - suffix]},
+        )
+
+    def discard(self) -> None:
+        """Drops every buffer and forgets every recorded edit."""
+        super().discard()
+        self.recorded = {}
+
+    def plan(self, version: str, file_paths: List[str]) -> UpdatePlan:
+        """Returns the recorded edits as a plan.
+
+        Args:
+            version (str): The new version.
+            file_paths (List[str]): The configured paths, which give the order of the files.
+
+        Returns:
+            UpdatePlan: The plan.
+        """
+        files: List[FilePlan] = []
+        planned = set()
+        for file_path in file_paths:
+            # A file reached through several paths (e.g. a symlink) is planned
+            # once, under the first configured path
+            target = os.path.realpath(file_path)
+            if target in planned or target not in self.recorded:
+                continue
+            planned.add(target)
+            digest, edits = self.recorded[target]
+            content = self.read(file_path)
+            files.append(
+                FilePlan(
+                    file_path,
+                    digest,
+                    [
+                        PlannedEdit(start, end, content[start:end], data)
+                        for (start, end), data in sorted(edits.items())
+                    ],
+                )
+            )
+        return UpdatePlan(version, files)
+
+
+def plan_version_update(
+    new_version: str,
+    file_configs: List[Dict[str, Any]],
+    jobs: int = 1,
+    recorder: Optional[PlanRecorder] = None,
+) -> Tuple[UpdatePlan, UpdatedFiles]:
+    """Computes the edits of a version bump without writing them.
+
+    The handlers run exactly as for `update_version_in_files`, but their writes
+    are recorded by a `PlanRecorder`.
+
+    Args:
+        new_version (str): The new version string to set in the files.
+        file_configs (List[Dict[str, Any]]): The file configurations (see `update_version_in_files`).
+        jobs (int, optional): The number of parallel workers to use. Defaults to 1 (serial).
+        recorder (Optional[PlanRecorder], optional): The recorder to use, e.g. one that
+            already holds the files read to compute the version. Defaults to a new one.
+
+    Returns:
+        Tuple[UpdatePlan, UpdatedFiles]: The plan, and the files it would update
+            and leave unchanged.
+
+    Raises:
+        ValueError: If a file configuration has an unsupported file type.
+    """
+    recorder = recorder or PlanRecorder()
+    updated = update_version_in_files(
+        new_version, file_configs, jobs=jobs, transaction=recorder
+    )
+    plan = recorder.plan(
+        new_version, [file_config["path"] for file_config in file_configs]
+    )
+    return plan, updated
+
+
+def _encode(value: bytes) -> str:
+    """Encodes span bytes as a JSON string, keeping bytes that are not UTF-8."""
+    return value.decode("utf-8", "surrogateescape")
+
+
+def _decode(value: str) -> bytes:
+    """Decodes span bytes encoded by `_encode`."""
+    return value.encode("utf-8", "surrogateescape")
+
+
+def save_plan(plan: UpdatePlan, plan_path: str, root: Optional[str] = None) -> None:
+    """Writes a plan to a file.
+
+    The plan is stored as compact JSON. File paths inside `root` are stored
+    relative to it, so that the plan can be applied in another checkout.
+
+    Args:
+        plan (UpdatePlan): The plan to write.
+        plan_path (str): The path of the plan file.
+        root (Optional[str], optional): The project root. Defaults to the working directory.
+    """
+    import json
+
+    root = os.path.abspath(root or os.getcwd())
+    files = []
+    for file_plan in plan.files:
+        path = os.path.abspath(file_plan.path)
+        if os.path.commonpath([root, path]) == root:
+            path = os.path.relpath(path, root)
+        files.append(
+            {
+                "path": path,
+                "sha256": file_plan.sha256,
+                "edits": [
+                    [edit.start, edit.end, _encode(edit.old), _encode(edit.new)]
+                    for edit in file_plan.edits
+                ],
+            }
+        )
+    with open(plan_path, "w", encoding="utf-8") as file:
+        json.dump(
+            {"format": PLAN_FORMAT, "version": plan.version, "files": files},
+            file,
+            separators=(",", ":"),
+        )
+
+
+def load_plan(plan_path: str, root: Optional[str] = None) -> UpdatePlan:
+    """Reads a plan from a file.
+
+    Args:
+        plan_path (str): The path of the plan file.
+        root (Optional[str], optional): The project root that relative paths are
+            resolved against. Defaults to the working directory.
+
+    Returns:
+        UpdatePlan: The plan.
+
+    Raises:
+        ValueError: If the file is not a plan written by a supported version.
+    """
+    import json
+
+    root = root or os.getcwd()
+    with open(plan_path, "r", encoding="utf-8") as file:
+        data = json.load(file)
+    if not isinstance(data, dict) or data.get("format") != PLAN_FORMAT:
+        raise ValueError(f"{plan_path} is not a supported plan file")
+    return UpdatePlan(
+        data["version"],
+        [
+            FilePlan(
+                os.path.join(root, entry["path"]),
+                entry["sha256"],
+                [
+                    PlannedEdit(start, end, _decode(old), _decode(new))
+                    for start, end, old, new in entry["edits"]
+                ],
+            )
+            for entry in data["files"]
+        ],
+    )
+
+
+def apply_plan(
+    plan: UpdatePlan, atomic: bool = True, root: Optional[str] = None
+) -> UpdatedFiles:
+    """Applies the edits of a plan.
+
+    Every file is read and hashed first; if any of them changed since the plan
+    was made, nothing is written. The edits are then spliced in without parsing
+    the files, and committed together (see `update_version_in_files`).
+
+    Args:
+        plan (UpdatePlan): The plan to apply.
+        atomic (bool, optional): Whether to commit all files together. Defaults to True.
+        root (Optional[str], optional): The project root, which the journal of
+            an atomic commit is written under. Defaults to the working directory.
+
+    Returns:
+        UpdatedFiles: The paths of the updated files, with one `VersionUpdate`
+            per planned edit (holding its old and new bytes) in its `updates`
+            attribute.
+
+    Raises:
+        ValueError: If a file changed since the plan was made.
+    """
+    contents: List[bytes] = []
+    changed: List[str] = []
+    for file_plan in plan.files:
+        try:
+            content = _read(file_plan.path)
+        except FileNotFoundError:
+            content = b""
+        if _sha256(content) != file_plan.sha256:
+            changed.append(file_plan.path)
+        contents.append(content)
+    if changed:
+        raise ValueError(f"Files changed since the plan was made: {changed}")
+
+    files = UpdatedFiles()
+    transaction = FileTransaction(root) if atomic else None
+    try:
+        with transaction.activate() if transaction else nullcontext():
+            for file_plan, content in zip(plan.files, contents):
+                if write_edits(
+                    file_plan.path,
+                    content,
+                    {(edit.start, edit.end): edit.new for edit in file_plan.edits},
+                ):
+                    print(f"Updated {file_plan.path}")
+                    files.append(file_plan.path)
+                    status = UPDATED
+                else:
+                    print(f"Unchanged {file_plan.path}")
+                    files.unchanged.append(file_plan.path)
+                    status = UNCHANGED
+                files.updates.extend(
+                    VersionUpdate(
+                        file_plan.path, _encode(edit.old), _encode(edit.new), status
+                    )
+                    for edit in file_plan.edits
+                )
+    except BaseException:
+        if transaction is not None:
+            transaction.discard()
+        raise
+    if transaction is not None:
+        transaction.commit()
+    return files
@@ -7,10 +7,26 @@ parsing dot paths, parsing version strings, and getting the current date with ti
 Functions:
     parse_dot_path: Parses a dot-separated path and converts it to a file path.
     parse_version: Parses a version string and returns a tuple of date and count.
+    compile_version_parser: Compiles the parser of a version and date format pair, cached.
+    compile_version_format: Compiles a version format into a template, cached.
+    get_timezone: Returns the `ZoneInfo` of a timezone name, cached.
+    compile_date_format: Compiles a date format into a formatter function, cached.
+    current_clock: Returns the clock of the current run.
     get_current_date: Returns the current date in the specified timezone.
+    get_build_version: Returns the build version string based on a file configuration.
+    get_batch_versions: Returns the versions of many builds, e.g. to backfill past builds.
+
+Classes:
+    ParsedVersion: The fields of a version string.
+    VersionParser: A parser of the version strings of one version and date format.
+    VersionTemplate: A version format compiled for rendering.
+    Clock: The time of a run, read once and shared by every date it formats.
 
 Constants:
     default_timezone: The default timezone used for date calculations.
+    CUSTOM_DATE_DIRECTIVES: The date format directives handled by BumpCalver itself.
+    VERSION_FIELDS: The fields a version format can use.
+    DATE_VERSION_FORMAT: The version format of runs without a build count.
 
 Example:
     To parse a dot-separated path:
@@ -19,20 +35,148 @@ Example:
     To parse a version string:
         version_info = parse_version("2023-10-05-001")
 
+    To render versions with a version format compiled once:
+        template = compile_version_format("{current_date}-{build_count:03}+{git_sha}")
+        version = template.render("2024.12.07", build_count=3, suffix="rc")
+
+    To parse version strings written with the configured formats:
+        parser = compile_version_parser("{current_date}-{build_count:03}", "%Y.%m.%d")
+        parser.parse("2024.12.07-003.rc")  # build_count=3, suffix="rc", ...
+
     To get the current date in a specific timezone:
         current_date = get_current_date("Europe/London")
+
+    To assign versions to past builds from their timestamps:
+        versions = get_batch_versions(build_times, "UTC", "%Y.%m.%d")
+
+    To format every date of a run from the same instant, e.g. one in the past:
+        with Clock(datetime(2024, 12, 7, 23, 59)).activate():
+            version = get_build_version(file_config, version_format, timezone, date_format)
 """
 
 import os
 import re
-from datetime import datetime
-from typing import Any, Dict, Optional
+import string
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import date, datetime, timedelta
+from datetime import timezone as dt_timezone
+from functools import lru_cache
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
 from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
+from .git_utils import get_git_branch, get_git_sha
 from .handlers import get_version_handler
 
 default_timezone: str = "America/New_York"
 
+# Date format directives handled by BumpCalver rather than `strftime`, mapped
+# to the function returning their value for a datetime. Add an entry here to
+# support a new directive.
+CUSTOM_DATE_DIRECTIVES: Dict[str, Callable[[datetime], str]] = {
+    # Quarter of the year, 1 to 4
+    "q": lambda moment: str((moment.month - 1) // 3 + 1),
+}
+
+# A directive of a date format; "%%" is matched as a whole so it is never
+# mistaken for the start of another directive
+_DIRECTIVE_PATTERN = re.compile(r"%(.)", re.DOTALL)
+
+# Date format directives understood by the version parser, mapped to the
+# group capturing their value (None for values that are not kept) and the
+# pattern of the value. Other directives match any text.
+_DATE_DIRECTIVE_PATTERNS: Dict[str, Tuple[Optional[str], str]] = {
+    "Y": ("year", r"\d{4}"),
+    "y": ("short_year", r"\d{2}"),
+    "m": ("month", r"\d{2}"),
+    "-m": ("month", r"\d{1,2}"),
+    "d": ("day", r"\d{2}"),
+    "-d": ("day", r"\d{1,2}"),
+    "j": ("day_of_year", r"\d{3}"),
+    "-j": ("day_of_year", r"\d{1,3}"),
+    "q": ("quarter", r"[1-4]"),
+    "U": ("week", r"\d{2}"),
+    "W": ("week", r"\d{2}"),
+    "V": ("week", r"\d{2}"),
+    "G": (None, r"\d{4}"),
+    "H": (None, r"\d{2}"),
+    "I": (None, r"\d{2}"),
+    "M": (None, r"\d{2}"),
+    "S": (None, r"\d{2}"),
+    "f": (None, r"\d{6}"),
+    "u": (None, r"[1-7]"),
+    "w": (None, r"[0-6]"),
+    "a": (None, r"[^\W\d_]+"),
+    "A": (None, r"[^\W\d_]+"),
+    "b": (None, r"[^\W\d_]+"),
+    "B": (None, r"[^\W\d_]+"),
+    "p": (None, r"[^\W\d_]+"),
+    "%": (None, "%"),
+}
+
+# A directive of a date format for the version parser, including the "-"
+# flag that drops zero padding
+_PARSER_DIRECTIVE_PATTERN = re.compile(r"%(-?.)", re.DOTALL)
+
+# Suffix appended to a version by the --beta, --rc, --release and --custom options.
+# Older releases wrote it after a "-" instead of a "."; it starts with a letter
+# so that a trailing number is never taken for a suffix
+_SUFFIX_PATTERN = r"(?:[.-](?P<suffix>[A-Za-z][0-9A-Za-z._+-]*))?"
+
+# Fields a version format can use, mapped to a sample value that checks the
+# field's format spec when the format is compiled
+_VERSION_FIELD_SAMPLES: Dict[str, Any] = {
+    # The date, formatted with date_format
+    "current_date": "2024.12.07",
+    # The number of the build within the date
+    "build_count": 1,
+    # The quarter of the year, 1 to 4
+    "quarter": 4,
+    # The ISO 8601 year and week number
+    "iso_year": 2024,
+    "iso_week": 49,
+    # The abbreviated hash of the current Git commit and the current Git branch
+    "git_sha": "1a2b3c4",
+    "git_branch": "main",
+    # The suffix given by --beta, --rc, --release or --custom, with its leading
+    # dot; versions that do not place it get it at the end
+    "suffix": ".beta",
+}
+
+VERSION_FIELDS = frozenset(_VERSION_FIELD_SAMPLES)
+
+# Version format of runs without --build
+DATE_VERSION_FORMAT = "{current_date}{suffix}"
+
+# Fields of a version format the version parser captures besides the date,
+# mapped to the group capturing their value (None for values that are not
+# kept) and the pattern of the value
+_VERSION_FIELD_PATTERNS: Dict[str, Tuple[Optional[str], str]] = {
+    "build_count": ("build_count", r"\d+"),
+    "quarter": ("quarter", r"\d+"),
+    "iso_year": (None, r"\d+"),
+    "iso_week": ("week", r"\d+"),
+    "git_sha": (None, r"[0-9a-f]+"),
+    "git_branch": (None, r".+?"),
+    "suffix": (None, _SUFFIX_PATTERN),
+}
+
+# Clock of the current run, if any
+_ACTIVE_CLOCK: "ContextVar[Optional[Clock]]" = ContextVar(
+    "bumpcalver_clock", default=None
+)
+
 
 def parse_dot_path(dot_path: str, file_type: str) -> str:
     """Parses a dot-separated path and converts it to a file path.
@@ -64,16 +208,224 @@ def parse_dot_path(dot_path: str, file_type: str) -> str:
     return dot_path
 
 
-def parse_version(version: str) -> Optional[tuple]:
+class ParsedVersion(NamedTuple):
+    """The fields of a version string.
+
+    Date parts that the date format does not contain are None.
+
+    Attributes:
+        date (Optional[str]): The date part, as written in the version.
+        year (Optional[int]): The year, with its century (`%y` years are taken as 20xx).
+        quarter (Optional[int]): The quarter of the year (`%q`).
+        month (Optional[int]): The month.
+        week (Optional[int]): The week of the year (`%U`, `%W` or `%V`).
+        day (Optional[int]): The day of the month.
+        day_of_year (Optional[int]): The day of the year (`%j`).
+        build_count (Optional[int]): The build count, if the version has one.
+        suffix (Optional[str]): The suffix after the version (e.g., "beta"), if any.
+    """
+
+    date: Optional[str]
+    year: Optional[int]
+    quarter: Optional[int]
+    month: Optional[int]
+    week: Optional[int]
+    day: Optional[int]
+    day_of_year: Optional[int]
+    build_count: Optional[int]
+    suffix: Optional[str]
+
+
+def _date_pattern(date_format: str, groups: Dict[str, None]) -> str:
+    """Returns the regular expression of the dates written with a date format.
+
+    Args:
+        date_format (str): The date format.
+        groups (Dict[str, None]): The named groups defined so far, updated in place;
+            a directive repeated in the format must repeat the same value.
+
+    Returns:
+        str: The regular expression.
+    """
+    parts: List[str] = []
+    start = 0
+    for match in _PARSER_DIRECTIVE_PATTERN.finditer(date_format):
+        parts.append(re.escape(date_format[start : match.start()]))
+        start = match.end()
+        name, pattern = _DATE_DIRECTIVE_PATTERNS.get(match.group(1), (None, ".+?"))
+        if name is None:
+            parts.append(f"(?:{pattern})")
+        elif name in groups:
+            parts.append(f"(?P={name})")
+        else:
+            groups[name] = None
+            parts.append(f"(?P<{name}>{pattern})")
+    parts.append(re.escape(date_format[start:]))
+    return "".join(parts)
+
+
+def _parser_pattern(version_format: str, date_format: str) -> str:
+    """Returns the regular expression of the versions written with a format pair.
+
+    Everything after the first `{current_date}` field is optional, so that a
+    version written without a build count (e.g. without --build) still parses.
+    The suffix is matched at the end unless the format places it elsewhere,
+    after either a "." or a "-" (the separator of older releases).
+
+    Args:
+        version_format (str): The version format (e.g., "{current_date}-{build_count:03}").
+        date_format (str): The date format (e.g., "%Y.%m.%d").
+
+    Returns:
+        str: The regular expression, anchored at both ends.
+
+    Raises:
+        ValueError: If the version format is not a valid format string.
+    """
+    suffix = _SUFFIX_PATTERN
+    if "{suffix}" in version_format:
+        if version_format.endswith("{suffix}"):
+            version_format = version_format[: -len("{suffix}")]
+        else:
+            suffix = ""
+    groups: Dict[str, None] = {}
+    head: List[str] = []
+    tail: List[str] = []
+    parts = head
+    for literal, field, _, _ in string.Formatter().parse(version_format):
+        parts.append(re.escape(literal))
+        if field is None:
+            continue
+        if field == "current_date":
+            if "date" in groups:
+                parts.append("(?P=date)")
+                continue
+            groups["date"] = None
+            parts.append(f"(?P<date>{_date_pattern(date_format, groups)})")
+            parts = tail
+            continue
+        name, field_pattern = _VERSION_FIELD_PATTERNS.get(field, (None, ".+?"))
+        if name is None:
+            parts.append(f"(?:{field_pattern})")
+        elif name in groups:
+            parts.append(f"(?P={name})")
+        else:
+            groups[name] = None
+            parts.append(f"(?P<{name}>{field_pattern})")
+    pattern = "".join(head)
+    if tail:
+        pattern += f"(?:{''.join(tail)})?"
+    return f"^{pattern}{suffix}\\Z"
+
+
+class VersionParser:
+    """A parser of the version strings of one version and date format.
+
+    The formats are compiled into a single anchored regular expression with a
+    named group per field, the inverse of formatting the version. Use
+    `compile_version_parser` to share one parser per format pair.
+
+    Attributes:
+        version_format (str): The version format.
+        date_format (str): The date format.
+        pattern (re.Pattern): The compiled regular expression.
+    """
+
+    def __init__(self, version_format: str, date_format: str) -> None:
+        self.version_format = version_format
+        self.date_format = date_format
+        self.pattern = re.compile(_parser_pattern(version_format, date_format))
+
+    def parse(self, version: str) -> Optional[ParsedVersion]:
+        """Parses a version string.
+
+        Args:
+            version (str): The version string.
+
+        Returns:
+            Optional[ParsedVersion]: The fields of the version, or None if it does
+                not match the formats.
+        """
+        match = self.pattern.match(version)
+        if match is None:
+            return None
+        return _parsed_version(match.groupdict())
+
+    def parse_many(self, versions: Iterable[str]) -> List[Optional[ParsedVersion]]:
+        """Parses many version strings, e.g. the tags of a repository.
+
+        Args:
+            versions (Iterable[str]): The version strings.
+
+        Returns:
+            List[Optional[ParsedVersion]]: The fields of each version, or None for
+                the versions that do not match the formats.
+        """
+        match = self.pattern.match
+        return [
+            None if found is None else _parsed_version(found.groupdict())
+            for found in map(match, versions)
+        ]
+
+
+def _parsed_version(groups: Dict[str, Optional[str]]) -> ParsedVersion:
+    """Returns the typed fields of the groups matched by a `VersionParser`."""
+    get = groups.get
+    year = get("year")
+    short_year = get("short_year")
+    quarter = get("quarter")
+    month = get("month")
+    week = get("week")
+    day = get("day")
+    day_of_year = get("day_of_year")
+    build_count = get("build_count")
+    return ParsedVersion(
+        get("date"),
+        int(year) if year else 2000 + int(short_year) if short_year else None,
+        int(quarter) if quarter else None,
+        int(month) if month else None,
+        int(week) if week else None,
+        int(day) if day else None,
+        int(day_of_year) if day_of_year else None,
+        int(build_count) if build_count else None,
+        get("suffix"),
+    )
+
+
+@lru_cache(maxsize=256)
+def compile_version_parser(version_format: str, date_format: str) -> VersionParser:
+    """Compiles the parser of a version and date format pair, cached.
+
+    Args:
+        version_format (str): The version format (e.g., "{current_date}-{build_count:03}").
+        date_format (str): The date format (e.g., "%Y.%m.%d").
+
+    Returns:
+        VersionParser: The parser of the versions written with the formats.
+
+    Raises:
+        ValueError: If the version format is not a valid format string.
+    """
+    return VersionParser(version_format, date_format)
+
+
+def parse_version(
+    version: str,
+    version_format: str = "{current_date}-{build_count}",
+    date_format: str = "%Y-%m-%d",
+) -> Optional[tuple]:
     """Parses a version string and returns a tuple of date and count.
 
-    This function parses a version string in the format 'YYYY-MM-DD-XXX' where
-    'YYYY-MM-DD' is the date and 'XXX' is an optional count. It returns a tuple
-    containing the date string and the count as an integer. If the count is not
-    provided, it defaults to 0.
+    This function parses a version string written with the given version and
+    date formats, by default 'YYYY-MM-DD-XXX' where 'YYYY-MM-DD' is the date
+    and 'XXX' is an optional count. It returns a tuple containing the date
+    string and the count as an integer. If the count is not provided, it
+    defaults to 0. See `compile_version_parser` for all the fields.
 
     Args:
         version (str): The version string to parse.
+        version_format (str, optional): The version format. Defaults to "{current_date}-{build_count}".
+        date_format (str, optional): The date format. Defaults to "%Y-%m-%d".
 
     Returns:
         Optional[tuple]: A tuple containing the date string and count, or None if the version string is invalid.
@@ -81,49 +433,347 @@ def parse_version(version: str) -> Optional[tuple]:
     Example:
         version_info = parse_version("2023-10-05-001")
     """
-    # Match the version string against the expected format
-    match = re.match(r"^(\d{4}-\d{2}-\d{2})(?:-(\d+))?", version)
-    if match:
-        # Extract the date string and count from the match groups
-        date_str = match.group(1)
-        count_str = match.group(2) or "0"
-        return date_str, int(count_str)
-    else:
+    parsed = compile_version_parser(version_format, date_format).parse(version)
+    if parsed is None:
         # Print an error message if the version string does not match the expected format
         print(f"Version '{version}' does not match expected format.")
         return None
+    return parsed.date, parsed.build_count or 0
 
 
-def get_current_date(
-    timezone: str = default_timezone, date_format: str = "%Y.%m.%d"
-) -> str:
+@lru_cache(maxsize=None)
+def get_timezone(timezone: str) -> ZoneInfo:
+    """Returns the `ZoneInfo` of a timezone name, cached.
+
+    Args:
+        timezone (str): The IANA timezone name (e.g., "Europe/London").
+
+    Returns:
+        ZoneInfo: The timezone, or the default timezone if the name is unknown.
+    """
     try:
-        tz = ZoneInfo(timezone)
+        return ZoneInfo(timezone)
     except ZoneInfoNotFoundError:
         print(f"Unknown timezone '{timezone}'. Using default '{default_timezone}'.")
-        tz = ZoneInfo(default_timezone)
-    return datetime.now(tz).strftime(date_format)
+        return ZoneInfo(default_timezone)
+
+
+@lru_cache(maxsize=256)
+def compile_date_format(date_format: str) -> Callable[[datetime], str]:
+    """Compiles a date format into a formatter function, cached.
+
+    The format is split once around the directives listed in
+    `CUSTOM_DATE_DIRECTIVES` (such as `%q`); every other directive is left to
+    `strftime`, which formats the whole date in a single call.
+
+    Args:
+        date_format (str): The date format (e.g., "%Y.Q%q").
+
+    Returns:
+        Callable[[datetime], str]: A function returning the formatted date of a datetime.
+
+    Example:
+        format_date = compile_date_format("%y.Q%q")
+        format_date(datetime(2024, 12, 7))  # "24.Q4"
+    """
+    pieces: List[Union[str, Callable[[datetime], str]]] = []
+    start = 0
+    for match in _DIRECTIVE_PATTERN.finditer(date_format):
+        directive = CUSTOM_DATE_DIRECTIVES.get(match.group(1))
+        if directive is not None:
+            pieces.append(date_format[start : match.start()])
+            pieces.append(directive)
+            start = match.end()
+    if not pieces:
+        return lambda moment: moment.strftime(date_format)
+    pieces.append(date_format[start:])
+
+    def format_date(moment: datetime) -> str:
+        # Custom values are escaped so strftime keeps them as they are
+        return moment.strftime(
+            "".join(
+                piece if isinstance(piece, str) else piece(moment).replace("%", "%%")
+                for piece in pieces
+            )
+        )
+
+    return format_date
+
+
+class Clock:
+    """The time of a run, read once and shared by every date it formats.
+
+    The current time is read on first use, so every date of a run is formatted
+    from the same instant, even when the run crosses midnight. A clock can
+    also be given a fixed time, e.g. to replay a past build or in tests. A
+    naive fixed time is taken as the wall time in any timezone it is asked
+    for; an aware one is converted to that timezone.
+
+    Activate a clock with `activate` to make it the clock of the current
+    context: the date functions of this module then use it instead of reading
+    the time again.
+
+    Example:
+        with Clock().activate():
+            version = get_current_datetime_version("UTC", "%Y.%m.%d")
+    """
+
+    def __init__(self, now: Optional[datetime] = None) -> None:
+        self._now = now
+        # Time of the run in each timezone asked for, keyed by timezone name
+        self._moments: Dict[str, datetime] = {}
+
+    def now(self, timezone: str = default_timezone) -> datetime:
+        """Returns the time of the run in a timezone.
+
+        Args:
+            timezone (str, optional): The timezone name. Defaults to `default_timezone`.
+
+        Returns:
+            datetime: The time of the run, aware of the timezone.
+        """
+        moment = self._moments.get(timezone)
+        if moment is None:
+            tz = get_timezone(timezone)
+            if self._now is None:
+                self._now = datetime.now(tz)
+            if self._now.tzinfo is None:
+                moment = self._now.replace(tzinfo=tz)
+            else:
+                moment = self._now.astimezone(tz)
+            self._moments[timezone] = moment
+        return moment
+
+    def format(
+        self, date_format: str = "%Y.%m.%d", timezone: str = default_timezone
+    ) -> str:
+        """Returns the date of the run in a timezone, formatted.
+
+        Args:
+            date_format (str, optional): The date format, which may use the
+                directives of `CUSTOM_DATE_DIRECTIVES`. Defaults to "%Y.%m.%d".
+            timezone (str, optional): The timezone name. Defaults to `default_timezone`.
+
+        Returns:
+            str: The formatted date.
+        """
+        return compile_date_format(date_format)(self.now(timezone))
+
+    @contextmanager
+    def activate(self) -> Iterator["Clock"]:
+        """Makes this clock the clock of the current context."""
+        token = _ACTIVE_CLOCK.set(self)
+        try:
+            yield self
+        finally:
+            _ACTIVE_CLOCK.reset(token)
+
+
+def current_clock() -> Clock:
+    """Returns the clock of the current run.
+
+    Returns:
+        Clock: The clock active in the current context, or a new clock reading
+            the current time if none is active.
+    """
+    return _ACTIVE_CLOCK.get() or Clock()
+
+
+def get_current_date(
+    timezone: str = default_timezone,
+    date_format: str = "%Y.%m.%d",
+    clock: Optional[Clock] = None,
+) -> str:
+    """Returns the current date in the specified timezone.
+
+    Args:
+        timezone (str, optional): The timezone name. Defaults to `default_timezone`.
+        date_format (str, optional): The date format. Defaults to "%Y.%m.%d".
+        clock (Optional[Clock], optional): The clock to read. Defaults to the
+            clock of the current run (see `current_clock`).
+
+    Returns:
+        str: The formatted date.
+    """
+    return (clock or current_clock()).format(date_format, timezone)
 
 
 def get_current_datetime_version(
-    timezone: str = default_timezone, date_format: str = "%Y.%m.%d"
+    timezone: str = default_timezone,
+    date_format: str = "%Y.%m.%d",
+    clock: Optional[Clock] = None,
 ) -> str:
-    try:
-        tz = ZoneInfo(timezone)
-    except ZoneInfoNotFoundError:
-        print(f"Unknown timezone '{timezone}'. Using default '{default_timezone}'.")
-        tz = ZoneInfo(default_timezone)
-    now = datetime.now(tz)
+    """Returns the date part of a version in the specified timezone.
+
+    This is `get_current_date`, under the name the version rendering uses.
+
+    Args:
+        timezone (str, optional): The timezone name. Defaults to `default_timezone`.
+        date_format (str, optional): The date format, which may use `%q` for the
+            quarter. Defaults to "%Y.%m.%d".
+        clock (Optional[Clock], optional): The clock to read. Defaults to the
+            clock of the current run (see `current_clock`).
+
+    Returns:
+        str: The formatted date.
+    """
+    return get_current_date(timezone, date_format, clock)
+
+
+class VersionTemplate:
+    """A version format compiled for rendering.
+
+    The format is parsed and checked once; rendering joins its literal parts
+    with the values of its fields, and only computes the fields it uses (the
+    Git fields run `git`). Use `compile_version_format` to share one template
+    per format.
+
+    Attributes:
+        version_format (str): The version format.
+        fields (FrozenSet[str]): The fields the format uses (see `VERSION_FIELDS`).
+    """
+
+    def __init__(self, version_format: str) -> None:
+        self.version_format = version_format
+        # Literal text, or field name and format spec, of each part of the format
+        pieces: List[Tuple[Optional[str], str, str]] = []
+        try:
+            parsed = list(string.Formatter().parse(version_format))
+        except ValueError as e:
+            raise ValueError(f"Invalid version format '{version_format}': {e}") from e
+        for literal, field, spec, conversion in parsed:
+            if literal:
+                pieces.append((literal, "", ""))
+            if field is None:
+                continue
+            if field not in _VERSION_FIELD_SAMPLES:
+                raise ValueError(
+                    f"Unknown field '{{{field}}}' in version format '{version_format}'. "
+                    f"Supported fields: {', '.join(sorted(VERSION_FIELDS))}"
+                )
+            if conversion:
+                raise ValueError(
+                    f"Conversion '!{conversion}' is not supported in version format "
+                    f"'{version_format}'"
+                )
+            try:
+                format(_VERSION_FIELD_SAMPLES[field], spec)
+            except (TypeError, ValueError) as e:
+                raise ValueError(
+                    f"Invalid format spec '{spec}' for field '{{{field}}}' in version "
+                    f"format '{version_format}': {e}"
+                ) from e
+            pieces.append((None, field, spec))
+        self.fields = frozenset(field for text, field, _ in pieces if text is None)
+        if "suffix" not in self.fields:
+            pieces.append((None, "suffix", ""))
+        self._pieces = tuple(pieces)
+        self._uses_date = not self.fields.isdisjoint(
+            ("quarter", "iso_year", "iso_week")
+        )
+
+    def render(
+        self,
+        current_date: str,
+        build_count: Optional[int] = None,
+        suffix: Optional[str] = None,
+        timezone: str = default_timezone,
+        clock: Optional[Clock] = None,
+    ) -> str:
+        """Renders a version.
+
+        Args:
+            current_date (str): The formatted date.
+            build_count (Optional[int], optional): The build count. Defaults to None,
+                which is only valid for formats without `{build_count}`.
+            suffix (Optional[str], optional): The suffix (e.g., "beta"), rendered with
+                a leading dot. Defaults to None (no suffix).
+            timezone (str, optional): The timezone of the quarter and ISO week fields.
+                Defaults to `default_timezone`.
+            clock (Optional[Clock], optional): The clock of the quarter and ISO week
+                fields. Defaults to the clock of the current run (see `current_clock`).
+
+        Returns:
+            str: The version.
+
+        Raises:
+            ValueError: If the format uses `{build_count}` and no build count is given,
+                or a Git field cannot be read.
+        """
+        values: Dict[str, Any] = {
+            "current_date": current_date,
+            "build_count": build_count,
+            "suffix": f".{suffix}" if suffix else "",
+        }
+        if build_count is None and "build_count" in self.fields:
+            raise ValueError(
+                f"Version format '{self.version_format}' needs a build count"
+            )
+        if self._uses_date:
+            values.update(_date_field_values((clock or current_clock()).now(timezone)))
+        if "git_sha" in self.fields:
+            values["git_sha"] = get_git_sha()
+        if "git_branch" in self.fields:
+            values["git_branch"] = get_git_branch()
+        return self.render_fields(values)
+
+    def render_fields(self, values: Dict[str, Any]) -> str:
+        """Renders a version from the values of its fields.
+
+        Unlike `render`, nothing is computed: use it to render many versions
+        whose field values are already known.
+
+        Args:
+            values (Dict[str, Any]): The value of each field the format uses, and of
+                "suffix" (with its leading dot, or empty).
+
+        Returns:
+            str: The version.
+
+        Raises:
+            KeyError: If a field's value is missing.
+        """
+        return "".join(
+            [
+                text if text is not None else format(values[field], spec)
+                for text, field, spec in self._pieces
+            ]
+        )
 
-    # Handle quarter formatting
-    if "%q" in date_format:
-        quarter = (now.month - 1) // 3 + 1
-        date_format = date_format.replace("%q", str(quarter))
 
-    return now.strftime(date_format)
+def _date_field_values(moment: Union[date, datetime]) -> Dict[str, int]:
+    """Returns the values of the version format fields computed from a date."""
+    iso_year, iso_week, _ = moment.isocalendar()
+    return {
+        "quarter": (moment.month - 1) // 3 + 1,
+        "iso_year": iso_year,
+        "iso_week": iso_week,
+    }
+
+
+@lru_cache(maxsize=256)
+def compile_version_format(version_format: str) -> VersionTemplate:
+    """Compiles a version format into a template, cached.
+
+    Args:
+        version_format (str): The version format (e.g., "{current_date}-{build_count:03}").
+
+    Returns:
+        VersionTemplate: The template.
+
+    Raises:
+        ValueError: If the version format is not a valid format string, uses an
+            unknown field or has an invalid format spec.
+    """
+    return VersionTemplate(version_format)
+
 
 def get_build_version(
-    file_config: Dict[str, Any], version_format: str, timezone: str, date_format: str
+    file_config: Dict[str, Any],
+    version_format: str,
+    timezone: str,
+    date_format: str,
+    suffix: Optional[str] = None,
 ) -> str:
     """Returns the build version string based on the provided file configuration.
 
@@ -139,10 +789,14 @@ def get_build_version(
         version_format (str): The format string for the version.
         timezone (str): The timezone to use for date calculations.
         date_format (str): The format string for the date.
+        suffix (Optional[str], optional): The version suffix (e.g., "beta"). Defaults to None.
 
     Returns:
         str: The formatted build version string.
 
+    Raises:
+        ValueError: If the version format is invalid or a Git field cannot be read.
+
     Example:
         file_config = {
             "path": "version.py",
@@ -155,6 +809,10 @@ def get_build_version(
     file_type = file_config.get("file_type", "")
     variable = file_config.get("variable", "")
     directive = file_config.get("directive", "")
+    read_options: Dict[str, Any] = {}
+    if "head_window" in file_config:
+        # Bytes scanned at the start of the file before reading all of it
+        read_options["head_window"] = file_config["head_window"]
 
     # Get the current date in the specified timezone and format
     current_date = get_current_datetime_version(timezone, date_format)
@@ -165,14 +823,16 @@ def get_build_version(
         handler = get_version_handler(file_type)
         if directive:
             # Read the version using the directive if provided
-            version = handler.read_version(file_path, variable, directive=directive)
+            version = handler.read_version(
+                file_path, variable, directive=directive, **read_options
+            )
         else:
             # Read the version without the directive
-            version = handler.read_version(file_path, variable)
+            version = handler.read_version(file_path, variable, **read_options)
 
         if version:
-            # Parse the version string
-            parsed_version = parse_version(version)
+            # Parse the version string with the formats it was written with
+            parsed_version = parse_version(version, version_format, date_format)
             if parsed_version:
                 last_date, last_count = parsed_version
                 if last_date == current_date:
@@ -181,7 +841,6 @@ def get_build_version(
                 else:
                     build_count = 1
             else:
-                print(f"Version '{version}' does not match expected format.")
                 build_count = 1
         else:
             print(f"Could not read version from {file_path}. Starting new versioning.")
@@ -191,4 +850,251 @@ def get_build_version(
         build_count = 1
 
     # Return the formatted build version string
-    return version_format.format(current_date=current_date, build_count=build_count)
+    return compile_version_format(version_format).render(
+        current_date, build_count, suffix, timezone
+    )
+
+
+# Date format directives of the time of day; dates formatted with them are not
+# bucketed by day
+_TIME_DIRECTIVES = frozenset("HIMSfpXcZzs")
+
+_DAY_US = 86_400 * 1_000_000
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+_ONE_MICROSECOND = timedelta(microseconds=1)
+
+
+def _as_utc(timestamp: Any) -> datetime:
+    """Returns a timestamp of a batch as an aware datetime.
+
+    Numbers are seconds since the Unix epoch; naive datetimes are taken as UTC.
+    """
+    if isinstance(timestamp, datetime):
+        if timestamp.tzinfo is None:
+            return timestamp.replace(tzinfo=dt_timezone.utc)
+        return timestamp
+    return datetime.fromtimestamp(timestamp, dt_timezone.utc)
+
+
+def _batch_field_values(
+    moment: Union[date, datetime], date_format: str
+) -> Dict[str, Any]:
+    """Returns the values of the fields of a batch version that depend on its date."""
+    values: Dict[str, Any] = {"current_date": compile_date_format(date_format)(moment)}
+    values.update(_date_field_values(moment))
+    return values
+
+
+def _batch_versions_python(
+    timestamps: List[Any],
+    tz: ZoneInfo,
+    date_format: str,
+    template: VersionTemplate,
+    shared: Dict[str, Any],
+    by_day: bool,
+) -> List[str]:
+    """Computes the versions of a batch with the standard library."""
+    moments = [_as_utc(timestamp) for timestamp in timestamps]
+    # Field values of each local date (or datetime, for formats with a time)
+    field_values: Dict[Any, Dict[str, Any]] = {}
+    buckets: List[Dict[str, Any]] = []
+    for moment in moments:
+        local = moment.astimezone(tz)
+        key = local.date() if by_day else local
+        values = field_values.get(key)
+        if values is None:
+            values = _batch_field_values(local, date_format)
+            values.update(shared)
+            field_values[key] = values
+        buckets.append(values)
+
+    counts: Dict[str, int] = {}
+    versions: List[str] = [""] * len(moments)
+    render = template.render_fields
+    for index in sorted(range(len(moments)), key=moments.__getitem__):
+        values = buckets[index]
+        count = counts.get(values["current_date"], 0) + 1
+        counts[values["current_date"]] = count
+        versions[index] = render({**values, "build_count": count})
+    return versions
+
+
+def _utc_offset_us(micros: int, tz: ZoneInfo) -> int:
+    """Returns the UTC offset of a timezone at a time, in microseconds."""
+    offset = (_EPOCH + timedelta(microseconds=micros)).astimezone(tz).utcoffset()
+    return (offset or timedelta(0)) // _ONE_MICROSECOND
+
+
+def _offset_change_us(start: int, end: int, offset: int, tz: ZoneInfo) -> int:
+    """Returns the first microsecond after `start` whose UTC offset is not `offset`.
+
+    The offset at `end` must differ from `offset`. Offsets change on whole
+    seconds, so the search stops at one-second precision.
+    """
+    second = 1_000_000
+    low, high = start // second, -(-end // second)
+    while high - low > 1:
+        middle = (low + high) // 2
+        if _utc_offset_us(middle * second, tz) == offset:
+            low = middle
+        else:
+            high = middle
+    return max(high * second, start + 1)
+
+
+def _batch_versions_numpy(
+    timestamps: Any,
+    tz: ZoneInfo,
+    date_format: str,
+    template: VersionTemplate,
+    shared: Dict[str, Any],
+) -> List[str]:
+    """Computes the versions of a batch with NumPy arrays."""
+    import numpy as np
+
+    array = np.asarray(timestamps)
+    if array.dtype.kind == "M":
+        micros = array.astype("datetime64[us]").astype(np.int64)
+    elif array.dtype.kind in "iuf":
+        micros = np.round(array.astype(np.float64) * 1_000_000).astype(np.int64)
+    else:
+        micros = np.array(
+            [(_as_utc(value) - _EPOCH) // _ONE_MICROSECOND for value in array.tolist()],
+            dtype=np.int64,
+        )
+
+    # UTC offset of each timestamp. Offsets are looked up at the start and end
+    # of each UTC day; in a day where the offset changes, the instant of the
+    # change is searched, and timestamps before it get the earlier offset.
+    utc_days, utc_day_index = np.unique(micros // _DAY_US, return_inverse=True)
+    day_count = len(utc_days)
+    first_offsets = np.empty(day_count, dtype=np.int64)
+    last_offsets = np.empty(day_count, dtype=np.int64)
+    changes = np.full(day_count, np.iinfo(np.int64).max, dtype=np.int64)
+    irregular: List[int] = []
+    for position, utc_day in enumerate(utc_days.tolist()):
+        start = utc_day * _DAY_US
+        first = first_offsets[position] = _utc_offset_us(start, tz)
+        last = last_offsets[position] = _utc_offset_us(start + _DAY_US - 1, tz)
+        if first != last:
+            change = _offset_change_us(start, start + _DAY_US - 1, first, tz)
+            changes[position] = change
+            if _utc_offset_us(change, tz) != last:
+                # More than one change in the day
+                irregular.append(position)
+    record_offsets = np.where(
+        micros < changes[utc_day_index],
+        first_offsets[utc_day_index],
+        last_offsets[utc_day_index],
+    )
+    if irregular:
+        for index in np.flatnonzero(np.isin(utc_day_index, irregular)).tolist():
+            record_offsets[index] = _utc_offset_us(int(micros[index]), tz)
+
+    # Local day of each timestamp, and the date bucket of each local day
+    days, day_index = np.unique(
+        (micros + record_offsets) // _DAY_US, return_inverse=True
+    )
+    day_values: List[Dict[str, Any]] = []
+    bucket_ids: Dict[str, int] = {}
+    day_buckets = np.empty(len(days), dtype=np.int64)
+    for position, day in enumerate(days.tolist()):
+        moment = datetime(1970, 1, 1) + timedelta(days=day)
+        values = _batch_field_values(moment, date_format)
+        values.update(shared)
+        day_values.append(values)
+        day_buckets[position] = bucket_ids.setdefault(
+            values["current_date"], len(bucket_ids)
+        )
+    buckets = day_buckets[day_index]
+
+    # Build counts: the position of each timestamp in its bucket, by time
+    order = np.lexsort((micros, buckets))
+    sorted_buckets = buckets[order]
+    positions = np.arange(len(order))
+    starts = np.ones(len(order), dtype=bool)
+    starts[1:] = sorted_buckets[1:] != sorted_buckets[:-1]
+    group_starts = np.maximum.accumulate(np.where(starts, positions, 0))
+    counts = np.empty(len(order), dtype=np.int64)
+    counts[order] = positions - group_starts + 1
+
+    render = template.render_fields
+    return [
+        render({**day_values[day], "build_count": count})
+        for day, count in zip(day_index.tolist(), counts.tolist())
+    ]
+
+
+def get_batch_versions(
+    timestamps: Iterable[Any],
+    timezone: str = default_timezone,
+    date_format: str = "%Y.%m.%d",
+    version_format: str = "{current_date}-{build_count:03}",
+    suffix: Optional[str] = None,
+    use_numpy: Optional[bool] = None,
+) -> List[str]:
+    """Returns the versions of many builds, e.g. to backfill past builds.
+
+    Each timestamp is converted to the timezone and its date formatted; the
+    builds of the same formatted date (the date bucket, e.g. a quarter for
+    "%Y.Q%q") are numbered from 1 in time order, ties keeping their order in
+    the input. The versions are returned in the order of the timestamps.
+
+    With NumPy installed (`pip install bumpcalver[numpy]`), the timestamps are
+    converted, bucketed and counted as arrays, and the dates are formatted once
+    per day. Otherwise, or with `use_numpy=False`, the same versions are
+    computed with the standard library.
+
+    Args:
+        timestamps (Iterable[Any]): The build times: datetimes (naive ones are taken
+            as UTC), seconds since the Unix epoch, or a NumPy `datetime64` array.
+        timezone (str, optional): The timezone of the dates. Defaults to `default_timezone`.
+        date_format (str, optional): The date format. Defaults to "%Y.%m.%d".
+        version_format (str, optional): The version format. Defaults to
+            "{current_date}-{build_count:03}".
+        suffix (Optional[str], optional): The suffix of every version. Defaults to None.
+        use_numpy (Optional[bool], optional): Whether to use NumPy. Defaults to None,
+            which uses it when it is installed.
+
+    Returns:
+        List[str]: The version of each build.
+
+    Raises:
+        ValueError: If the version format is invalid or a Git field cannot be read.
+        ImportError: If `use_numpy` is True and NumPy is not installed.
+
+    Example:
+        get_batch_versions([1733580000, 1733583600, 1733670000], "UTC")
+        # ["2024.12.07-001", "2024.12.07-002", "2024.12.08-001"]
+    """
+    template = compile_version_format(version_format)
+    tz = get_timezone(timezone)
+    # Fields with the same value for every build
+    shared: Dict[str, Any] = {"suffix": f".{suffix}" if suffix else ""}
+    if "git_sha" in template.fields:
+        shared["git_sha"] = get_git_sha()
+    if "git_branch" in template.fields:
+        shared["git_branch"] = get_git_branch()
+
+    by_day = _TIME_DIRECTIVES.isdisjoint(_DIRECTIVE_PATTERN.findall(date_format))
+    if use_numpy is None:
+        try:
+            import numpy  # noqa: F401
+        except ImportError:
+            use_numpy = False
+        else:
+            use_numpy = by_day
+    if use_numpy:
+        if not by_day:
+            raise ValueError(
+                f"Date format '{date_format}' has a time of day; use use_numpy=False"
+            )
+        return _batch_versions_numpy(timestamps, tz, date_format, template, shared)
+    if getattr(getattr(timestamps, "dtype", None), "kind", None) == "M":
+        # NumPy datetime64 values become naive datetimes, taken as UTC
+        timestamps = timestamps.astype("datetime64[us]").tolist()  # type: ignore
+    return _batch_versions_python(
+        list(timestamps), tz, date_format, template, shared, by_day
+    )
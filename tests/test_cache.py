@@ -0,0 +1,98 @@
+# tests/test_cache.py
+
+import os
+
+from src.bumpcalver.cache import VersionCache, read_file_version
+from src.bumpcalver.file_utils import FileTransaction
+
+
+def make_version_file(tmp_path, version="2023-10-10"):
+    path = tmp_path / "version.py"
+    path.write_text(f'__version__ = "{version}"\n')
+    # Files modified within the last seconds are not cached
+    os.utime(path, (0, 0))
+    return {"path": str(path), "file_type": "python", "variable": "__version__"}
+
+
+def test_version_cache_serves_unchanged_files(tmp_path, monkeypatch):
+    from src.bumpcalver import cache as cache_module
+
+    file_config = make_version_file(tmp_path)
+    cache_path = str(tmp_path / "cache" / "versions")
+    cache = VersionCache(cache_path)
+    assert cache.read_version(file_config) == "2023-10-10"
+    cache.save()
+
+    def fail(file_config):
+        raise AssertionError("the file should not be read")
+
+    monkeypatch.setattr(cache_module, "_read_version", fail)
+    warm = VersionCache(cache_path)
+    assert warm.read_version(file_config) == "2023-10-10"
+    assert (warm.hits, warm.misses) == (1, 0)
+
+
+def test_version_cache_detects_changed_files(tmp_path):
+    file_config = make_version_file(tmp_path)
+    cache = VersionCache(str(tmp_path / "versions"))
+    assert cache.read_version(file_config) == "2023-10-10"
+
+    make_version_file(tmp_path, "2023-10-11")
+    os.utime(file_config["path"], (1, 1))
+    assert cache.read_version(file_config) == "2023-10-11"
+    assert (cache.hits, cache.misses) == (0, 2)
+
+
+def test_version_cache_skips_recently_modified_files(tmp_path):
+    file_config = make_version_file(tmp_path)
+    os.utime(file_config["path"])
+    cache = VersionCache(str(tmp_path / "versions"))
+
+    assert cache.read_version(file_config) == "2023-10-10"
+    assert cache.read_version(file_config) == "2023-10-10"
+    assert cache.misses == 2
+
+
+def test_version_cache_evicts_least_recently_used(tmp_path):
+    file_configs = []
+    for name in ("a", "b", "c"):
+        directory = tmp_path / name
+        directory.mkdir()
+        file_configs.append(make_version_file(directory))
+    cache = VersionCache(str(tmp_path / "versions"), max_entries=2)
+
+    cache.read_version(file_configs[0])
+    cache.read_version(file_configs[1])
+    cache.read_version(file_configs[0])
+    cache.read_version(file_configs[2])
+    cache.save()
+
+    reloaded = VersionCache(str(tmp_path / "versions"), max_entries=2)
+    reloaded.read_version(file_configs[0])
+    reloaded.read_version(file_configs[2])
+    reloaded.read_version(file_configs[1])
+    assert (reloaded.hits, reloaded.misses) == (2, 1)
+
+
+def test_version_cache_ignores_unreadable_cache_file(tmp_path):
+    file_config = make_version_file(tmp_path)
+    cache_path = tmp_path / "versions"
+    cache_path.write_bytes(b"not a cache")
+
+    cache = VersionCache(str(cache_path))
+    assert cache.read_version(file_config) == "2023-10-10"
+    cache.save()
+    assert VersionCache(str(cache_path)).read_version(file_config) == "2023-10-10"
+
+
+def test_version_cache_is_bypassed_in_transactions(tmp_path):
+    from src.bumpcalver.file_utils import write_content
+
+    file_config = make_version_file(tmp_path)
+    cache = VersionCache(str(tmp_path / "versions"))
+    assert read_file_version(file_config, cache) == "2023-10-10"
+
+    with FileTransaction():
+        write_content(file_config["path"], b'__version__ = "2023-10-11"\n')
+        assert read_file_version(file_config, cache) == "2023-10-11"
+    assert cache.hits == 0
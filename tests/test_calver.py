@@ -0,0 +1,102 @@
+# tests/test_calver.py
+
+import pickle
+
+import pytest
+
+from src.bumpcalver.calver import CalVer, sort_versions
+
+
+def test_calver_fields():
+    version = CalVer.parse("2024.12.14-001.rc")
+    assert version.text == str(version) == "2024.12.14-001.rc"
+    assert version.date == "2024.12.14"
+    assert version.build_count == 1
+    assert version.suffix == "rc"
+    assert repr(version) == "CalVer('2024.12.14-001.rc')"
+
+
+def test_calver_parse_invalid():
+    with pytest.raises(ValueError, match="does not match the version format"):
+        CalVer.parse("v1.0.0")
+
+
+def test_calver_ordering():
+    versions = [
+        "2024.12.14-010",
+        "2024.12.14-001",
+        "2024.12.14-001.rc",
+        "2024.12.14-001.beta",
+        "2024.12.14-001.release",
+        "2024.12.13-099",
+    ]
+    assert [str(version) for version in sorted(CalVer.parse_many(versions))] == [
+        "2024.12.13-099",
+        "2024.12.14-001.beta",
+        "2024.12.14-001.rc",
+        "2024.12.14-001",
+        "2024.12.14-001.release",
+        "2024.12.14-010",
+    ]
+    assert CalVer.parse("2024.12.14-001.rc") < CalVer.parse("2024.12.14-001")
+    assert CalVer.parse("2024.12.14-010") >= CalVer.parse("2024.12.14-001")
+    assert CalVer.parse("2024.12.14-001") != CalVer.parse("2024.12.14-001.rc")
+
+
+def test_calver_ordering_of_custom_suffixes():
+    versions = [
+        "2024.12.14-001.beta",
+        "2024.12.14-001.dev",
+        "2024.12.14-001",
+        "2024.12.14-001.alpha",
+        "2024.12.13-001.rc",
+    ]
+    # Custom suffixes rank below every known suffix, alphabetically
+    assert [str(version) for version in sorted(CalVer.parse_many(versions))] == [
+        "2024.12.13-001.rc",
+        "2024.12.14-001.alpha",
+        "2024.12.14-001.dev",
+        "2024.12.14-001.beta",
+        "2024.12.14-001",
+    ]
+
+
+def test_calver_equality_and_hashing():
+    # The same build written with another padding is the same version
+    assert CalVer.parse("2024.12.14-001") == CalVer.parse(
+        "2024.12.14-1", "{current_date}-{build_count}"
+    )
+    assert len(set(CalVer.parse_many(["2024.12.14-001", "2024.12.14-001"]))) == 1
+
+
+def test_calver_is_immutable_and_picklable():
+    version = CalVer.parse("2024.12.14-001")
+    with pytest.raises(AttributeError):
+        version.build_count = 2
+    with pytest.raises(AttributeError):
+        version.label = "x"
+    restored = pickle.loads(pickle.dumps(version))
+    assert restored == version and restored.text == version.text
+
+
+def test_calver_pep440():
+    assert CalVer.parse("2024.12.14-001").pep440() == "2024.12.14.1"
+    assert CalVer.parse("2024.12.14-001.beta").pep440() == "2024.12.14.1b0"
+    assert CalVer.parse("2024.12.14-001.rc").pep440() == "2024.12.14.1rc0"
+    assert CalVer.parse("2024.12.14-001.release").pep440() == "2024.12.14.1"
+    assert CalVer.parse("2024.12.14-001.Hot_Fix").pep440() == "2024.12.14.1+hot.fix"
+    quarterly = CalVer.parse("24.Q4.7", "{current_date}.{build_count}", "%y.Q%q")
+    assert quarterly.pep440() == "24.4.7"
+
+
+def test_sort_versions_quarters():
+    tags = ["24.Q4.2", "latest", "24.Q1.10", "25.Q1.1", "24.Q4.2.beta"]
+    assert sort_versions(tags, "{current_date}.{build_count}", "%y.Q%q") == [
+        "24.Q1.10",
+        "24.Q4.2.beta",
+        "24.Q4.2",
+        "25.Q1.1",
+    ]
+    assert sort_versions(tags, "{current_date}.{build_count}", "%y.Q%q", True)[0] == (
+        "25.Q1.1"
+    )
@@ -1,8 +1,12 @@
 # tests/test_cli.py
 
+import os
+import subprocess
+import sys
 from unittest import mock
 from click.testing import CliRunner
 from src.bumpcalver.cli import main
+from src.bumpcalver.handlers import UpdatedFiles
 
 
 
@@ -97,11 +101,16 @@ def test_build_option(monkeypatch):
         "git_tag": False,
         "auto_commit": False,
     }
-    monkeypatch.setattr("src.bumpcalver.cli.load_config", lambda: mock_config)
+    monkeypatch.setattr("src.bumpcalver.cli.load_config", lambda **kwargs: mock_config)
 
     # Mock get_build_version
     mock_get_build_version = mock.Mock(return_value="2023-10-10-001")
     monkeypatch.setattr("src.bumpcalver.cli.get_build_version", mock_get_build_version)
+    # The configured file does not exist, which would fail the run
+    monkeypatch.setattr(
+        "src.bumpcalver.cli.update_version_in_files",
+        mock.Mock(return_value=UpdatedFiles(["dummy/path/to/file"])),
+    )
 
     # Run the CLI command with the --build option
     runner = CliRunner()
@@ -113,6 +122,7 @@ def test_build_option(monkeypatch):
         mock_config["version_format"],
         mock_config["timezone"],
         mock_config["date_format"],
+        suffix=None,
     )
 
     # Verify the output
@@ -135,7 +145,7 @@ def test_value_error(monkeypatch):
         "git_tag": False,
         "auto_commit": False,
     }
-    monkeypatch.setattr("src.bumpcalver.cli.load_config", lambda: mock_config)
+    monkeypatch.setattr("src.bumpcalver.cli.load_config", lambda **kwargs: mock_config)
 
     # Mock get_build_version to raise ValueError
     mock_get_build_version = mock.Mock(side_effect=ValueError("Invalid value"))
@@ -165,7 +175,7 @@ def test_key_error(monkeypatch):
         "git_tag": False,
         "auto_commit": False,
     }
-    monkeypatch.setattr("src.bumpcalver.cli.load_config", lambda: mock_config)
+    monkeypatch.setattr("src.bumpcalver.cli.load_config", lambda **kwargs: mock_config)
 
     # Mock get_build_version to raise KeyError
     mock_get_build_version = mock.Mock(side_effect=KeyError("Missing key"))
@@ -178,3 +188,219 @@ def test_key_error(monkeypatch):
     # Verify the output
     assert result.exit_code == 1
     assert "Error generating version: 'Missing key'" in result.output
+
+
+def test_jobs_option(monkeypatch):
+    mock_config = {
+        "version_format": "{current_date}-{build_count:03}",
+        "date_format": "%Y.%m.%d",
+        "file_configs": [
+            {
+                "path": "dummy/path/to/file",
+                "file_type": "python",
+                "variable": "__version__",
+            }
+        ],
+        "timezone": "America/New_York",
+        "git_tag": False,
+        "auto_commit": False,
+        "jobs": 2,
+    }
+    monkeypatch.setattr("src.bumpcalver.cli.load_config", lambda **kwargs: mock_config)
+    monkeypatch.setattr(
+        "src.bumpcalver.cli.get_build_version", mock.Mock(return_value="2023-10-10-001")
+    )
+    mock_update = mock.Mock(return_value=UpdatedFiles())
+    monkeypatch.setattr("src.bumpcalver.cli.update_version_in_files", mock_update)
+
+    runner = CliRunner()
+    result = runner.invoke(main, ["--build"])
+    assert result.exit_code == 0
+    assert mock_update.call_args.kwargs["jobs"] == 2
+
+    result = runner.invoke(main, ["--build", "--jobs", "8"])
+    assert result.exit_code == 0
+    assert mock_update.call_args.kwargs["jobs"] == 8
+
+    result = runner.invoke(main, ["--build", "--jobs", "0"])
+    assert result.exit_code != 0
+
+
+def test_plan_and_apply_commands(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "Makefile").write_text("VERSION = 2024.01.01-001\n")
+    (tmp_path / "bumpcalver.toml").write_text(
+        '[[file]]\npath = "Makefile"\nfile_type = "makefile"\nvariable = "VERSION"\n'
+    )
+    monkeypatch.setattr(
+        "src.bumpcalver.cli.get_current_datetime_version",
+        mock.Mock(return_value="2024.01.02"),
+    )
+
+    runner = CliRunner()
+    result = runner.invoke(main, ["plan", "--beta", "-o", "plan.json"])
+    assert result.exit_code == 0, result.output
+    assert "Makefile:10-24: b'2024.01.01-001' -> b'2024.01.02.beta'" in result.output
+    assert (tmp_path / "Makefile").read_text() == "VERSION = 2024.01.01-001\n"
+
+    result = runner.invoke(main, ["apply", "plan.json"])
+    assert result.exit_code == 0, result.output
+    assert "Makefile: 2024.01.01-001 -> 2024.01.02.beta" in result.output
+    assert "Updated version to 2024.01.02.beta in specified files." in result.output
+    assert (tmp_path / "Makefile").read_text() == "VERSION = 2024.01.02.beta\n"
+
+    # The plan no longer matches the file
+    result = runner.invoke(main, ["apply", "plan.json"])
+    assert result.exit_code == 1
+    assert "Files changed since the plan was made" in result.output
+
+
+def test_invalid_version_format_fails(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "Makefile").write_text("VERSION = 2024.01.01-001\n")
+    (tmp_path / "bumpcalver.toml").write_text(
+        'version_format = "{current_date}-{bogus:03}"\n'
+        '[[file]]\npath = "Makefile"\nfile_type = "makefile"\nvariable = "VERSION"\n'
+    )
+
+    runner = CliRunner()
+    for args in (["--build"], ["plan", "--build"], ["apply"]):
+        result = runner.invoke(main, args)
+        assert result.exit_code == 1, result.output
+        assert "Unknown field '{bogus}'" in result.output
+    assert (tmp_path / "Makefile").read_text() == "VERSION = 2024.01.01-001\n"
+
+
+def test_no_cache_option(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "Makefile").write_text("VERSION = 2024.01.01-001\n")
+    (tmp_path / "bumpcalver.toml").write_text(
+        '[[file]]\npath = "Makefile"\nfile_type = "makefile"\nvariable = "VERSION"\n'
+    )
+
+    runner = CliRunner()
+    for args in (["--no-cache"], ["plan", "--no-cache"], ["check", "--no-cache"]):
+        result = runner.invoke(main, args)
+        assert result.exit_code == 0, result.output
+        assert "Original path: Makefile -> Converted path: Makefile" in result.output
+    assert not (tmp_path / ".bumpcalver" / "cache").exists()
+
+    result = runner.invoke(main, ["apply", "--no-cache"])
+    assert result.exit_code == 0, result.output
+    assert not (tmp_path / ".bumpcalver" / "cache").exists()
+
+
+def test_interrupted_update_is_completed(tmp_path, monkeypatch):
+    from src.bumpcalver import file_utils
+
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "Makefile").write_text("VERSION = 2024.01.01-001\n")
+    (tmp_path / "version.py").write_text('__version__ = "2024.01.01-001"\n')
+    (tmp_path / "bumpcalver.toml").write_text(
+        '[[file]]\npath = "Makefile"\nfile_type = "makefile"\nvariable = "VERSION"\n'
+        '[[file]]\npath = "version.py"\nfile_type = "python"\n'
+        'variable = "__version__"\n'
+    )
+    monkeypatch.setattr(
+        "src.bumpcalver.cli.get_current_datetime_version",
+        mock.Mock(return_value="2024.01.02"),
+    )
+
+    def crash(entry):
+        raise KeyboardInterrupt
+
+    runner = CliRunner()
+    with mock.patch.object(file_utils, "_apply_entry", crash):
+        result = runner.invoke(main, ["--beta", "--no-cache"])
+    assert result.exit_code == 1
+    assert (tmp_path / ".bumpcalver" / "journal.json").exists()
+
+    result = runner.invoke(main, ["--rc", "--no-cache"])
+    assert result.exit_code == 0, result.output
+    assert "Completing the interrupted update recorded in" in result.output
+    assert "version.py: 2024.01.02.beta -> 2024.01.02.rc" in result.output
+    assert not (tmp_path / ".bumpcalver").exists()
+
+
+def test_options_before_subcommand():
+    runner = CliRunner()
+    result = runner.invoke(main, ["--beta", "plan"])
+    assert result.exit_code != 0
+    assert "Options must be given after the plan command." in result.output
+
+
+
+def test_check_command(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "Makefile").write_text("VERSION = 2024.01.01-001\n")
+    (tmp_path / "version.py").write_text('__version__ = "2024.1.1.1"\n')
+    (tmp_path / "bumpcalver.toml").write_text(
+        '[[file]]\npath = "Makefile"\nfile_type = "makefile"\nvariable = "VERSION"\n'
+        '[[file]]\npath = "version.py"\nfile_type = "python"\n'
+        'variable = "__version__"\n'
+    )
+    for name in ("Makefile", "version.py"):
+        os.utime(tmp_path / name, (0, 0))
+
+    runner = CliRunner()
+    result = runner.invoke(main, ["check"])
+    assert result.exit_code == 0, result.output
+    assert "Makefile: 2024.01.01-001" in result.output
+    assert "All files hold the same version." in result.output
+    assert (tmp_path / ".bumpcalver" / "cache" / "versions").exists()
+
+    (tmp_path / "version.py").write_text('__version__ = "2024.1.2.1"\n')
+    result = runner.invoke(main, ["check", "--no-cache"])
+    assert result.exit_code == 1
+    assert "Files hold different versions." in result.output
+
+# Parser and process libraries that must not be loaded unless a run needs them
+HEAVY_MODULES = {
+    "concurrent.futures",
+    "json",
+    "multiprocessing",
+    "subprocess",
+    "tempfile",
+    "toml",
+    "xml.etree.ElementTree",
+    "xml.parsers.expat",
+    "yaml",
+}
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_with_importtime(args, cwd):
+    """Runs the CLI in a fresh interpreter and returns the imported module names."""
+    code = (
+        f"import sys; sys.path.insert(0, {REPO_ROOT!r}); "
+        "from src.bumpcalver.cli import main; main()"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code, *args],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
+    return {
+        line.rsplit("|", 1)[1].strip()
+        for line in result.stderr.splitlines()
+        if line.startswith("import time:") and not line.endswith("package")
+    }
+
+
+def test_help_does_not_import_parsers(tmp_path):
+    modules = run_with_importtime(["--help"], tmp_path)
+    assert "src.bumpcalver.handlers" in modules
+    assert modules & HEAVY_MODULES == set()
+
+
+def test_makefile_only_bump_imports_only_the_config_parser(tmp_path):
+    (tmp_path / "Makefile").write_text("VERSION = 2024.01.01-001\n")
+    (tmp_path / "bumpcalver.toml").write_text(
+        '[[file]]\npath = "Makefile"\nfile_type = "makefile"\nvariable = "VERSION"\n'
+    )
+
+    modules = run_with_importtime(["--build"], tmp_path)
+    assert "VERSION = 2024.01.01-001" not in (tmp_path / "Makefile").read_text()
+    assert modules & HEAVY_MODULES == {"toml"}
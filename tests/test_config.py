@@ -2,6 +2,7 @@ import os
 import sys
 from unittest import mock
 
+import pytest
 import toml
 from src.bumpcalver.config import load_config
 
@@ -56,6 +57,7 @@ def test_load_config_with_valid_pyproject(monkeypatch):
     ]
     assert config["git_tag"] is True
     assert config["auto_commit"] is True
+    assert config["jobs"] == 1
 
 
 def test_load_config_with_valid_bumpcalver(monkeypatch):
@@ -226,3 +228,50 @@ def test_load_config_no_config_file_found(monkeypatch):
         file=sys.stderr,
     )
     assert config == {}
+
+
+def test_load_config_reuses_compiled_config(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "bumpcalver.toml").write_text(
+        '[[file]]\npath = "src.app"\nfile_type = "python"\nvariable = "__version__"\n'
+    )
+
+    config = load_config(use_cache=True)
+    assert config["file_configs"][0]["path"] == os.path.join("src", "app.py")
+    assert (tmp_path / ".bumpcalver" / "cache" / "config").exists()
+
+    def fail(*args, **kwargs):
+        raise AssertionError("the configuration should not be parsed")
+
+    monkeypatch.setattr(toml, "loads", fail)
+    capsys.readouterr()
+    assert load_config(use_cache=True) == config
+    # The resolved paths are reported as on a cold run
+    assert "Original path: src.app -> Converted path: " in capsys.readouterr().out
+
+    # A changed configuration file is parsed again
+    monkeypatch.undo()
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "bumpcalver.toml").write_text(
+        '[[file]]\npath = "src.app"\nfile_type = "python"\nvariable = "VERSION"\n'
+    )
+    assert load_config(use_cache=True)["file_configs"][0]["variable"] == "VERSION"
+
+
+def test_load_config_rejects_invalid_version_format(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "bumpcalver.toml").write_text(
+        'version_format = "{current_date}-{build_number}"\n'
+    )
+
+    with pytest.raises(ValueError, match=r"Unknown field '\{build_number\}'"):
+        load_config()
+
+
+@pytest.mark.parametrize("jobs", ['"4"', "0", "-2", "true", "1.5"])
+def test_load_config_rejects_invalid_jobs(tmp_path, monkeypatch, jobs):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "bumpcalver.toml").write_text(f"jobs = {jobs}\n")
+
+    with pytest.raises(ValueError, match="jobs must be a positive integer"):
+        load_config()
@@ -0,0 +1,417 @@
+# tests/test_file_utils.py
+
+import os
+
+import pytest
+from src.bumpcalver.file_utils import (
+    FileTransaction,
+    TextFormat,
+    apply_edits,
+    apply_text_format,
+    detect_text_format,
+    parse_cached,
+    read_file,
+    recover_transaction,
+    write_content,
+    write_edits,
+)
+
+
+def test_apply_edits():
+    assert apply_edits(b"a = 1\nb = 2\n", {(10, 11): b"30", (4, 5): b"9"}) == (
+        b"a = 9\nb = 30\n"
+    )
+    assert apply_edits("abc", {}) == "abc"
+
+
+def test_detect_text_format():
+    assert detect_text_format(b"\xef\xbb\xbfa = 1\r\nb = 2\n") == TextFormat(
+        b"\xef\xbb\xbf", b"\r\n"
+    )
+    assert detect_text_format(b"a = 1\nb = 2\r\n") == TextFormat(b"", b"\n")
+    assert detect_text_format(b"") == TextFormat(b"", b"\n")
+
+
+def test_apply_text_format():
+    windows = TextFormat(b"\xef\xbb\xbf", b"\r\n")
+    assert apply_text_format(b"a = 1\nb = 2\n", windows) == (
+        b"\xef\xbb\xbfa = 1\r\nb = 2\r\n"
+    )
+    # Already formatted output is left as is
+    assert apply_text_format(b"\xef\xbb\xbfa\r\n", windows) == b"\xef\xbb\xbfa\r\n"
+    assert apply_text_format(b"a\n", TextFormat(b"", b"\n")) == b"a\n"
+
+
+def test_write_edits_same_length_patches_in_place(tmp_path, monkeypatch):
+    target = tmp_path / "version.py"
+    target.write_bytes(b'__version__ = "2024.12.14-001"\n')
+    link = tmp_path / "link.py"
+    os.link(target, link)
+    inode = target.stat().st_ino
+    content = target.read_bytes()
+
+    writes = []
+    real_pwrite = os.pwrite
+    monkeypatch.setattr(
+        os,
+        "pwrite",
+        lambda fd, data, offset: writes.append(offset) or real_pwrite(fd, data, offset),
+    )
+    write_edits(str(target), content, {(15, 29): b"2024.12.15-002"})
+
+    assert writes == [15]
+    assert target.stat().st_ino == inode
+    assert link.read_bytes() == b'__version__ = "2024.12.15-002"\n'
+
+
+def test_write_edits_length_change_rewrites_file(tmp_path):
+    target = tmp_path / "version.py"
+    target.write_bytes(b'__version__ = "2024.12.14"\n')
+    target.chmod(0o640)
+    link = tmp_path / "link.py"
+    link.symlink_to(target)
+    content = target.read_bytes()
+
+    write_edits(str(link), content, {(15, 25): b"2024.12.15.1"})
+
+    assert link.is_symlink()
+    assert target.read_bytes() == b'__version__ = "2024.12.15.1"\n'
+    assert target.stat().st_mode & 0o777 == 0o640
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["link.py", "version.py"]
+
+
+def test_write_edits_length_change_keeps_hardlinks(tmp_path):
+    target = tmp_path / "version.py"
+    target.write_bytes(b'# header\n__version__ = "2024.12.14"\n# footer\n')
+    link = tmp_path / "link.py"
+    os.link(target, link)
+    inode = target.stat().st_ino
+    content = target.read_bytes()
+
+    write_edits(str(target), content, {(24, 34): b"2024.12.15.1"})
+
+    assert target.stat().st_ino == inode
+    assert link.read_bytes() == b'# header\n__version__ = "2024.12.15.1"\n# footer\n'
+
+    write_edits(str(target), link.read_bytes(), {(24, 36): b"2025.1.1"})
+    assert link.read_bytes() == b'# header\n__version__ = "2025.1.1"\n# footer\n'
+
+
+def test_write_edits_restores_hardlinked_file_when_overwrite_fails(
+    tmp_path, monkeypatch
+):
+    target = tmp_path / "version.py"
+    original = b'# header\n__version__ = "2024.12.14"\n# footer\n'
+    target.write_bytes(original)
+    link = tmp_path / "link.py"
+    os.link(target, link)
+
+    real_ftruncate = os.ftruncate
+    calls = []
+
+    def ftruncate(fd, length):
+        calls.append(length)
+        if len(calls) == 1:
+            raise OSError("disk full")
+        real_ftruncate(fd, length)
+
+    monkeypatch.setattr(os, "ftruncate", ftruncate)
+    with pytest.raises(OSError, match="disk full"):
+        write_edits(str(target), original, {(24, 34): b"2024.12.15.1"})
+
+    assert calls == [len(original) + 2, len(original)]
+    assert link.read_bytes() == original
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["link.py", "version.py"]
+
+
+def test_write_edits_length_change_copies_owner(tmp_path, monkeypatch):
+    target = tmp_path / "version.py"
+    target.write_bytes(b'__version__ = "2024.12.14"\n')
+    file_stat = target.stat()
+    chowned = []
+    monkeypatch.setattr(
+        os, "chown", lambda path, uid, gid: chowned.append((uid, gid)), raising=False
+    )
+
+    write_edits(str(target), target.read_bytes(), {(15, 25): b"2024.12.15.1"})
+
+    assert chowned == [(file_stat.st_uid, file_stat.st_gid)]
+    assert target.read_bytes() == b'__version__ = "2024.12.15.1"\n'
+
+
+@pytest.mark.parametrize(
+    "unavailable", [[], ["copy_file_range"], ["copy_file_range", "sendfile"]]
+)
+def test_write_edits_length_change_copies_unchanged_ranges(
+    tmp_path, monkeypatch, unavailable
+):
+    target = tmp_path / "bundle.js"
+    prefix = b"/* generated */\n" * 10000
+    suffix = b"\nvar x = 1;" * 10000
+    content = prefix + b'version="2024.12.14"' + suffix
+    target.write_bytes(content)
+    for name in unavailable:
+        monkeypatch.delattr(os, name, raising=False)
+
+    start = len(prefix) + 9
+    write_edits(str(target), content, {(start, start + 10): b"2024.12.15.1"})
+
+    assert target.read_bytes() == prefix + b'version="2024.12.15.1"' + suffix
+
+
+def test_write_edits_falls_back_when_kernel_copy_fails(tmp_path, monkeypatch):
+    target = tmp_path / "version.txt"
+    target.write_bytes(b"v1 end")
+
+    def failing_copy(*args):
+        raise OSError("copy_file_range not supported")
+
+    monkeypatch.setattr(os, "copy_file_range", failing_copy, raising=False)
+    write_edits(str(target), b"v1 end", {(0, 2): b"v10"})
+
+    assert target.read_bytes() == b"v10 end"
+
+
+def test_write_edits_without_edits_leaves_file_untouched(tmp_path):
+    target = tmp_path / "version.py"
+    target.write_bytes(b"x")
+    os.utime(target, (0, 0))
+
+    write_edits(str(target), b"x", {})
+
+    assert target.stat().st_mtime == 0
+
+
+def test_write_edits_skips_identical_replacements(tmp_path):
+    target = tmp_path / "version.py"
+    content = b'__version__ = "2024.12.14"\nOTHER = "2024.12.14"\n'
+    target.write_bytes(content)
+    os.utime(target, (0, 0))
+
+    assert write_edits(str(target), content, {(15, 25): b"2024.12.14"}) is False
+    assert target.stat().st_mtime == 0
+
+    # Only the spans that differ are written
+    assert write_edits(
+        str(target), content, {(15, 25): b"2024.12.14", (36, 46): b"2024.12.15.1"}
+    )
+    assert target.read_bytes() == content.replace(
+        b'OTHER = "2024.12.14"', b'OTHER = "2024.12.15.1"'
+    )
+
+
+def test_file_transaction_commits_files_together(tmp_path):
+    first = tmp_path / "version.py"
+    first.write_bytes(b'__version__ = "2024.12.14"\n')
+    second = tmp_path / "package.json"
+    second.write_bytes(b'{"version": "2024.12.14"}\n')
+    journal = tmp_path / ".bumpcalver" / "journal.json"
+
+    transaction = FileTransaction()
+    with transaction.activate():
+        assert write_edits(str(first), first.read_bytes(), {(15, 25): b"2024.12.15.1"})
+        write_content(str(second), b'{"version": "2024.12.15.1"}\n')
+        # Reads within the run see the new content
+        assert read_file(str(second)) == b'{"version": "2024.12.15.1"}\n'
+
+    # Nothing is touched, or even staged, before the commit
+    assert first.read_bytes() == b'__version__ = "2024.12.14"\n'
+    assert read_file(str(second)) == b'{"version": "2024.12.14"}\n'
+    assert sorted(os.listdir(tmp_path)) == ["package.json", "version.py"]
+
+    transaction.commit(str(journal))
+
+    assert first.read_bytes() == b'__version__ = "2024.12.15.1"\n'
+    assert second.read_bytes() == b'{"version": "2024.12.15.1"}\n'
+    assert sorted(os.listdir(tmp_path)) == ["package.json", "version.py"]
+
+
+def test_file_transaction_reads_and_parses_each_file_once(tmp_path, monkeypatch):
+    import builtins
+
+    target = tmp_path / "version.py"
+    target.write_bytes(b'__version__ = "2024.12.14"\n')
+    opened = []
+    real_open = builtins.open
+
+    def counting_open(file, *args, **kwargs):
+        opened.append(file)
+        return real_open(file, *args, **kwargs)
+
+    parses = []
+
+    def parse(content):
+        parses.append(content)
+        return content.index(b'"')
+
+    with FileTransaction():
+        monkeypatch.setattr(builtins, "open", counting_open)
+        content = read_file(str(target))
+        assert read_file(str(target)) is content
+        assert parse_cached(str(target), content, "quote", parse) == 14
+        assert parse_cached(str(target), content, "quote", parse) == 14
+        write_edits(str(target), content, {(15, 25): b"2024.12.15"})
+        edited = read_file(str(target))
+        assert parse_cached(str(target), edited, "quote", parse) == 14
+        monkeypatch.setattr(builtins, "open", real_open)
+
+    assert opened == [str(target)]
+    assert parses == [content, edited]
+    assert target.read_bytes() == b'__version__ = "2024.12.15"\n'
+
+
+def test_file_transaction_stages_span_edits_by_copying(tmp_path, monkeypatch):
+    from src.bumpcalver import file_utils
+
+    target = tmp_path / "version.py"
+    target.write_bytes(b'# a\n__version__ = "2024.12.14"\nVERSION = "2024.12.14"\n')
+
+    def no_buffer_staging(*args):
+        raise AssertionError("span edits should not be staged from the buffer")
+
+    monkeypatch.setattr(file_utils, "_stage_content", no_buffer_staging)
+    with FileTransaction():
+        content = read_file(str(target))
+        write_edits(str(target), content, {(19, 29): b"2024.12.15.1"})
+        # Spans of the edited content, composed with the earlier edit
+        content = read_file(str(target))
+        write_edits(str(target), content, {(44, 54): b"2024.12.15.1", (0, 3): b""})
+
+    assert target.read_bytes() == (
+        b'\n__version__ = "2024.12.15.1"\nVERSION = "2024.12.15.1"\n'
+    )
+
+
+def test_file_transaction_stages_overlapping_edits_from_buffer(tmp_path):
+    target = tmp_path / "version.py"
+    target.write_bytes(b'__version__ = "2024.12.14"\n')
+
+    with FileTransaction() as transaction:
+        content = read_file(str(target))
+        write_edits(str(target), content, {(15, 25): b"2024.12.15.1"})
+        content = read_file(str(target))
+        write_edits(str(target), content, {(15, 27): b"2025.1.1"})
+        assert transaction._edits[str(target)] is None
+
+    assert target.read_bytes() == b'__version__ = "2025.1.1"\n'
+
+
+def test_file_transaction_discards_on_error(tmp_path):
+    target = tmp_path / "version.py"
+    target.write_bytes(b'__version__ = "2024.12.14"\n')
+
+    with pytest.raises(RuntimeError):
+        with FileTransaction():
+            write_content(str(target), b'__version__ = "2024.12.15"\n')
+            raise RuntimeError("handler failed")
+
+    assert target.read_bytes() == b'__version__ = "2024.12.14"\n'
+    assert os.listdir(tmp_path) == ["version.py"]
+
+
+def test_file_transaction_discard_leaves_files_untouched(tmp_path):
+    target = tmp_path / "version.py"
+    target.write_bytes(b'__version__ = "2024.12.14"\n')
+
+    transaction = FileTransaction()
+    with transaction.activate():
+        write_content(str(target), b'__version__ = "2024.12.15"\n')
+    transaction.discard()
+    transaction.commit(str(tmp_path / "journal.json"))
+
+    assert target.read_bytes() == b'__version__ = "2024.12.14"\n'
+    assert os.listdir(tmp_path) == ["version.py"]
+
+
+def test_file_transaction_overwrites_hardlinked_files_in_place(tmp_path):
+    target = tmp_path / "version.py"
+    target.write_bytes(b'__version__ = "2024.12.14"\n')
+    link = tmp_path / "link.py"
+    os.link(target, link)
+
+    transaction = FileTransaction()
+    with transaction.activate():
+        write_content(str(target), b'__version__ = "2024.12.15"\n')
+    transaction.commit(str(tmp_path / "journal.json"))
+
+    assert link.read_bytes() == b'__version__ = "2024.12.15"\n'
+    assert sorted(os.listdir(tmp_path)) == ["link.py", "version.py"]
+
+
+@pytest.mark.parametrize("roll_back", [False, True])
+def test_recover_transaction(tmp_path, monkeypatch, roll_back):
+    from src.bumpcalver import file_utils
+
+    paths = [tmp_path / "a.txt", tmp_path / "b.txt"]
+    for path in paths:
+        path.write_bytes(b"old")
+    journal = tmp_path / "journal.json"
+
+    transaction = FileTransaction()
+    with transaction.activate():
+        for path in paths:
+            write_content(str(path), b"new")
+
+    applied = []
+    real_apply_entry = file_utils._apply_entry
+
+    def crash_after_first_file(entry):
+        if applied:
+            raise KeyboardInterrupt
+        applied.append(entry)
+        real_apply_entry(entry)
+
+    monkeypatch.setattr(file_utils, "_apply_entry", crash_after_first_file)
+    with pytest.raises(KeyboardInterrupt):
+        transaction.commit(str(journal))
+    monkeypatch.setattr(file_utils, "_apply_entry", real_apply_entry)
+    assert [path.read_bytes() for path in paths] == [b"new", b"old"]
+
+    recovered = recover_transaction(str(journal), roll_back=roll_back)
+
+    assert recovered == [str(path) for path in paths]
+    expected = b"old" if roll_back else b"new"
+    assert [path.read_bytes() for path in paths] == [expected, expected]
+    assert sorted(os.listdir(tmp_path)) == ["a.txt", "b.txt"]
+    assert recover_transaction(str(journal)) == []
+
+
+@pytest.mark.parametrize("roll_back", [False, True])
+def test_recover_transaction_with_patched_files(tmp_path, monkeypatch, roll_back):
+    from src.bumpcalver import file_utils
+
+    paths = [tmp_path / "a.txt", tmp_path / "b.txt"]
+    for path in paths:
+        path.write_bytes(b"v=2024.12.14")
+    inodes = [path.stat().st_ino for path in paths]
+    journal = tmp_path / "journal.json"
+
+    transaction = FileTransaction()
+    with transaction.activate():
+        for path in paths:
+            write_edits(str(path), path.read_bytes(), {(2, 12): b"2024.12.15"})
+    assert transaction.staged == {}
+
+    applied = []
+    real_apply_entry = file_utils._apply_entry
+
+    def crash_after_first_file(entry):
+        if applied:
+            raise KeyboardInterrupt
+        applied.append(entry)
+        real_apply_entry(entry)
+
+    monkeypatch.setattr(file_utils, "_apply_entry", crash_after_first_file)
+    with pytest.raises(KeyboardInterrupt):
+        transaction.commit(str(journal))
+    monkeypatch.setattr(file_utils, "_apply_entry", real_apply_entry)
+    assert [path.read_bytes() for path in paths] == [b"v=2024.12.15", b"v=2024.12.14"]
+
+    assert recover_transaction(str(journal), roll_back=roll_back) == [
+        str(path) for path in paths
+    ]
+
+    expected = b"v=2024.12.14" if roll_back else b"v=2024.12.15"
+    assert [path.read_bytes() for path in paths] == [expected, expected]
+    assert [path.stat().st_ino for path in paths] == inodes
+    assert sorted(os.listdir(tmp_path)) == ["a.txt", "b.txt"]
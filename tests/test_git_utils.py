@@ -4,7 +4,7 @@ import subprocess
 from unittest import mock
 
 import pytest
-from src.bumpcalver.git_utils import create_git_tag
+from src.bumpcalver.git_utils import create_git_tag, get_git_branch, get_git_sha
 
 
 def test_create_git_tag_tag_exists(monkeypatch, capsys):
@@ -192,3 +192,29 @@ def test_create_git_tag_unexpected_exception(monkeypatch):
 
     with pytest.raises(Exception, match="Unexpected error"):
         create_git_tag("v1.0.0", [], False)
+
+
+def test_get_git_sha_and_branch(monkeypatch):
+    """Test that the Git fields of version formats are read from git rev-parse."""
+
+    def mock_run(cmd, capture_output=False, text=False, check=False):
+        mock_result = mock.Mock()
+        mock_result.stdout = "main\n" if "--abbrev-ref" in cmd else "1a2b3c4\n"
+        return mock_result
+
+    monkeypatch.setattr(subprocess, "run", mock_run)
+
+    assert get_git_sha() == "1a2b3c4"
+    assert get_git_branch() == "main"
+
+
+def test_get_git_sha_error(monkeypatch):
+    """Test that a failing git command is reported as a ValueError."""
+
+    def mock_run(cmd, capture_output=False, text=False, check=False):
+        raise subprocess.CalledProcessError(128, cmd)
+
+    monkeypatch.setattr(subprocess, "run", mock_run)
+
+    with pytest.raises(ValueError, match="Error running git rev-parse"):
+        get_git_sha()
@@ -1,5 +1,7 @@
 # tests/test_handlers.py
+import io
 import json
+import os
 import xml.etree.ElementTree as ET
 from unittest import mock
 
@@ -7,21 +9,31 @@ import pytest
 import toml
 import yaml
 from src.bumpcalver.handlers import (
+    FAILED,
+    UNCHANGED,
+    UPDATED,
     DockerfileVersionHandler,
     JsonVersionHandler,
     MakefileVersionHandler,
     PythonVersionHandler,
     TomlVersionHandler,
+    UpdatedFiles,
+    VersionHandler,
+    VersionUpdate,
     XmlVersionHandler,
     YamlVersionHandler,
+    clear_pattern_cache,
+    complete_interrupted_update,
     get_version_handler,
+    pattern_cache_info,
+    register_handler,
     update_version_in_files,
 )
 
 
 def test_python_handler_read_version(monkeypatch):
     handler = PythonVersionHandler()
-    file_content = """
+    file_content = b"""
 __version__ = "2023-10-10"
 """
     mock_open = mock.mock_open(read_data=file_content)
@@ -31,27 +43,26 @@ __version__ = "2023-10-10"
     assert version == "2023-10-10"
 
 
-def test_python_handler_update_version(monkeypatch):
+def test_python_handler_update_version(tmp_path):
     handler = PythonVersionHandler()
     file_content = """
 __version__ = "2023-10-10"
 """
-    # Expected content after update
-    mock_open = mock.mock_open(read_data=file_content)
-    monkeypatch.setattr("builtins.open", mock_open)
+    version_file = tmp_path / "dummy_file.py"
+    version_file.write_text(file_content)
+    inode = version_file.stat().st_ino
 
-    result = handler.update_version("dummy_file.py", "__version__", "2023-10-11")
+    result = handler.update_version(str(version_file), "__version__", "2023-10-11")
     assert result is True
 
-    handle = mock_open()
-    handle.write.assert_called_once()
-    written_content = handle.write.call_args[0][0]
-    assert '__version__ = "2023-10-11"' in written_content
+    assert version_file.read_text() == '\n__version__ = "2023-10-11"\n'
+    # Same-length versions are patched in place
+    assert version_file.stat().st_ino == inode
 
 
 def test_python_handler_update_version_exception(monkeypatch, capsys):
     handler = PythonVersionHandler()
-    file_content = '__version__ = "2023-10-10"'
+    file_content = b'__version__ = "2023-10-10"'
 
     # Create a mock for 'open' that raises an exception when writing
     mock_open = mock.mock_open(read_data=file_content)
@@ -71,44 +82,43 @@ def test_python_handler_update_version_exception(monkeypatch, capsys):
     )
 
 
-def test_toml_handler_read_version(monkeypatch):
+def test_toml_handler_read_version(tmp_path):
     handler = TomlVersionHandler()
-    toml_content = """
+    toml_file = tmp_path / "pyproject.toml"
+    toml_file.write_text(
+        """
 [tool.poetry]
 version = "2023-10-10"
-"""
-    mock_open = mock.mock_open(read_data=toml_content)
-    monkeypatch.setattr("builtins.open", mock_open)
-    monkeypatch.setattr(
-        toml, "load", lambda f: {"tool": {"poetry": {"version": "2023-10-10"}}}
+""",
+        encoding="utf-8",
     )
 
-    version = handler.read_version("pyproject.toml", "tool.poetry.version")
+    version = handler.read_version(str(toml_file), "tool.poetry.version")
     assert version == "2023-10-10"
 
 
-def test_toml_handler_update_version(monkeypatch):
+def test_toml_handler_update_version(tmp_path, monkeypatch):
     handler = TomlVersionHandler()
-    toml_content = """
+    toml_content = """# Project metadata
 [tool.poetry]
-version = "2023-10-10"
+name = "example"   # keep me
+version = "2023-10-10"  # bumped by bumpcalver
+
+[tool.other]
+list = [ 1, 2,]
 """
-    mock_open = mock.mock_open(read_data=toml_content)
-    monkeypatch.setattr("builtins.open", mock_open)
-    toml_data = {"tool": {"poetry": {"version": "2023-10-10"}}}
-    monkeypatch.setattr(toml, "load", lambda f: toml_data)
+    toml_file = tmp_path / "pyproject.toml"
+    toml_file.write_bytes(toml_content.encode("utf-8"))
     dump_mock = mock.Mock()
-    monkeypatch.setattr(toml, "dump", dump_mock)
+    monkeypatch.setattr(toml, "dumps", dump_mock)
 
-    result = handler.update_version(
-        "pyproject.toml", "tool.poetry.version", "2023-10-11"
-    )
+    result = handler.update_version(str(toml_file), "tool.poetry.version", "2023-10-11")
     assert result is True
 
-    expected_data = {"tool": {"poetry": {"version": "2023-10-11"}}}
-    dump_mock.assert_called_once()
-    args, kwargs = dump_mock.call_args
-    assert args[0] == expected_data
+    dump_mock.assert_not_called()
+    assert toml_file.read_bytes() == toml_content.replace(
+        "2023-10-10", "2023-10-11"
+    ).encode("utf-8")
 
 
 def test_yaml_handler_read_version(monkeypatch):
@@ -116,7 +126,7 @@ def test_yaml_handler_read_version(monkeypatch):
     yaml_content = """
 version: "2023-10-10"
 """
-    mock_open = mock.mock_open(read_data=yaml_content)
+    mock_open = mock.mock_open(read_data=yaml_content.encode("utf-8"))
     monkeypatch.setattr("builtins.open", mock_open)
     monkeypatch.setattr(yaml, "safe_load", lambda f: {"version": "2023-10-10"})
 
@@ -124,23 +134,65 @@ version: "2023-10-10"
     assert version == "2023-10-10"
 
 
-def test_yaml_handler_update_version(monkeypatch):
+def test_yaml_handler_update_version(tmp_path, monkeypatch):
     handler = YamlVersionHandler()
-    yaml_content = """
-version: "2023-10-10"
+    yaml_content = """# Helm chart values
+image:
+  repository: example/app   # registry path
+  tag: "2023-10-10"
+configuration:
+  version: 2023-10-10-001
+  pinned: &pinned '2023-10-10'
 """
-    mock_open = mock.mock_open(read_data=yaml_content)
-    monkeypatch.setattr("builtins.open", mock_open)
-    yaml_data = {"version": "2023-10-10"}
-    monkeypatch.setattr(yaml, "safe_load", lambda f: yaml_data)
+    yaml_file = tmp_path / "values.yaml"
+    yaml_file.write_bytes(yaml_content.encode("utf-8"))
     dump_mock = mock.Mock()
     monkeypatch.setattr(yaml, "safe_dump", dump_mock)
 
-    result = handler.update_version("config.yaml", "version", "2023-10-11")
-    assert result is True
+    results = handler.update_versions(
+        str(yaml_file),
+        "2023-10-11",
+        [
+            {"variable": "image.tag"},
+            {"variable": "configuration.version"},
+            {"variable": "configuration.pinned"},
+        ],
+    )
+    assert results == [UPDATED, UPDATED, UPDATED]
+
+    dump_mock.assert_not_called()
+    assert yaml_file.read_bytes() == (
+        yaml_content.replace('"2023-10-10"', '"2023-10-11"')
+        .replace("'2023-10-10'", "'2023-10-11'")
+        # A plain date would load as datetime.date, so it gets quoted
+        .replace("2023-10-10-001", "'2023-10-11'")
+        .encode("utf-8")
+    )
+    assert handler.read_version(str(yaml_file), "image.tag") == "2023-10-11"
+
+
+def test_yaml_handler_update_version_quotes_ambiguous_plain_scalar(tmp_path):
+    handler = YamlVersionHandler()
+    yaml_file = tmp_path / "config.yaml"
+    yaml_file.write_text("version: 2023.10.10\n", encoding="utf-8")
+
+    assert handler.update_version(str(yaml_file), "version", "2023.10") is True
+    assert yaml_file.read_text(encoding="utf-8") == "version: '2023.10'\n"
+    assert yaml.safe_load(yaml_file.read_text(encoding="utf-8")) == {
+        "version": "2023.10"
+    }
+
+
+def test_yaml_handler_update_version_creates_missing_path(tmp_path):
+    handler = YamlVersionHandler()
+    yaml_file = tmp_path / "config.yaml"
+    yaml_file.write_text("name: example\n", encoding="utf-8")
 
-    expected_data = {"version": "2023-10-11"}
-    dump_mock.assert_called_once_with(expected_data, mock.ANY)
+    assert handler.update_version(str(yaml_file), "app.version", "2023-10-11")
+    assert yaml.safe_load(yaml_file.read_text(encoding="utf-8")) == {
+        "name": "example",
+        "app": {"version": "2023-10-11"},
+    }
 
 
 def test_yaml_handler_read_version_exception(monkeypatch, capsys):
@@ -167,7 +219,7 @@ def test_yaml_handler_update_version_exception(monkeypatch, capsys):
         raise yaml.YAMLError("Malformed YAML")
 
     monkeypatch.setattr("yaml.safe_load", mock_yaml_load)
-    mock_open = mock.mock_open()
+    mock_open = mock.mock_open(read_data=b"")
     monkeypatch.setattr("builtins.open", mock_open)
 
     result = handler.update_version("config.yaml", "version", "2023-10-11")
@@ -177,143 +229,222 @@ def test_yaml_handler_update_version_exception(monkeypatch, capsys):
     assert "Error updating config.yaml: Malformed YAML" in captured.out
 
 
-def test_json_handler_read_version(monkeypatch):
+def test_json_handler_read_version(tmp_path):
     handler = JsonVersionHandler()
-    json_content = """
-{
-    "version": "2023-10-10"
-}
-"""
-    mock_open = mock.mock_open(read_data=json_content)
-    monkeypatch.setattr("builtins.open", mock_open)
-    monkeypatch.setattr(json, "load", lambda f: {"version": "2023-10-10"})
+    json_file = tmp_path / "package.json"
+    json_file.write_text('{\n    "name": "pkg",\n    "version": "2023-10-10"\n}\n')
 
-    version = handler.read_version("package.json", "version")
+    version = handler.read_version(str(json_file), "version")
     assert version == "2023-10-10"
 
 
-def test_json_handler_update_version(monkeypatch):
+def test_json_handler_read_version_nested(tmp_path):
     handler = JsonVersionHandler()
-    json_content = """
-{
-    "version": "2023-10-10"
-}
-"""
-    mock_open = mock.mock_open(read_data=json_content)
-    monkeypatch.setattr("builtins.open", mock_open)
-    json_data = {"version": "2023-10-10"}
-    monkeypatch.setattr(json, "load", lambda f: json_data)
+    json_file = tmp_path / "package-lock.json"
+    json_file.write_text(
+        '{"version": "1", "packages": {"": {"version": "2023-10-10"}}}'
+    )
+
+    version = handler.read_version(str(json_file), "packages..version")
+    assert version == "2023-10-10"
+
+
+def test_json_handler_read_version_not_found(tmp_path, capsys):
+    handler = JsonVersionHandler()
+    json_file = tmp_path / "package.json"
+    json_file.write_text('{"name": "pkg"}')
+
+    version = handler.read_version(str(json_file), "version")
+    assert version is None
+
+    captured = capsys.readouterr()
+    assert f"Variable 'version' not found in {json_file}" in captured.out
+
+
+def test_json_handler_update_version(tmp_path, monkeypatch):
+    handler = JsonVersionHandler()
+    json_file = tmp_path / "package.json"
+    json_content = (
+        '{\r\n    "name": "pkg",\r\n    "version": "2023-10-10",\r\n'
+        '    "tags": ["a", {"version": "keep"}]\r\n}'
+    )
+    json_file.write_bytes(json_content.encode("utf-8"))
     dump_mock = mock.Mock()
     monkeypatch.setattr(json, "dump", dump_mock)
 
-    result = handler.update_version("package.json", "version", "2023-10-11")
+    result = handler.update_version(str(json_file), "version", "2023-10-11")
     assert result is True
 
-    expected_data = {"version": "2023-10-11"}
-    dump_mock.assert_called_once_with(expected_data, mock.ANY, indent=2)
+    assert json_file.read_bytes() == json_content.replace(
+        "2023-10-10", "2023-10-11"
+    ).encode("utf-8")
+    dump_mock.assert_not_called()
 
 
-def test_json_handler_read_version_exception(monkeypatch, capsys):
+def test_json_handler_update_versions_nested_paths(tmp_path):
     handler = JsonVersionHandler()
+    json_file = tmp_path / "package-lock.json"
+    json_content = (
+        '{"name": "pkg", "version": "2023-10-10", "lockfileVersion": 3,\n'
+        ' "packages": {"": {"name": "pkg", "version": "2023-10-10"}}}\n'
+    )
+    json_file.write_text(json_content)
 
-    # Simulate an exception during json.load
-    def mock_json_load(f):
-        raise json.JSONDecodeError("Malformed JSON", "", 0)
+    results = handler.update_versions(
+        str(json_file),
+        "2023-10-11",
+        [{"variable": "version"}, {"variable": "packages..version"}],
+    )
+    assert results == [UPDATED, UPDATED]
+    assert json_file.read_text() == json_content.replace("2023-10-10", "2023-10-11")
 
-    monkeypatch.setattr("json.load", mock_json_load)
-    mock_open = mock.mock_open()
-    monkeypatch.setattr("builtins.open", mock_open)
+
+def test_json_handler_update_version_creates_missing_path(tmp_path):
+    handler = JsonVersionHandler()
+    json_file = tmp_path / "package.json"
+    json_file.write_text('{"name": "pkg"}')
+
+    result = handler.update_version(str(json_file), "meta.version", "2023-10-11")
+    assert result is True
+
+    assert json.loads(json_file.read_text()) == {
+        "name": "pkg",
+        "meta": {"version": "2023-10-11"},
+    }
+
+
+def test_json_handler_read_version_exception(tmp_path, monkeypatch, capsys):
+    handler = JsonVersionHandler()
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "package.json").write_text('{"name" "pkg", "version": "1"}')
 
     version = handler.read_version("package.json", "version")
     assert version is None
 
     captured = capsys.readouterr()
-    assert "Error reading version from package.json: Malformed JSON" in captured.out
+    assert (
+        "Error reading version from package.json: Expecting ':' delimiter"
+        in captured.out
+    )
 
 
-def test_json_handler_update_version_exception(monkeypatch, capsys):
+def test_json_handler_update_version_exception(tmp_path, monkeypatch, capsys):
     handler = JsonVersionHandler()
-
-    # Simulate an exception during json.load
-    def mock_json_load(f):
-        raise json.JSONDecodeError("Malformed JSON", "", 0)
-
-    monkeypatch.setattr("json.load", mock_json_load)
-    mock_open = mock.mock_open()
-    monkeypatch.setattr("builtins.open", mock_open)
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "package.json").write_text('{"name": "pkg" "version": "1"}')
 
     result = handler.update_version("package.json", "version", "2023-10-11")
     assert result is False
 
     captured = capsys.readouterr()
-    assert "Error updating package.json: Malformed JSON" in captured.out
+    assert "Error updating package.json: Expecting ',' delimiter" in captured.out
+
+
+POM_NS = "http://maven.apache.org/POM/4.0.0"
+POM_XML = f"""<?xml version="1.0" encoding="UTF-8"?>
+<!-- Aggregate POM -->
+<project xmlns="{POM_NS}" xmlns:b="urn:build">\r
+  <parent>\r
+    <version>1.0.0</version>\r
+  </parent>\r
+  <version>2023-10-10</version>\r
+  <b:build><b:id>a &amp; b</b:id></b:build>\r
+</project>\r
+"""
 
 
-def test_xml_handler_read_version(monkeypatch):
+def test_xml_handler_read_version(tmp_path, monkeypatch):
     handler = XmlVersionHandler()
-    mock_tree = mock.Mock()
-    mock_root = mock.Mock()
-    mock_element = mock.Mock()
-    mock_element.text = "2023-10-10"
-    mock_root.find.return_value = mock_element
-    mock_tree.getroot.return_value = mock_root
-    monkeypatch.setattr(ET, "parse", lambda f: mock_tree)
+    xml_file = tmp_path / "pom.xml"
+    xml_file.write_text(POM_XML)
+    parse_mock = mock.Mock()
+    monkeypatch.setattr(ET, "parse", parse_mock)
 
-    version = handler.read_version("config.xml", "version")
-    assert version == "2023-10-10"
+    assert handler.read_version(str(xml_file), "version") == "2023-10-10"
+    assert handler.read_version(str(xml_file), f"{{{POM_NS}}}version") == "2023-10-10"
+    assert handler.read_version(str(xml_file), "parent/version") == "1.0.0"
+    assert handler.read_version(str(xml_file), "b:build/b:id") == "a & b"
+    parse_mock.assert_not_called()
 
 
-def test_xml_handler_update_version(monkeypatch):
+def test_xml_handler_read_version_falls_back_to_element_tree(tmp_path):
     handler = XmlVersionHandler()
-    mock_tree = mock.Mock()
-    mock_root = mock.Mock()
-    mock_element = mock.Mock()
-    mock_root.find.return_value = mock_element
-    mock_tree.getroot.return_value = mock_root
-    monkeypatch.setattr(ET, "parse", lambda f: mock_tree)
+    xml_file = tmp_path / "config.xml"
+    xml_file.write_text(
+        "<configuration><a><version>2023-10-10</version></a></configuration>"
+    )
 
-    result = handler.update_version("config.xml", "version", "2023-10-11")
-    assert result is True
+    version = handler.read_version(str(xml_file), ".//version")
+    assert version == "2023-10-10"
+
+
+def test_xml_handler_update_version(tmp_path, monkeypatch):
+    handler = XmlVersionHandler()
+    xml_file = tmp_path / "pom.xml"
+    xml_file.write_bytes(POM_XML.encode("utf-8"))
+    parse_mock = mock.Mock()
+    monkeypatch.setattr(ET, "parse", parse_mock)
+
+    results = handler.update_versions(
+        str(xml_file),
+        "2023-10-11",
+        [{"variable": "version"}, {"variable": "b:build/b:id"}],
+    )
+    assert results == [UPDATED, UPDATED]
 
-    assert mock_element.text == "2023-10-11"
-    mock_tree.write.assert_called_once_with("config.xml")
+    expected = POM_XML.replace(
+        "<version>2023-10-10</version>", "<version>2023-10-11</version>"
+    ).replace("<b:id>a &amp; b</b:id>", "<b:id>2023-10-11</b:id>")
+    assert xml_file.read_bytes() == expected.encode("utf-8")
+    parse_mock.assert_not_called()
 
 
-def test_xml_handler_read_version_exception(monkeypatch, capsys):
+def test_xml_handler_update_version_falls_back_to_element_tree(tmp_path):
     handler = XmlVersionHandler()
+    xml_file = tmp_path / "config.xml"
+    xml_file.write_text(
+        "<configuration><version/><build><id>1</id></build></configuration>"
+    )
+
+    results = handler.update_versions(
+        str(xml_file),
+        "2023-10-11",
+        [{"variable": "version"}, {"variable": "build/id"}],
+    )
+    assert results == [UPDATED, UPDATED]
+
+    root = ET.parse(str(xml_file)).getroot()
+    assert root.find("version").text == "2023-10-11"
+    assert root.find("build/id").text == "2023-10-11"
 
-    # Simulate an exception during ET.parse
-    def mock_et_parse(file):
-        raise ET.ParseError("Malformed XML")
 
-    monkeypatch.setattr("xml.etree.ElementTree.parse", mock_et_parse)
+def test_xml_handler_read_version_exception(tmp_path, monkeypatch, capsys):
+    handler = XmlVersionHandler()
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "config.xml").write_text("<configuration><version></configuration>")
 
     version = handler.read_version("config.xml", "version")
     assert version is None
 
     captured = capsys.readouterr()
-    assert "Error reading version from config.xml: Malformed XML" in captured.out
+    assert "Error reading version from config.xml: mismatched tag" in captured.out
 
 
-def test_xml_handler_update_version_exception(monkeypatch, capsys):
+def test_xml_handler_update_version_exception(tmp_path, monkeypatch, capsys):
     handler = XmlVersionHandler()
-
-    # Simulate an exception during ET.parse
-    def mock_et_parse(file):
-        raise ET.ParseError("Malformed XML")
-
-    monkeypatch.setattr("xml.etree.ElementTree.parse", mock_et_parse)
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "config.xml").write_text("<configuration><version></configuration>")
 
     result = handler.update_version("config.xml", "version", "2023-10-11")
     assert result is False
 
     captured = capsys.readouterr()
-    assert "Error updating config.xml: Malformed XML" in captured.out
+    assert "Error updating config.xml: mismatched tag" in captured.out
 
 
 def test_dockerfile_handler_read_version(monkeypatch):
     handler = DockerfileVersionHandler()
-    dockerfile_content = """
+    dockerfile_content = b"""
 FROM python:3.8
 ARG VERSION=2023-10-10
 """
@@ -324,24 +455,23 @@ ARG VERSION=2023-10-10
     assert version == "2023-10-10"
 
 
-def test_dockerfile_handler_update_version(monkeypatch):
+def test_dockerfile_handler_update_version(tmp_path):
     handler = DockerfileVersionHandler()
     dockerfile_content = """
-FROM python:3.8
-ARG VERSION=2023-10-10
+FROM python:3.8\r
+ARG VERSION=2023-10-10 \r
 """
-    mock_open = mock.mock_open(read_data=dockerfile_content)
-    monkeypatch.setattr("builtins.open", mock_open)
+    dockerfile = tmp_path / "Dockerfile"
+    dockerfile.write_bytes(dockerfile_content.encode("utf-8"))
 
     result = handler.update_version(
-        "Dockerfile", "VERSION", "2023-10-11", directive="ARG"
+        str(dockerfile), "VERSION", "2023-10-11.1", directive="ARG"
     )
     assert result is True
 
-    handle = mock_open()
-    handle.write.assert_called_once()
-    written_content = handle.write.call_args[0][0]
-    assert "ARG VERSION=2023-10-11" in written_content
+    assert dockerfile.read_bytes() == dockerfile_content.replace(
+        "2023-10-10", "2023-10-11.1"
+    ).encode("utf-8")
 
 
 def test_dockerfile_handler_update_version_invalid_directive(capsys):
@@ -411,28 +541,28 @@ def test_makefile_handler_read_version(monkeypatch):
     makefile_content = """
 VERSION = 2023-10-10
 """
-    mock_open = mock.mock_open(read_data=makefile_content)
+    mock_open = mock.mock_open(read_data=makefile_content.encode("utf-8"))
     monkeypatch.setattr("builtins.open", mock_open)
 
     version = handler.read_version("Makefile", "VERSION")
     assert version == "2023-10-10"
 
 
-def test_makefile_handler_update_version(monkeypatch):
+def test_makefile_handler_update_version(tmp_path):
     handler = MakefileVersionHandler()
     makefile_content = """
-VERSION = 2023-10-10
+VERSION = 2023-10-10\r
+OTHER := 1\r
 """
-    mock_open = mock.mock_open(read_data=makefile_content)
-    monkeypatch.setattr("builtins.open", mock_open)
+    makefile = tmp_path / "Makefile"
+    makefile.write_bytes(makefile_content.encode("utf-8"))
 
-    result = handler.update_version("Makefile", "VERSION", "2023-10-11")
+    result = handler.update_version(str(makefile), "VERSION", "2023-10-11")
     assert result is True
 
-    handle = mock_open()
-    handle.write.assert_called_once()
-    written_content = handle.write.call_args[0][0]
-    assert "VERSION = 2023-10-11" in written_content
+    assert makefile.read_bytes() == makefile_content.replace(
+        "2023-10-10", "2023-10-11"
+    ).encode("utf-8")
 
 
 def test_makefile_handler_read_version_exception(monkeypatch, capsys):
@@ -475,6 +605,72 @@ def test_get_version_handler():
         get_version_handler("unsupported")
 
 
+def test_get_version_handler_returns_singletons():
+    assert get_version_handler("yaml") is get_version_handler("yaml")
+    assert get_version_handler("json") is not get_version_handler("xml")
+
+
+class GradleVersionHandler(MakefileVersionHandler):
+    pass
+
+
+@pytest.fixture
+def handler_registry(monkeypatch):
+    from src.bumpcalver import handlers
+
+    monkeypatch.setattr(handlers, "_HANDLER_REGISTRY", dict(handlers._HANDLER_REGISTRY))
+    monkeypatch.setattr(handlers, "_HANDLER_INSTANCES", {})
+
+
+@pytest.mark.parametrize(
+    "provider",
+    [
+        GradleVersionHandler,
+        GradleVersionHandler(),
+        "tests.test_handlers:GradleVersionHandler",
+    ],
+)
+def test_register_handler(handler_registry, provider):
+    register_handler("gradle", provider)
+
+    handler = get_version_handler("gradle")
+    assert isinstance(handler, GradleVersionHandler)
+    assert get_version_handler("gradle") is handler
+
+    register_handler("gradle", PythonVersionHandler)
+    assert isinstance(get_version_handler("gradle"), PythonVersionHandler)
+
+
+def test_register_handler_rejects_non_handlers(handler_registry):
+    register_handler("gradle", object)
+
+    with pytest.raises(TypeError):
+        get_version_handler("gradle")
+
+
+def test_get_version_handler_discovers_entry_points(handler_registry, monkeypatch):
+    loaded = []
+
+    class FakeEntryPoints:
+        def select(self, group, name):
+            assert group == "bumpcalver.handlers"
+            entry_point = mock.Mock()
+            entry_point.load.side_effect = lambda: loaded.append(name) or (
+                GradleVersionHandler
+            )
+            return [entry_point] if name == "gradle" else []
+
+    monkeypatch.setattr("importlib.metadata.entry_points", lambda: FakeEntryPoints())
+
+    assert isinstance(get_version_handler("python"), PythonVersionHandler)
+    assert loaded == []
+    assert isinstance(get_version_handler("gradle"), GradleVersionHandler)
+    assert get_version_handler("gradle") is get_version_handler("gradle")
+    assert loaded == ["gradle"]
+    with pytest.raises(ValueError, match="Unsupported file type: unknown"):
+        get_version_handler("unknown")
+
+
 def test_python_handler_read_version_exception(monkeypatch, capsys):
     handler = PythonVersionHandler()
 
@@ -496,7 +692,7 @@ def test_python_handler_read_version_exception(monkeypatch, capsys):
 
 def test_python_handler_update_version_variable_not_found(monkeypatch, capsys):
     handler = PythonVersionHandler()
-    file_content = """
+    file_content = b"""
 __not_version__ = "2023-10-10"
 """
     mock_open = mock.mock_open(read_data=file_content)
@@ -509,20 +705,20 @@ __not_version__ = "2023-10-10"
     assert "Variable '__version__' not found in dummy_file.py" in captured.out
 
 
-def test_toml_handler_read_version_malformed_toml(monkeypatch, capsys):
+def test_toml_handler_read_version_malformed_toml(tmp_path, monkeypatch, capsys):
     from src.bumpcalver import handlers
 
     handler = handlers.TomlVersionHandler()
 
     # Simulate malformed TOML content
-    def mock_toml_load(f):
+    def mock_toml_loads(s):
         raise handlers.toml.TomlDecodeError("Malformed TOML", "", 0)
 
-    # Monkeypatch the 'toml.load' function in the handlers module
-    monkeypatch.setattr(handlers.toml, "load", mock_toml_load)
+    # Monkeypatch the 'toml.loads' function in the handlers module
+    monkeypatch.setattr(handlers.toml, "loads", mock_toml_loads)
 
-    mock_open = mock.mock_open()
-    monkeypatch.setattr("builtins.open", mock_open)
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "pyproject.toml").write_text("[tool.poetry\n", encoding="utf-8")
 
     version = handler.read_version("pyproject.toml", "tool.poetry.version")
     assert version is None
@@ -531,18 +727,18 @@ def test_toml_handler_read_version_malformed_toml(monkeypatch, capsys):
     assert "Error reading version from pyproject.toml: Malformed TOML" in captured.out
 
 
-def test_toml_handler_update_version_exception(monkeypatch, capsys):
+def test_toml_handler_update_version_exception(tmp_path, monkeypatch, capsys):
     from src.bumpcalver import handlers
 
     handler = handlers.TomlVersionHandler()
 
-    # Simulate an exception during toml.load
-    def mock_toml_load(f):
+    # Simulate an exception during toml.loads
+    def mock_toml_loads(s):
         raise handlers.toml.TomlDecodeError("Malformed TOML", "", 0)
 
-    monkeypatch.setattr(handlers.toml, "load", mock_toml_load)
-    mock_open = mock.mock_open()
-    monkeypatch.setattr("builtins.open", mock_open)
+    monkeypatch.setattr(handlers.toml, "loads", mock_toml_loads)
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "pyproject.toml").write_text("[tool.poetry\n", encoding="utf-8")
 
     result = handler.update_version(
         "pyproject.toml", "tool.poetry.version", "2023-10-11"
@@ -575,16 +771,15 @@ def test_update_version_in_files_value_error(capsys):
         assert str(e) == "Unsupported file type: unsupported"
 
 
-def test_toml_handler_read_version_variable_not_found(monkeypatch, capsys):
+def test_toml_handler_read_version_variable_not_found(tmp_path, monkeypatch, capsys):
     handler = TomlVersionHandler()
-    toml_content = """
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "pyproject.toml").write_text(
+        """
 [tool.poetry]
 name = "example"
-"""
-    mock_open = mock.mock_open(read_data=toml_content)
-    monkeypatch.setattr("builtins.open", mock_open)
-    monkeypatch.setattr(
-        toml, "load", lambda f: {"tool": {"poetry": {"name": "example"}}}
+""",
+        encoding="utf-8",
     )
 
     version = handler.read_version("pyproject.toml", "tool.poetry.version")
@@ -594,24 +789,26 @@ name = "example"
     assert "Variable 'tool.poetry.version' not found in pyproject.toml" in captured.out
 
 
-def test_toml_handler_update_version_variable_not_found(monkeypatch, capsys):
+def test_toml_handler_update_version_variable_not_found(tmp_path, monkeypatch, capsys):
     handler = TomlVersionHandler()
-    toml_content = """
+    monkeypatch.chdir(tmp_path)
+    toml_file = tmp_path / "pyproject.toml"
+    toml_file.write_text(
+        """
 [tool.poetry]
 name = "example"
-"""
-    mock_open = mock.mock_open(read_data=toml_content)
-    monkeypatch.setattr("builtins.open", mock_open)
-    toml_data = {"tool": {"poetry": {"name": "example"}}}
-    monkeypatch.setattr(toml, "load", lambda f: toml_data)
+""",
+        encoding="utf-8",
+    )
     dump_mock = mock.Mock()
-    monkeypatch.setattr(toml, "dump", dump_mock)
+    monkeypatch.setattr(toml, "dumps", dump_mock)
 
     result = handler.update_version(
         "pyproject.toml", "tool.poetry.version", "2023-10-11"
     )
     assert result is False
 
+    dump_mock.assert_not_called()
     captured = capsys.readouterr()
     assert "Variable 'tool.poetry.version' not found in pyproject.toml" in captured.out
 
@@ -621,7 +818,7 @@ def test_yaml_handler_read_version_variable_not_found(monkeypatch, capsys):
     yaml_content = """
 version: "2023-10-10"
 """
-    mock_open = mock.mock_open(read_data=yaml_content)
+    mock_open = mock.mock_open(read_data=yaml_content.encode("utf-8"))
     monkeypatch.setattr("builtins.open", mock_open)
     monkeypatch.setattr(yaml, "safe_load", lambda f: {"version": "2023-10-10"})
 
@@ -632,30 +829,27 @@ version: "2023-10-10"
     assert "Variable 'nonexistent_variable' not found in config.yaml" in captured.out
 
 
-def test_xml_handler_update_version_variable_not_found(monkeypatch, capsys):
+def test_xml_handler_update_version_variable_not_found(tmp_path, monkeypatch, capsys):
     handler = XmlVersionHandler()
     xml_content = """
 <configuration>
     <version>2023-10-10</version>
 </configuration>
 """
-    mock_open = mock.mock_open(read_data=xml_content)
-    monkeypatch.setattr("builtins.open", mock_open)
-    monkeypatch.setattr(
-        ET, "parse", lambda f: ET.ElementTree(ET.fromstring(xml_content))
-    )
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "config.xml").write_text(xml_content)
 
     result = handler.update_version("config.xml", "nonexistent_variable", "2023-10-11")
     assert result is False
+    assert (tmp_path / "config.xml").read_text() == xml_content
 
     captured = capsys.readouterr()
-    print(f"Captured output: {captured.out}")  # Debugging line
     assert "Variable 'nonexistent_variable' not found in config.xml" in captured.out
 
 
 def test_dockerfile_handler_read_version_variable_not_found(monkeypatch, capsys):
     handler = DockerfileVersionHandler()
-    dockerfile_content = """
+    dockerfile_content = b"""
 FROM python:3.8
 """
     mock_open = mock.mock_open(read_data=dockerfile_content)
@@ -670,7 +864,7 @@ FROM python:3.8
 
 def test_dockerfile_handler_update_version_variable_not_found(monkeypatch, capsys):
     handler = DockerfileVersionHandler()
-    dockerfile_content = """
+    dockerfile_content = b"""
 FROM python:3.8
 """
     mock_open = mock.mock_open(read_data=dockerfile_content)
@@ -685,13 +879,12 @@ FROM python:3.8
     assert "No ARG variable 'VERSION' found in Dockerfile" in captured.out
 
 
-def test_xml_handler_read_version_variable_not_found(monkeypatch, capsys):
+def test_xml_handler_read_version_variable_not_found(tmp_path, monkeypatch, capsys):
     handler = XmlVersionHandler()
-    mock_tree = mock.Mock()
-    mock_root = mock.Mock()
-    mock_root.find.return_value = None
-    mock_tree.getroot.return_value = mock_root
-    monkeypatch.setattr(ET, "parse", lambda f: mock_tree)
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "config.xml").write_text(
+        "<configuration><name>x</name></configuration>"
+    )
 
     version = handler.read_version("config.xml", "version")
     assert version is None
@@ -702,7 +895,7 @@ def test_xml_handler_read_version_variable_not_found(monkeypatch, capsys):
 
 def test_makefile_handler_update_version_variable_not_found(monkeypatch, capsys):
     handler = MakefileVersionHandler()
-    file_content = """
+    file_content = b"""
 VERSION = 2023-10-10
 """
     mock_open = mock.mock_open(read_data=file_content)
@@ -723,3 +916,748 @@ def test_update_version_in_files_no_file_type(capsys):
         update_version_in_files(new_version, file_configs)
     except ValueError as e:
         assert str(e) == "Unsupported file type: "
+
+
+def test_update_version_in_files_parallel_keeps_config_order(tmp_path):
+    python_files = []
+    for index in range(5):
+        path = tmp_path / f"module_{index}.py"
+        path.write_text('__version__ = "2023-10-10"\n', encoding="utf-8")
+        python_files.append(str(path))
+    yaml_file = tmp_path / "config.yaml"
+    yaml_file.write_text("version: '2023-10-10'\n", encoding="utf-8")
+    dockerfile = tmp_path / "Dockerfile"
+    dockerfile.write_text(
+        "FROM python:3.12\nARG VERSION=2023-10-10\nENV APP_VERSION=2023-10-10\n",
+        encoding="utf-8",
+    )
+
+    file_configs = [
+        {
+            "path": str(dockerfile),
+            "file_type": "dockerfile",
+            "variable": "VERSION",
+            "directive": "ARG",
+        },
+        {"path": str(yaml_file), "file_type": "yaml", "variable": "version"},
+    ]
+    file_configs += [
+        {"path": path, "file_type": "python", "variable": "__version__"}
+        for path in python_files
+    ]
+    file_configs.append(
+        {
+            "path": str(dockerfile),
+            "file_type": "dockerfile",
+            "variable": "APP_VERSION",
+            "directive": "ENV",
+        }
+    )
+
+    result = update_version_in_files("2023-10-11", file_configs, jobs=4)
+
+    assert result == [file_config["path"] for file_config in file_configs]
+    for path in python_files:
+        with open(path, encoding="utf-8") as file:
+            assert file.read() == '__version__ = "2023-10-11"\n'
+    assert yaml.safe_load(yaml_file.read_text(encoding="utf-8")) == {
+        "version": "2023-10-11"
+    }
+    dockerfile_content = dockerfile.read_text(encoding="utf-8")
+    assert "ARG VERSION=2023-10-11" in dockerfile_content
+    assert "ENV APP_VERSION=2023-10-11" in dockerfile_content
+
+
+def test_update_version_in_files_parallel_unsupported_file_type(tmp_path):
+    python_file = tmp_path / "version.py"
+    python_file.write_text('__version__ = "2023-10-10"\n', encoding="utf-8")
+    file_configs = [
+        {"path": str(python_file), "file_type": "python", "variable": "__version__"},
+        {"path": "dummy_file.unsupported", "file_type": "unsupported"},
+    ]
+
+    with pytest.raises(ValueError, match="Unsupported file type: unsupported"):
+        update_version_in_files("2023-10-11", file_configs, jobs=2)
+
+    assert python_file.read_text(encoding="utf-8") == '__version__ = "2023-10-10"\n'
+
+
+def test_update_version_in_files_parallel_runtime_handler(tmp_path, handler_registry):
+    calls = []
+
+    class RecordingYamlHandler(YamlVersionHandler):
+        def swap_versions(self, file_path, new_version, file_configs):
+            calls.append(file_path)
+            return super().swap_versions(file_path, new_version, file_configs)
+
+    register_handler("yaml", RecordingYamlHandler)
+    yaml_file = tmp_path / "config.yaml"
+    yaml_file.write_text("version: '2023-10-10'\n", encoding="utf-8")
+    toml_file = tmp_path / "pyproject.toml"
+    toml_file.write_text('version = "2023-10-10"\n', encoding="utf-8")
+    file_configs = [
+        {"path": str(yaml_file), "file_type": "yaml", "variable": "version"},
+        {"path": str(toml_file), "file_type": "toml", "variable": "version"},
+    ]
+
+    result = update_version_in_files("2023-10-11", file_configs, jobs=2)
+
+    # The worker threads use the handler registered at runtime
+    assert calls == [str(yaml_file)]
+    assert result == [str(yaml_file), str(toml_file)]
+    assert toml_file.read_text(encoding="utf-8") == 'version = "2023-10-11"\n'
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_update_version_in_files_keeps_file_identity(tmp_path, jobs):
+    version_file = tmp_path / "version.py"
+    version_file.write_text('__version__ = "2023-10-10"\n', encoding="utf-8")
+    toml_file = tmp_path / "pyproject.toml"
+    toml_file.write_text('[project]\nversion = "2023-10-10"\n', encoding="utf-8")
+    links = [tmp_path / "version_link.py", tmp_path / "pyproject_link.toml"]
+    for path, link in zip([version_file, toml_file], links):
+        os.link(path, link)
+    inodes = [version_file.stat().st_ino, toml_file.stat().st_ino]
+    file_configs = [
+        {"path": str(version_file), "file_type": "python", "variable": "__version__"},
+        {"path": str(toml_file), "file_type": "toml", "variable": "project.version"},
+    ]
+
+    result = update_version_in_files("2023-10-11", file_configs, jobs=jobs)
+
+    assert result == [str(version_file), str(toml_file)]
+    # Same-length versions are patched in place: the hardlinks see the update
+    assert [version_file.stat().st_ino, toml_file.stat().st_ino] == inodes
+    assert links[0].read_text(encoding="utf-8") == '__version__ = "2023-10-11"\n'
+    assert links[1].read_text(encoding="utf-8") == (
+        '[project]\nversion = "2023-10-11"\n'
+    )
+    assert sorted(os.listdir(tmp_path)) == sorted(
+        ["version.py", "pyproject.toml", "version_link.py", "pyproject_link.toml"]
+    )
+
+    # A single file without other hardlinks keeps its inode too
+    links[0].unlink()
+    update_version_in_files("2023-10-12", file_configs[:1])
+    assert version_file.stat().st_ino == inodes[0]
+    assert version_file.read_text(encoding="utf-8") == '__version__ = "2023-10-12"\n'
+
+
+def test_toml_handler_update_versions_single_read_and_write(tmp_path, monkeypatch):
+    toml_content = (
+        '[project]\nversion = "2023-10-10"\n\n'
+        "[tool.bumpcalver]\nversion = '2023-10-10'  # literal string\n\n"
+        '[tool.poetry]\nversion = "2023-10-10"\n'
+    )
+    toml_file = tmp_path / "pyproject.toml"
+    toml_file.write_text(toml_content, encoding="utf-8")
+    loads_spy = mock.Mock(wraps=toml.loads)
+    dumps_spy = mock.Mock(wraps=toml.dumps)
+    monkeypatch.setattr(toml, "loads", loads_spy)
+    monkeypatch.setattr(toml, "dumps", dumps_spy)
+
+    file_configs = [
+        {"path": str(toml_file), "file_type": "toml", "variable": variable}
+        for variable in (
+            "project.version",
+            "tool.bumpcalver.version",
+            "tool.poetry.version",
+        )
+    ]
+
+    result = update_version_in_files("2023-10-11", file_configs)
+
+    assert result == [str(toml_file)] * 3
+    loads_spy.assert_not_called()
+    dumps_spy.assert_not_called()
+    assert toml_file.read_text(encoding="utf-8") == toml_content.replace(
+        "2023-10-10", "2023-10-11"
+    )
+
+
+def test_toml_handler_update_versions_falls_back_to_full_parse(tmp_path):
+    toml_file = tmp_path / "Cargo.toml"
+    toml_file.write_text(
+        '[package]\nversion = "2023-10-10"\nmeta = { version = "2023-10-10" }\n',
+        encoding="utf-8",
+    )
+    handler = TomlVersionHandler()
+
+    assert handler.read_version(str(toml_file), "package.meta.version") == "2023-10-10"
+    results = handler.update_versions(
+        str(toml_file),
+        "2023-10-11",
+        [
+            {"variable": "package.version"},
+            {"variable": "package.meta.version"},
+            {"variable": "package.missing"},
+        ],
+    )
+
+    assert results == [UPDATED, UPDATED, FAILED]
+    data = toml.loads(toml_file.read_text(encoding="utf-8"))
+    assert data["package"] == {
+        "version": "2023-10-11",
+        "meta": {"version": "2023-10-11"},
+    }
+
+
+def test_update_version_in_files_coalesces_links(tmp_path, monkeypatch):
+    python_file = tmp_path / "version.py"
+    python_file.write_text(
+        '__version__ = "2023-10-10"\nVERSION = "2023-10-10"\nBUILD = "2023-10-10"\n',
+        encoding="utf-8",
+    )
+    symlink = tmp_path / "symlink.py"
+    symlink.symlink_to(python_file)
+    hardlink = tmp_path / "hardlink.py"
+    os.link(python_file, hardlink)
+
+    calls = []
+    original_swap_versions = PythonVersionHandler.swap_versions
+
+    def swap_versions_spy(self, file_path, new_version, file_configs):
+        calls.append(file_configs)
+        return original_swap_versions(self, file_path, new_version, file_configs)
+
+    monkeypatch.setattr(PythonVersionHandler, "swap_versions", swap_versions_spy)
+
+    file_configs = [
+        {"path": str(python_file), "file_type": "python", "variable": "__version__"},
+        {"path": str(symlink), "file_type": "python", "variable": "VERSION"},
+        {"path": str(hardlink), "file_type": "python", "variable": "BUILD"},
+    ]
+    result = update_version_in_files("2023-10-11", file_configs)
+
+    assert result == [str(python_file), str(symlink), str(hardlink)]
+    assert len(calls) == 1
+    assert python_file.read_text(encoding="utf-8") == (
+        '__version__ = "2023-10-11"\nVERSION = "2023-10-11"\nBUILD = "2023-10-11"\n'
+    )
+
+
+def test_version_pattern_cache(tmp_path):
+    clear_pattern_cache()
+    handler = PythonVersionHandler()
+    paths = []
+    for index in range(3):
+        version_file = tmp_path / f"module_{index}.py"
+        version_file.write_text('__version__ = "2023-10-10"\n')
+        paths.append(str(version_file))
+
+    for path in paths:
+        assert handler.read_version(path, "__version__") == "2023-10-10"
+        assert handler.update_version(path, "__version__", "2023-10-11")
+    MakefileVersionHandler().update_version(paths[0], "__version__", "2023-10-12")
+
+    info = pattern_cache_info()
+    assert (info.misses, info.hits, info.size) == (2, 5, 2)
+    assert info.maxsize > 0
+
+    clear_pattern_cache()
+    assert pattern_cache_info()[:3] == (0, 0, 0)
+
+
+def test_search_head_stops_after_first_match(monkeypatch):
+    from src.bumpcalver import handlers
+
+    monkeypatch.setattr(handlers, "_HEAD_CHUNK_SIZE", 8)
+    content = b'"""Docstring."""\n__version__ = "2023-10-10"\n' + b"x = 1\n" * 1000
+    file = io.BytesIO(content)
+
+    match = handlers._search_head(
+        file, handlers._version_pattern("python", "__version__"), 64
+    )
+
+    # The version line straddles several chunks but is matched as a whole
+    assert match.group(3) == b"2023-10-10"
+    assert file.tell() <= content.index(b"x = 1") + 8
+
+
+def test_search_head_falls_back_to_whole_file():
+    from src.bumpcalver import handlers
+
+    content = b"x = 1\n" * 1000 + b'__version__ = "2023-10-10"'
+    pattern = handlers._version_pattern("python", "__version__")
+
+    assert handlers._search_head(io.BytesIO(content), pattern, 64).group(3) == (
+        b"2023-10-10"
+    )
+    assert handlers._search_head(io.BytesIO(b"x = 1\n"), pattern, 64) is None
+
+
+def test_read_version_with_head_window(tmp_path):
+    version_file = tmp_path / "version.py"
+    version_file.write_text("# header\n" * 100 + '__version__ = "2023-10-10"\n')
+    dockerfile = tmp_path / "Dockerfile"
+    dockerfile.write_text("RUN true\n" * 100 + "ARG VERSION=2023-10-10\n")
+
+    assert (
+        PythonVersionHandler().read_version(
+            str(version_file), "__version__", head_window=16
+        )
+        == "2023-10-10"
+    )
+    assert (
+        DockerfileVersionHandler().read_version(
+            str(dockerfile), "VERSION", directive="ARG", head_window=16
+        )
+        == "2023-10-10"
+    )
+
+
+@pytest.mark.parametrize(
+    "handler, variable, content",
+    [
+        (
+            PythonVersionHandler(),
+            "__version__",
+            b'\xef\xbb\xbf__version__ = "2023-10-10"\r\n',
+        ),
+        (MakefileVersionHandler(), "VERSION", b"\xef\xbb\xbfVERSION := 2023-10-10\r\n"),
+        (
+            DockerfileVersionHandler(),
+            "VERSION",
+            b"\xef\xbb\xbfFROM python\r\nARG VERSION=2023-10-10\r\n",
+        ),
+        (
+            TomlVersionHandler(),
+            "project.version",
+            b'\xef\xbb\xbf[project]\r\nversion = "2023-10-10"\r\n',
+        ),
+        (
+            YamlVersionHandler(),
+            "version",
+            b"\xef\xbb\xbfname: app\r\nversion: '2023-10-10'\r\n",
+        ),
+        (
+            JsonVersionHandler(),
+            "version",
+            b'\xef\xbb\xbf{\r\n  "version": "2023-10-10"\r\n}\r\n',
+        ),
+    ],
+)
+def test_handlers_preserve_bom_and_crlf(tmp_path, handler, variable, content):
+    target = tmp_path / "version_file"
+    target.write_bytes(content)
+
+    assert handler.read_version(str(target), variable, directive="ARG") == "2023-10-10"
+    assert handler.update_version(str(target), variable, "2023-10-11", directive="ARG")
+
+    assert target.read_bytes() == content.replace(b"2023-10-10", b"2023-10-11")
+
+
+@pytest.mark.parametrize(
+    "handler, variable, content, expected",
+    [
+        (
+            TomlVersionHandler(),
+            "project.version",
+            b'\xef\xbb\xbfproject = { version = "2023-10-10" }\r\n',
+            b'\xef\xbb\xbf[project]\r\nversion = "2023-10-11"\r\n',
+        ),
+        (
+            JsonVersionHandler(),
+            "meta.version",
+            b'\xef\xbb\xbf{"name": "app"}\r\n',
+            None,
+        ),
+        (
+            YamlVersionHandler(),
+            "meta.version",
+            b"\xef\xbb\xbfname: app\r\n",
+            b"\xef\xbb\xbfmeta:\r\n  version: '2023-10-11'\r\nname: app\r\n",
+        ),
+    ],
+)
+def test_handler_fallbacks_preserve_bom_and_crlf(
+    tmp_path, handler, variable, content, expected
+):
+    target = tmp_path / "version_file"
+    target.write_bytes(content)
+
+    assert handler.update_version(str(target), variable, "2023-10-11")
+
+    written = target.read_bytes()
+    assert written.startswith(b"\xef\xbb\xbf")
+    assert b"\n" not in written.replace(b"\r\n", b"")
+    if expected is not None:
+        assert written == expected
+    assert handler.read_version(str(target), variable) == "2023-10-11"
+
+
+def test_xml_handler_fallback_preserves_bom_and_crlf(tmp_path):
+    handler = XmlVersionHandler()
+    target = tmp_path / "version.xml"
+    target.write_bytes(b"\xef\xbb\xbf<project>\r\n  <version />\r\n</project>\r\n")
+
+    assert handler.update_version(str(target), "version", "2023-10-11")
+
+    assert target.read_bytes() == (
+        b"\xef\xbb\xbf<project>\r\n  <version>2023-10-11</version>\r\n</project>"
+    )
+
+
+@pytest.mark.parametrize(
+    "file_type, file_config, content",
+    [
+        ("python", {"variable": "__version__"}, '__version__ = "2023-10-11"\n'),
+        (
+            "toml",
+            {"variable": "project.version"},
+            '[project]\nversion = "2023-10-11"\n',
+        ),
+        (
+            "toml",
+            {"variable": "project.version"},
+            'project = {version = "2023-10-11"}\n',
+        ),
+        ("yaml", {"variable": "image.tag"}, "image:\n  tag: '2023-10-11'\n"),
+        ("json", {"variable": "version"}, '{"version": "2023-10-11"}\n'),
+        ("json", {"variable": "meta.version"}, '{"meta": {"version": "2023-10-11"}}'),
+        ("xml", {"variable": "version"}, "<p><version>2023-10-11</version></p>"),
+        (
+            "xml",
+            {"variable": "version"},
+            "<p><version>2023-10-11<!-- c --></version></p>",
+        ),
+        (
+            "dockerfile",
+            {"variable": "VERSION", "directive": "ENV"},
+            "ENV VERSION=2023-10-11\n",
+        ),
+        ("makefile", {"variable": "VERSION"}, "VERSION := 2023-10-11\n"),
+    ],
+)
+def test_update_versions_skips_unchanged_files(
+    tmp_path, file_type, file_config, content
+):
+    target = tmp_path / "version_file"
+    target.write_text(content, encoding="utf-8")
+    os.utime(target, (0, 0))
+
+    results = get_version_handler(file_type).update_versions(
+        str(target), "2023-10-11", [dict(file_config, path=str(target))]
+    )
+
+    assert results == [UNCHANGED]
+    assert target.stat().st_mtime == 0
+    assert target.read_text(encoding="utf-8") == content
+
+
+def test_update_version_in_files_reports_unchanged_files(tmp_path, capsys):
+    current = tmp_path / "current.py"
+    current.write_text('__version__ = "2023-10-11"\n')
+    stale = tmp_path / "stale.py"
+    stale.write_text('__version__ = "2023-10-10"\n')
+    missing = tmp_path / "missing.py"
+    missing.write_text("name = 'app'\n")
+
+    file_configs = [
+        {"path": str(path), "file_type": "python", "variable": "__version__"}
+        for path in (current, stale, missing)
+    ]
+    result = update_version_in_files("2023-10-11", file_configs, atomic=False)
+
+    assert result == [str(stale)]
+    assert result.unchanged == [str(current)]
+    assert f"Unchanged {current}" in capsys.readouterr().out
+    assert update_version_in_files("2023-10-11", file_configs[:2]).unchanged == [
+        str(current),
+        str(stale),
+    ]
+
+
+def test_updated_files_attributes_are_lists():
+    first = UpdatedFiles(("a",), unchanged=iter(["b"]))
+    second = UpdatedFiles()
+    first.unchanged.append("c")
+    second.updates.append(VersionUpdate("d", None, "2023-10-11", UPDATED))
+
+    assert (first, first.unchanged, first.updates) == (["a"], ["b", "c"], [])
+    assert (second, second.unchanged) == ([], [])
+    assert isinstance(second.updates, list) and len(second.updates) == 1
+
+
+def test_custom_handler_updates_through_swap_versions(tmp_path, handler_registry):
+    class StampHandler(VersionHandler):
+        def read_version(self, file_path, variable, **kwargs):
+            return None
+
+        def swap_versions(self, file_path, new_version, file_configs):
+            status = FAILED if new_version == "bad" else UPDATED
+            return [
+                VersionUpdate(file_path, None, new_version, status)
+                for _ in file_configs
+            ]
+
+    register_handler("stamp", StampHandler)
+    handler = get_version_handler("stamp")
+    path = str(tmp_path / "file")
+
+    assert handler.update_version(path, "stamp", "2023-10-11") is True
+    assert handler.update_version(path, "stamp", "bad") is False
+    assert handler.update_versions(path, "2023-10-11", [{}, {}]) == [UPDATED] * 2
+    result = update_version_in_files(
+        "2023-10-11", [{"path": path, "file_type": "stamp"}]
+    )
+    assert result == [path]
+    assert result.unchanged == []
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_update_version_in_files_commits_nothing_when_a_handler_fails(
+    tmp_path, monkeypatch, jobs
+):
+    monkeypatch.chdir(tmp_path)
+    python_file = tmp_path / "version.py"
+    python_file.write_text('__version__ = "2023-10-10"\n')
+    toml_file = tmp_path / "pyproject.toml"
+    toml_file.write_text('[project]\nversion = "2023-10-10"\n')
+    missing = tmp_path / "about.py"
+    missing.write_text('__author__ = "demo"\n')
+    before = {path.name: path.read_bytes() for path in tmp_path.iterdir()}
+    file_configs = [
+        {"path": str(python_file), "file_type": "python", "variable": "__version__"},
+        {"path": str(toml_file), "file_type": "toml", "variable": "project.version"},
+        {"path": str(missing), "file_type": "python", "variable": "__version__"},
+    ]
+
+    with pytest.raises(ValueError, match="about.py; no file was changed"):
+        update_version_in_files("2023-10-11", file_configs, jobs=jobs)
+
+    assert {path.name: path.read_bytes() for path in tmp_path.iterdir()} == before
+
+
+def test_update_version_in_files_is_atomic(tmp_path, monkeypatch, handler_registry):
+    monkeypatch.chdir(tmp_path)
+    python_file = tmp_path / "version.py"
+    python_file.write_text('__version__ = "2023-10-10"\n')
+
+    class BrokenHandler(MakefileVersionHandler):
+        def swap_versions(self, file_path, new_version, file_configs):
+            raise RuntimeError("handler crashed")
+
+    register_handler("broken", BrokenHandler)
+    file_configs = [
+        {"path": str(python_file), "file_type": "python", "variable": "__version__"},
+        {"path": str(tmp_path / "Makefile"), "file_type": "broken"},
+    ]
+    with pytest.raises(RuntimeError):
+        update_version_in_files("2023-10-11", file_configs)
+
+    assert python_file.read_text() == '__version__ = "2023-10-10"\n'
+    assert os.listdir(tmp_path) == ["version.py"]
+
+
+def test_complete_interrupted_update(tmp_path, monkeypatch):
+    from src.bumpcalver import file_utils
+
+    project = tmp_path / "project"
+    project.mkdir()
+    monkeypatch.chdir(tmp_path)
+    paths = [project / "a.py", project / "b.py"]
+    for path in paths:
+        path.write_text('__version__ = "2023-10-10"\n')
+    file_configs = [
+        {"path": str(path), "file_type": "python", "variable": "__version__"}
+        for path in paths
+    ]
+
+    def crash(entry):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(file_utils, "_apply_entry", crash)
+    with pytest.raises(KeyboardInterrupt):
+        update_version_in_files("2023-10-11", file_configs, project_root=str(project))
+    monkeypatch.undo()
+    monkeypatch.chdir(tmp_path)
+    journal = project / ".bumpcalver" / "journal.json"
+    assert journal.exists()
+
+    # The journal belongs to the project, and library calls never replay it
+    assert complete_interrupted_update() == []
+    other = tmp_path / "other.py"
+    other.write_text('__version__ = "2023-10-10"\n')
+    monkeypatch.chdir(project)
+    update_version_in_files(
+        "2023-10-12",
+        [{"path": str(other), "file_type": "python", "variable": "__version__"}],
+    )
+    assert journal.exists()
+
+    assert complete_interrupted_update(str(project)) == [str(path) for path in paths]
+    assert [path.read_text() for path in paths] == ['__version__ = "2023-10-11"\n'] * 2
+    assert sorted(os.listdir(project)) == ["a.py", "b.py"]
+
+
+def test_update_version_in_files_without_transaction(tmp_path):
+    python_file = tmp_path / "version.py"
+    python_file.write_text('__version__ = "2023-10-10"\n')
+    inode = python_file.stat().st_ino
+
+    result = update_version_in_files(
+        "2023-10-11",
+        [{"path": str(python_file), "file_type": "python", "variable": "__version__"}],
+        atomic=False,
+    )
+
+    assert result == [str(python_file)]
+    assert python_file.stat().st_ino == inode  # patched in place
+    assert python_file.read_text() == '__version__ = "2023-10-11"\n'
+
+
+@pytest.mark.parametrize(
+    "file_name, file_type, variable, content, locator",
+    [
+        (
+            "pyproject.toml",
+            "toml",
+            "project.version",
+            '[project]\nversion = "2023-10-10"\n',
+            "find_toml_value",
+        ),
+        (
+            "chart.yaml",
+            "yaml",
+            "image.tag",
+            "image:\n  tag: '2023-10-10'\n",
+            "find_yaml_scalars",
+        ),
+        (
+            "package.json",
+            "json",
+            "version",
+            '{"version": "2023-10-10"}\n',
+            "find_json_values",
+        ),
+        (
+            "pom.xml",
+            "xml",
+            "version",
+            "<project><version>2023-10-10</version></project>\n",
+            "find_xml_texts",
+        ),
+        (
+            "version.py",
+            "python",
+            "__version__",
+            '__version__ = "2023-10-10"\n',
+            None,
+        ),
+    ],
+)
+def test_transaction_shares_reads_between_read_and_update(
+    tmp_path, monkeypatch, file_name, file_type, variable, content, locator
+):
+    import builtins
+
+    from src.bumpcalver import handlers
+    from src.bumpcalver.file_utils import FileTransaction
+
+    path = tmp_path / file_name
+    path.write_text(content)
+    file_configs = [{"path": str(path), "file_type": file_type, "variable": variable}]
+    opened = []
+    real_open = builtins.open
+
+    def counting_open(file, *args, **kwargs):
+        if file == str(path):
+            opened.append(file)
+        return real_open(file, *args, **kwargs)
+
+    if locator is not None:
+        spy = mock.Mock(wraps=getattr(handlers, locator))
+        monkeypatch.setattr(handlers, locator, spy)
+    monkeypatch.setattr(builtins, "open", counting_open)
+
+    with FileTransaction() as transaction:
+        handler = get_version_handler(file_type)
+        assert handler.read_version(str(path), variable) == "2023-10-10"
+        result = update_version_in_files(
+            "2023-10-11", file_configs, transaction=transaction
+        )
+        # Reads later in the run see the update before it is committed
+        assert handler.read_version(str(path), variable) == "2023-10-11"
+        # Only the commit opens the file again, to copy it around the edits
+        assert opened == [str(path)]
+        assert path.read_text() == content
+
+    monkeypatch.setattr(builtins, "open", real_open)
+    assert result == [str(path)]
+    if locator is not None:
+        assert spy.call_count == 2  # once before and once after the update
+    assert path.read_text() == content.replace("2023-10-10", "2023-10-11")
+
+
+@pytest.mark.parametrize(
+    "handler, variable, content",
+    [
+        (PythonVersionHandler(), "__version__", b'__version__ = "2023-10-10"\n'),
+        (MakefileVersionHandler(), "VERSION", b"VERSION := 2023-10-10 \n"),
+        (DockerfileVersionHandler(), "VERSION", b"ARG VERSION=2023-10-10\n"),
+        (
+            TomlVersionHandler(),
+            "project.version",
+            b'[project]\nversion = "2023-10-10"\n',
+        ),
+        (
+            TomlVersionHandler(),
+            "project.version",
+            b'project = { version = "2023-10-10" }\n',
+        ),
+        (YamlVersionHandler(), "app.version", b"app:\n  version: '2023-10-10'\n"),
+        (JsonVersionHandler(), "app.version", b'{"app": {"version": "2023-10-10"}}\n'),
+        (
+            XmlVersionHandler(),
+            "version",
+            b"<project><version>2023-10-10</version></project>",
+        ),
+        (
+            XmlVersionHandler(),
+            ".//version",
+            b"<project><version>2023-10-10</version></project>",
+        ),
+    ],
+)
+def test_swap_version_returns_previous_version(tmp_path, handler, variable, content):
+    target = tmp_path / "version_file"
+    target.write_bytes(content)
+
+    update = handler.swap_version(str(target), variable, "2023-10-11", directive="ARG")
+
+    assert update == VersionUpdate(str(target), "2023-10-10", "2023-10-11", UPDATED)
+    assert update.changed
+    assert handler.read_version(str(target), variable, directive="ARG") == "2023-10-11"
+    assert handler.swap_version(
+        str(target), variable, "2023-10-11", directive="ARG"
+    ) == VersionUpdate(str(target), "2023-10-11", "2023-10-11", UNCHANGED)
+
+
+def test_update_version_in_files_reports_previous_versions(tmp_path):
+    python_file = tmp_path / "version.py"
+    python_file.write_text('__version__ = "2023-10-10"\n')
+    package_json = tmp_path / "package.json"
+    package_json.write_text('{"version": "2023.10.10"}\n')
+
+    result = update_version_in_files(
+        "2023-10-11",
+        [
+            {
+                "path": str(python_file),
+                "file_type": "python",
+                "variable": "__version__",
+            },
+            {
+                "path": str(package_json),
+                "file_type": "json",
+                "variable": "version",
+                "version_standard": "python",
+            },
+        ],
+    )
+
+    assert result.updates == [
+        VersionUpdate(str(python_file), "2023-10-10", "2023-10-11", UPDATED),
+        VersionUpdate(str(package_json), "2023.10.10", "2023.10.11", UPDATED),
+    ]
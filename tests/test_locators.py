@@ -0,0 +1,273 @@
+# tests/test_locators.py
+
+import io
+import json
+
+import pytest
+import yaml
+from src.bumpcalver import locators
+from src.bumpcalver.locators import (
+    decode_toml_string,
+    encode_toml_string,
+    encode_xml_text,
+    encode_yaml_scalar,
+    find_json_values,
+    find_toml_value,
+    find_xml_texts,
+    find_yaml_scalars,
+    split_xml_path,
+)
+
+TOML_DOCUMENT = b"""# Top-level comment
+name = "root"
+"quoted.key" = 'literal'
+
+[project]
+description = \"\"\"
+Multi-line "text" with [brackets]
+\"\"\"
+classifiers = [
+    "A", # comment ]
+    "B",
+]
+urls = { Homepage = "https://example.com" }
+version = "2024.12.14"   # trailing comment
+
+[[tool.items]]
+version = "ignored"
+
+[tool.items.sub]
+version = "ignored"
+
+[tool . "bump.calver"]
+version = "2024-12-14-001"
+"""
+
+
+def _value(data, dotted_keys):
+    span = find_toml_value(data, dotted_keys)
+    return None if span is None else decode_toml_string(data[span[0] : span[1]])
+
+
+def test_find_toml_value_resolves_table_keys():
+    assert _value(TOML_DOCUMENT, ["project", "version"]) == "2024.12.14"
+    assert _value(TOML_DOCUMENT, ["tool", "bump.calver", "version"]) == (
+        "2024-12-14-001"
+    )
+    assert _value(TOML_DOCUMENT, ["name"]) == "root"
+    assert _value(TOML_DOCUMENT, ["quoted.key"]) == "literal"
+    assert _value(TOML_DOCUMENT, ["project", "description"]) == (
+        'Multi-line "text" with [brackets]\n'
+    )
+
+
+def test_find_toml_value_span_covers_literal():
+    start, end = find_toml_value(TOML_DOCUMENT, ["project", "version"])
+    assert TOML_DOCUMENT[start:end] == b'"2024.12.14"'
+
+
+def test_find_toml_value_unresolvable_keys():
+    # Missing, non-string, inline table and array-of-tables keys need a full parse
+    assert find_toml_value(TOML_DOCUMENT, ["project", "missing"]) is None
+    assert find_toml_value(TOML_DOCUMENT, ["project", "classifiers"]) is None
+    assert find_toml_value(TOML_DOCUMENT, ["project", "urls", "Homepage"]) is None
+    assert find_toml_value(TOML_DOCUMENT, ["tool", "items", "version"]) is None
+    assert find_toml_value(TOML_DOCUMENT, ["tool", "items", "sub", "version"]) is None
+    assert find_toml_value(b'[project\nversion = "1"\n', ["project", "version"]) is None
+
+
+def test_find_toml_value_with_bom_and_crlf():
+    data = b'\xef\xbb\xbf[project]\r\nversion = "1.0"\r\n'
+    assert _value(data, ["project", "version"]) == "1.0"
+
+
+def test_decode_toml_string_escapes():
+    assert decode_toml_string(b'"tab\\there \\u00e9"') == "tab\there \u00e9"
+    assert decode_toml_string(b"'C:\\path'") == "C:\\path"
+    assert decode_toml_string(b'"""\nline \\\n    continued"""') == "line continued"
+
+
+def test_encode_toml_string_keeps_quote_style():
+    assert encode_toml_string("2024.12.15", b'"2024.12.14"') == b'"2024.12.15"'
+    assert encode_toml_string("2024.12.15", b"'2024.12.14'") == b"'2024.12.15'"
+    assert encode_toml_string("it's", b"'old'") == b'"it\'s"'
+    assert encode_toml_string('say "hi"') == b'"say \\"hi\\""'
+
+
+YAML_DOCUMENT = """# Chart
+image:
+  repository: example/app
+  tag: "2024.12.14"   # pinned
+sidecars:
+  - version: ignored
+flow: {version: '1.0', other: 2}
+? [complex, key]
+: version
+block: |
+  multi
+  line
+anchored: &v !!str 2024-12-14
+---
+image:
+  tag: second-document
+"""
+
+
+@pytest.mark.parametrize(
+    "loader", [yaml.SafeLoader, getattr(yaml, "CSafeLoader", yaml.SafeLoader)]
+)
+def test_find_yaml_scalars(monkeypatch, loader):
+    monkeypatch.setattr(locators, "_YAML_LOADER", loader)
+    targets = [
+        ["image", "tag"],
+        ["flow", "version"],
+        ["sidecars", "version"],
+        ["image"],
+        ["version"],
+        ["block"],
+        ["anchored"],
+        ["missing"],
+    ]
+    found = find_yaml_scalars(YAML_DOCUMENT, targets)
+
+    def text(scalar):
+        return YAML_DOCUMENT[scalar.start : scalar.end]
+
+    assert text(found[0]) == '"2024.12.14"'
+    assert found[0].value == "2024.12.14" and found[0].style == '"'
+    assert text(found[1]) == "'1.0'"
+    assert found[2] is None  # sequence items are not addressable
+    assert found[3] is None  # not a scalar
+    assert found[4] is None  # value of a complex key
+    assert text(found[5]) == "|\n  multi\n  line"
+    assert text(found[6]) == "2024-12-14" and found[6].style is None
+    assert found[7] is None
+
+
+@pytest.mark.parametrize(
+    "loader", [yaml.SafeLoader, getattr(yaml, "CSafeLoader", yaml.SafeLoader)]
+)
+def test_find_yaml_scalars_with_bom(monkeypatch, loader):
+    monkeypatch.setattr(locators, "_YAML_LOADER", loader)
+    document = '\ufeffimage:\r\n  tag: "2024.12.14"\r\n'
+    found = find_yaml_scalars(document, [["image", "tag"]])[0]
+    assert document[found.start : found.end] == '"2024.12.14"'
+
+
+def test_encode_yaml_scalar():
+    assert encode_yaml_scalar("2024.12.15") == "2024.12.15"
+    assert encode_yaml_scalar("2024.12") == "'2024.12'"
+    assert encode_yaml_scalar("2024-12-15") == "'2024-12-15'"
+    assert encode_yaml_scalar("it's", "'") == "'it''s'"
+    assert encode_yaml_scalar('say "hi"', '"') == '"say \\"hi\\""'
+    assert encode_yaml_scalar("2024.12.15", "|") == '"2024.12.15"'
+
+
+JSON_DOCUMENT = """\ufeff{
+  "name": "pkg \\"quoted\\" \\u00e9",
+  "version": "2024.12.15",
+  "count": -1.5e3,
+  "flags": [true, false, null, {"version": "nope"}],
+  "packages": {
+    "": {"version": "2024.12.14"},
+    "node_modules/dep": {"version": "1.0.0", "deps": [[], {}]}
+  },
+  "list": ["a", ["b", "c"]]
+}
+""".encode(
+    "utf-8"
+)
+
+
+def test_find_json_values():
+    targets = [
+        ["version"],
+        ["packages", "", "version"],
+        ["packages", "node_modules/dep", "version"],
+        ["count"],
+        ["flags"],
+        ["list", "1", "0"],
+        ["missing"],
+        ["packages", "missing", "version"],
+        ["name", "nested"],
+    ]
+    found = find_json_values(JSON_DOCUMENT, targets)
+
+    def value(span):
+        return json.loads(JSON_DOCUMENT[span[0] : span[1]])
+
+    assert value(found[0]) == "2024.12.15"
+    assert value(found[1]) == "2024.12.14"
+    assert value(found[2]) == "1.0.0"
+    assert value(found[3]) == -1500.0
+    assert value(found[4]) == [True, False, None, {"version": "nope"}]
+    assert value(found[5]) == "b"
+    assert found[6:] == [None, None, None]
+
+
+@pytest.mark.parametrize(
+    "document, message",
+    [
+        (b'{"a" 1}', "Expecting ':' delimiter"),
+        (b'{"a": 1 "b": 2}', "Expecting ',' delimiter"),
+        (b"{a: 1}", "Expecting property name enclosed in double quotes"),
+        (b'{"a": [1, 2}', "Expecting ',' delimiter"),
+    ],
+)
+def test_find_json_values_malformed(document, message):
+    with pytest.raises(json.JSONDecodeError, match=message):
+        find_json_values(document, [["b"]])
+
+
+XML_DOCUMENT = b"""<?xml version="1.0" encoding="UTF-8"?>
+<!-- comment <version>0</version> -->
+<project xmlns="urn:pom" xmlns:x="urn:x">
+  <parent><version>0.1</version></parent>
+  <version>1.0&amp;</version>
+  <x:meta><x:version>2.0</x:version><empty/><mixed>a<b/>c</mixed></x:meta>
+</project>"""
+
+
+def test_split_xml_path():
+    assert split_xml_path("version") == [(None, None, "version")]
+    assert split_xml_path("./{urn:a/b}meta/x:version") == [
+        ("urn:a/b", None, "meta"),
+        (None, "x", "version"),
+    ]
+    for path in ["*/version", ".//version", "a//b", "/a", ".", "a[1]", "../a"]:
+        assert split_xml_path(path) is None
+
+
+def test_find_xml_texts():
+    paths = [
+        "version",
+        "{urn:pom}version",
+        "x:meta/x:version",
+        "{urn:x}meta/version",
+        "parent/version",
+        "{urn:other}version",
+        "meta/empty",
+        "meta/mixed",
+        "missing",
+    ]
+    found = find_xml_texts(XML_DOCUMENT, [split_xml_path(path) for path in paths])
+
+    def text(found_text):
+        return XML_DOCUMENT[found_text.start : found_text.end]
+
+    assert text(found[0]) == b"1.0&amp;" and found[0].value == "1.0&"
+    assert found[0].encoding == "UTF-8"
+    assert found[1] == found[0]
+    assert text(found[2]) == b"2.0" and found[3] == found[2]
+    assert text(found[4]) == b"0.1"
+    assert found[5:] == [None, None, None, None]
+
+
+def test_find_xml_texts_streams_file():
+    found = find_xml_texts(io.BytesIO(XML_DOCUMENT), [split_xml_path("version")])
+    assert found[0].value == "1.0&"
+
+
+def test_encode_xml_text():
+    assert encode_xml_text("1<2 & 3") == b"1&lt;2 &amp; 3"
+    assert encode_xml_text("caf\u00e9", "ascii") == b"caf&#233;"
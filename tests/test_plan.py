@@ -0,0 +1,192 @@
+# tests/test_plan.py
+
+import json
+
+import pytest
+from src.bumpcalver.handlers import UPDATED, VersionUpdate
+from src.bumpcalver.plan import (
+    FilePlan,
+    PlanRecorder,
+    PlannedEdit,
+    UpdatePlan,
+    apply_plan,
+    load_plan,
+    plan_version_update,
+    save_plan,
+)
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "version.py").write_text('__version__ = "2023-10-10"\n')
+    (tmp_path / "package.json").write_text('{"name": "app"}\n')
+    (tmp_path / "current.py").write_text('__version__ = "2023-10-11"\n')
+    (tmp_path / "pyproject.toml").write_text('[project]\nversion = "2023-10-10"\n')
+    return tmp_path
+
+
+def file_configs(project):
+    return [
+        {
+            "path": str(project / "version.py"),
+            "file_type": "python",
+            "variable": "__version__",
+        },
+        {
+            "path": str(project / "package.json"),
+            "file_type": "json",
+            "variable": "version",
+        },
+        {
+            "path": str(project / "current.py"),
+            "file_type": "python",
+            "variable": "__version__",
+        },
+        {
+            "path": str(project / "pyproject.toml"),
+            "file_type": "toml",
+            "variable": "project.version",
+        },
+    ]
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_plan_version_update_writes_nothing(project, jobs):
+    before = {path.name: path.read_bytes() for path in project.iterdir()}
+
+    plan, files = plan_version_update("2023-10-11", file_configs(project), jobs=jobs)
+
+    assert {path.name: path.read_bytes() for path in project.iterdir()} == before
+    assert files == [
+        str(project / "version.py"),
+        str(project / "package.json"),
+        str(project / "pyproject.toml"),
+    ]
+    assert files.unchanged == [str(project / "current.py")]
+    assert plan.version == "2023-10-11"
+    assert [file_plan.path for file_plan in plan.files] == files
+    assert plan.files[0].edits == [PlannedEdit(15, 25, b"2023-10-10", b"2023-10-11")]
+    assert plan.files[2].edits == [
+        PlannedEdit(20, 32, b'"2023-10-10"', b'"2023-10-11"')
+    ]
+    # Whole-document rewrites are reduced to the span that differs
+    (edit,) = plan.files[1].edits
+    assert edit.start == 1 and edit.old.startswith(b'"name": "app"')
+    assert b'"version": "2023-10-11"' in edit.new
+
+
+def test_save_and_load_plan(project):
+    plan, _ = plan_version_update("2023-10-11", file_configs(project))
+    save_plan(plan, "plan.json")
+
+    with open("plan.json", encoding="utf-8") as file:
+        data = json.load(file)
+    assert data["files"][0]["path"] == "version.py"
+    assert load_plan("plan.json") == plan
+
+    with open("plan.json", "w", encoding="utf-8") as file:
+        json.dump({"format": 0}, file)
+    with pytest.raises(ValueError):
+        load_plan("plan.json")
+
+
+def test_apply_plan(project):
+    plan, _ = plan_version_update("2023-10-11", file_configs(project))
+    files = apply_plan(plan)
+    assert files == [file_plan.path for file_plan in plan.files]
+    assert files.unchanged == []
+    assert files.updates[0] == VersionUpdate(
+        str(project / "version.py"), "2023-10-10", "2023-10-11", UPDATED
+    )
+    assert [update.path for update in files.updates] == [
+        file_plan.path for file_plan in plan.files for _ in file_plan.edits
+    ]
+
+    assert (project / "version.py").read_text() == '__version__ = "2023-10-11"\n'
+    assert json.loads((project / "package.json").read_text()) == {
+        "name": "app",
+        "version": "2023-10-11",
+    }
+    assert (project / "pyproject.toml").read_text() == (
+        '[project]\nversion = "2023-10-11"\n'
+    )
+
+
+def test_apply_plan_refuses_changed_files(project):
+    plan, _ = plan_version_update("2023-10-11", file_configs(project))
+    (project / "pyproject.toml").write_text('[project]\nversion = "2023-10-12"\n')
+
+    with pytest.raises(ValueError, match="pyproject.toml"):
+        apply_plan(plan)
+
+    assert (project / "version.py").read_text() == '__version__ = "2023-10-10"\n'
+
+
+def test_apply_plan_without_files(project):
+    assert apply_plan(UpdatePlan("2023-10-11", [])) == []
+    missing = FilePlan(str(project / "missing.py"), "0" * 64, [])
+    with pytest.raises(ValueError):
+        apply_plan(UpdatePlan("2023-10-11", [missing]))
+
+
+def test_plan_recorder_keys_files_by_real_path(project):
+    (project / "link.py").symlink_to(project / "version.py")
+    recorder = PlanRecorder()
+    with recorder.activate():
+        recorder.stage_edits(str(project / "link.py"), {(0, 11): b"VERSION"})
+        recorder.stage_edits(str(project / "version.py"), {(15, 25): b"2023-10-11"})
+
+    plan = recorder.plan(
+        "2023-10-11", [str(project / "link.py"), str(project / "version.py")]
+    )
+
+    (file_plan,) = plan.files
+    assert file_plan.path == str(project / "link.py")
+    assert file_plan.edits == [
+        PlannedEdit(0, 11, b"__version__", b"VERSION"),
+        PlannedEdit(15, 25, b"2023-10-10", b"2023-10-11"),
+    ]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 4, 64 * 1024])
+def test_plan_recorder_reduces_new_body_to_changed_span(
+    project, monkeypatch, chunk_size
+):
+    from src.bumpcalver import plan
+
+    monkeypatch.setattr(plan, "_COMPARE_CHUNK_SIZE", chunk_size)
+    path = project / "version.py"
+    recorder = PlanRecorder()
+    with recorder.activate():
+        recorder.stage_content(str(path), b'__version__ = "2023-10-10.1"\n')
+
+    (file_plan,) = recorder.plan("2023-10-10.1", [str(path)]).files
+    assert file_plan.edits == [PlannedEdit(25, 25, b"", b".1")]
+
+    recorder = PlanRecorder()
+    with recorder.activate():
+        recorder.stage_content(str(path), b'__version__ = "2023-11-10"\n')
+    (file_plan,) = recorder.plan("2023-11-10", [str(path)]).files
+    assert file_plan.edits == [PlannedEdit(21, 22, b"0", b"1")]
+
+
+def test_plan_recorder_commits_nothing(project):
+    before = (project / "version.py").read_bytes()
+    with PlanRecorder() as recorder:
+        recorder.stage_edits(str(project / "version.py"), {(15, 25): b"2023-10-11"})
+
+    assert (project / "version.py").read_bytes() == before
+    assert recorder.staged == {} and recorder.patched == {}
+    assert list(recorder.recorded) == [str(project / "version.py")]
+
+    recorder.discard()
+    assert recorder.plan("2023-10-11", [str(project / "version.py")]).files == []
+
+
+def test_plan_version_update_reports_would_update(project, capsys):
+    plan_version_update("2023-10-11", file_configs(project))
+
+    output = capsys.readouterr().out
+    assert f"Would update {project / 'version.py'}" in output
+    assert "Updated" not in output
@@ -2,9 +2,17 @@
 
 import os
 import re
+from datetime import datetime, timezone
 from unittest import mock
 
+import pytest
+
 from src.bumpcalver.utils import (
+    Clock,
+    compile_date_format,
+    compile_version_format,
+    compile_version_parser,
+    get_batch_versions,
     get_build_version,
     get_current_date,
     get_current_datetime_version,
@@ -243,3 +251,239 @@ def test_get_build_version_with_directive(monkeypatch):
     mock_handler.read_version.assert_called_with(
         "dummy_path", "VERSION", directive="ARG"
     )
+
+
+def test_get_build_version_with_head_window(monkeypatch):
+    monkeypatch.setattr(
+        "src.bumpcalver.utils.get_current_datetime_version", lambda tz, df: "2023-10-11"
+    )
+
+    mock_handler = mock.Mock()
+    mock_handler.read_version.return_value = "2023-10-11-1"
+    monkeypatch.setattr(
+        "src.bumpcalver.utils.get_version_handler", lambda ft: mock_handler
+    )
+
+    file_config = {
+        "path": "dummy_path",
+        "file_type": "python",
+        "variable": "__version__",
+        "head_window": 4096,
+    }
+    version_format = "{current_date}-{build_count}"
+    result = get_build_version(file_config, version_format, "UTC", "%Y-%m-%d")
+    assert result == "2023-10-11-2"
+
+    mock_handler.read_version.assert_called_with(
+        "dummy_path", "__version__", head_window=4096
+    )
+
+
+def test_compile_date_format_custom_directives():
+    moment = datetime(2024, 12, 7)
+    assert compile_date_format("%Y.Q%q")(moment) == "2024.Q4"
+    assert compile_date_format("%y.%m.%d")(moment) == "24.12.07"
+    # An escaped percent sign is not the start of a directive
+    assert compile_date_format("%Y.%%q")(moment) == "2024.%q"
+    assert compile_date_format("%Y.Q%q") is compile_date_format("%Y.Q%q")
+
+
+def test_clock_reads_the_time_once():
+    clock = Clock()
+    with mock.patch("src.bumpcalver.utils.datetime") as mock_datetime:
+        mock_datetime.now.side_effect = [
+            datetime(2024, 12, 31, 23, 59, 59, tzinfo=timezone.utc),
+            datetime(2025, 1, 1, 0, 0, 1, tzinfo=timezone.utc),
+        ]
+        with clock.activate():
+            first = get_current_datetime_version("UTC", "%Y.%m.%d")
+            second = get_current_date("UTC", "%Y.%m.%d")
+    assert first == second == "2024.12.31"
+    assert mock_datetime.now.call_count == 1
+
+
+def test_clock_replays_a_fixed_time():
+    aware = Clock(datetime(2024, 3, 31, 23, 30, tzinfo=timezone.utc))
+    assert aware.format("%Y.%m.%d", "UTC") == "2024.03.31"
+    assert aware.format("%Y.%m.%d", "Asia/Tokyo") == "2024.04.01"
+
+    naive = Clock(datetime(2024, 3, 31, 23, 30))
+    assert naive.format("%Y.Q%q", "Asia/Tokyo") == "2024.Q1"
+    assert get_current_datetime_version("UTC", "%Y.%m.%d", clock=naive) == "2024.03.31"
+
+
+def test_get_build_version_uses_active_clock(monkeypatch):
+    mock_handler = mock.Mock()
+    mock_handler.read_version.return_value = "2024-12-07-3"
+    monkeypatch.setattr(
+        "src.bumpcalver.utils.get_version_handler", lambda ft: mock_handler
+    )
+
+    file_config = {"path": "dummy_path", "file_type": "python", "variable": "__version__"}
+    with Clock(datetime(2024, 12, 7, 12)).activate():
+        result = get_build_version(
+            file_config, "{current_date}-{build_count}", "UTC", "%Y-%m-%d"
+        )
+    assert result == "2024-12-07-4"
+
+
+def test_compile_version_parser_fields():
+    parser = compile_version_parser("{current_date}-{build_count:03}", "%Y.%m.%d")
+    assert parser is compile_version_parser("{current_date}-{build_count:03}", "%Y.%m.%d")
+
+    parsed = parser.parse("2024.12.07-003.rc")
+    assert parsed.date == "2024.12.07"
+    assert (parsed.year, parsed.month, parsed.day) == (2024, 12, 7)
+    assert parsed.build_count == 3
+    assert parsed.suffix == "rc"
+
+    # A version written without --build has no build count
+    parsed = parser.parse("2024.12.07.beta")
+    assert (parsed.date, parsed.build_count, parsed.suffix) == ("2024.12.07", None, "beta")
+
+    assert parser.parse("2024.12.07-003\n") is None
+    assert parser.parse("v1.0.0") is None
+
+
+def test_compile_version_parser_quarter_and_day_of_year():
+    parsed = compile_version_parser("{current_date}.{build_count}", "%y.Q%q").parse("24.Q4.12")
+    assert (parsed.date, parsed.year, parsed.quarter, parsed.build_count) == ("24.Q4", 2024, 4, 12)
+
+    parsed = compile_version_parser("{current_date}-{build_count}", "%Y.%j").parse("2024.342-2")
+    assert (parsed.year, parsed.day_of_year, parsed.build_count) == (2024, 342, 2)
+
+
+def test_version_parser_parse_many():
+    parser = compile_version_parser("{current_date}-{build_count:03}", "%Y.%m.%d")
+    results = parser.parse_many(["2024.12.07-001", "latest", "2024.12.08-010.rc"])
+    assert [result and result.build_count for result in results] == [1, None, 10]
+
+
+def test_compile_version_parser_suffix_separators():
+    parser = compile_version_parser("{current_date}-{build_count:03}", "%Y.%m.%d")
+
+    # Older releases wrote the suffix after a "-"
+    parsed = parser.parse("2024.12.14-001-beta")
+    assert (parsed.date, parsed.build_count, parsed.suffix) == ("2024.12.14", 1, "beta")
+    parsed = parser.parse("2024.12.14-rc")
+    assert (parsed.date, parsed.build_count, parsed.suffix) == ("2024.12.14", None, "rc")
+
+    # A trailing number is not a suffix
+    assert parser.parse("2024.12.14.1") is None
+    assert parser.parse("2024.12.14-001.2") is None
+
+
+def test_parse_version_old_forms():
+    assert parse_version("2023-10-11-2-beta") == ("2023-10-11", 2)
+    assert parse_version("2023-10-11-2.rc") == ("2023-10-11", 2)
+    assert parse_version("2023-10-11-beta") == ("2023-10-11", 0)
+
+
+def test_get_build_version_with_default_date_format(monkeypatch):
+    monkeypatch.setattr(
+        "src.bumpcalver.utils.get_current_datetime_version", lambda tz, df: "2024.12.07"
+    )
+
+    mock_handler = mock.Mock()
+    mock_handler.read_version.return_value = "2024.12.07-009.beta"
+    monkeypatch.setattr(
+        "src.bumpcalver.utils.get_version_handler", lambda ft: mock_handler
+    )
+
+    file_config = {"path": "dummy_path", "file_type": "python", "variable": "__version__"}
+    result = get_build_version(
+        file_config, "{current_date}-{build_count:03}", "UTC", "%Y.%m.%d"
+    )
+    assert result == "2024.12.07-010"
+
+
+def test_compile_version_format_renders_fields():
+    template = compile_version_format("{current_date}-{build_count:03}")
+    assert template is compile_version_format("{current_date}-{build_count:03}")
+    assert template.render("2024.12.07", 3) == "2024.12.07-003"
+    # The suffix goes at the end unless the format places it
+    assert template.render("2024.12.07", 3, "rc") == "2024.12.07-003.rc"
+
+    template = compile_version_format("{iso_year}.W{iso_week:02}.Q{quarter}{suffix}-{build_count}")
+    clock = Clock(datetime(2024, 12, 30, 12))
+    assert template.render("", 5, "beta", "UTC", clock) == "2025.W01.Q4.beta-5"
+
+
+def test_compile_version_format_git_fields(monkeypatch):
+    monkeypatch.setattr("src.bumpcalver.utils.get_git_sha", lambda: "1a2b3c4")
+    monkeypatch.setattr("src.bumpcalver.utils.get_git_branch", lambda: "main")
+    template = compile_version_format("{current_date}+{git_branch}.{git_sha}")
+    assert template.render("2024.12.07") == "2024.12.07+main.1a2b3c4"
+
+
+def test_compile_version_format_rejects_invalid_formats():
+    for version_format, message in [
+        ("{current_date}-{build_number}", "Unknown field '{build_number}'"),
+        ("{current_date!r}", "Conversion '!r' is not supported"),
+        ("{current_date:03d}", "Invalid format spec '03d'"),
+        ("{current_date", "Invalid version format"),
+    ]:
+        with pytest.raises(ValueError, match=re.escape(message)):
+            compile_version_format(version_format)
+
+    with pytest.raises(ValueError, match="needs a build count"):
+        compile_version_format("{current_date}-{build_count}").render("2024.12.07")
+
+
+# Build times around the start of daylight saving time in New York, on
+# 2024-03-10 at 07:00 UTC, and on the next day
+BATCH_TIMESTAMPS = [
+    1710053999,  # 2024-03-10 01:59:59 EST
+    datetime(2024, 3, 10, 7, 0, tzinfo=timezone.utc),  # 03:00:00 EDT
+    datetime(2024, 3, 10, 4, 59, 59),  # naive, so UTC: 2024-03-09 23:59:59 EST
+    1710129600.5,  # 2024-03-11 00:00:00.5 EDT
+    1710053000,  # 2024-03-10 01:43:20 EST, earlier than the first build
+]
+
+
+def test_get_batch_versions_counts_builds_per_date():
+    versions = get_batch_versions(BATCH_TIMESTAMPS, "America/New_York", use_numpy=False)
+    assert versions == [
+        "2024.03.10-002",
+        "2024.03.10-003",
+        "2024.03.09-001",
+        "2024.03.11-001",
+        "2024.03.10-001",
+    ]
+
+
+def test_get_batch_versions_buckets_by_formatted_date():
+    versions = get_batch_versions(
+        BATCH_TIMESTAMPS,
+        "America/New_York",
+        "%Y.Q%q",
+        "{current_date}.{build_count}",
+        suffix="rc",
+        use_numpy=False,
+    )
+    assert versions == [
+        "2024.Q1.3.rc",
+        "2024.Q1.4.rc",
+        "2024.Q1.1.rc",
+        "2024.Q1.5.rc",
+        "2024.Q1.2.rc",
+    ]
+
+
+def test_get_batch_versions_numpy_matches_python():
+    numpy = pytest.importorskip("numpy")
+
+    timestamps = list(range(1709900000, 1710300000, 997)) + BATCH_TIMESTAMPS[:2]
+    for tz, date_format in [
+        ("America/New_York", "%Y.%m.%d"),
+        ("America/St_Johns", "%G.W%V"),
+        ("Asia/Kolkata", "%y.%j"),
+    ]:
+        expected = get_batch_versions(timestamps, tz, date_format, use_numpy=False)
+        assert get_batch_versions(timestamps, tz, date_format, use_numpy=True) == expected
+
+    seconds = numpy.array(BATCH_TIMESTAMPS[:1] + [1710129600], dtype="datetime64[s]")
+    assert get_batch_versions(seconds, "America/New_York", use_numpy=True) == [
+        "2024.03.10-001",
+        "2024.03.11-001",
+    ]